@@ -1,9 +1,26 @@
-from flask import Flask, render_template, request, jsonify
-from ml.api import train_models, predict_name, get_dataset_stats
+# Imported first so the startup report covers every import after it
+from ml.startup import startup_complete, get_startup_report
+import time
+from flask import Flask, Response, render_template, request, jsonify, g
+from ml.api import PREDICTION_BATCHING_ENABLED, submit_training_job, get_training_job, compare_models, cross_validate, search_hyperparameters, update_incremental_model, predict_name, predict_name_batched, predict_names_batch, get_dataset_stats, get_prediction_table_stats, get_prediction_cache_stats, get_prediction_batching_stats, get_writeback_stats, log_predictions, list_models, promote_model, set_model_canary
+from ml.instrumentation import METRICS_ENABLED, timed, observe, increment, render_metrics
 from types import Demographic, TrainingOptions
 
 app = Flask(__name__)
 
+@app.before_request
+def start_timer():
+    if METRICS_ENABLED:
+        g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    if METRICS_ENABLED and 'request_start' in g:
+        endpoint = request.endpoint or 'unknown'
+        observe('http_request_duration_seconds', time.perf_counter() - g.request_start, endpoint=endpoint)
+        increment('http_requests_total', endpoint=endpoint, status=str(response.status_code))
+    return response
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -18,8 +35,39 @@ def predict():
         'education_level': data['education_level'],
         'ethnicity': data['ethnicity']
     }
-    result = predict_name(demographic)
-    return jsonify(result)
+    result = predict_name_batched(demographic) if PREDICTION_BATCHING_ENABLED else predict_name(demographic)
+    log_predictions([demographic], [result])
+    with timed('serialization', endpoint='predict'):
+        return jsonify(result)
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    data = request.json
+    results = predict_names_batch(data['demographics'])
+    logged = [(data['demographics'][item['index']], item['result']) for item in results if item['result']]
+    log_predictions([demographic for demographic, _ in logged], [result for _, result in logged])
+    with timed('serialization', endpoint='predict_batch'):
+        return jsonify(results)
+
+@app.route('/api/predict/table')
+def prediction_table_stats():
+    stats = get_prediction_table_stats()
+    return jsonify(stats)
+
+@app.route('/api/predict/cache')
+def prediction_cache_stats():
+    stats = get_prediction_cache_stats()
+    return jsonify(stats)
+
+@app.route('/api/predict/batching')
+def prediction_batching_stats():
+    stats = get_prediction_batching_stats()
+    return jsonify(stats)
+
+@app.route('/api/writeback')
+def writeback_stats():
+    stats = get_writeback_stats()
+    return jsonify(stats)
 
 @app.route('/api/train', methods=['POST'])
 def train():
@@ -30,13 +78,92 @@ def train():
         'feature_engineering': data['feature_engineering'],
         'hyperparameters': data['hyperparameters']
     }
-    metrics = train_models(options)
-    return jsonify(metrics)
+    job_id = submit_training_job(options)
+    return jsonify({'job_id': job_id, 'status': 'queued'}), 202
+
+@app.route('/api/train/compare', methods=['POST'])
+def compare():
+    data = request.json
+    options: TrainingOptions = {
+        'model_type': data.get('model_type', 'randomForest'),
+        'train_test_split': data['train_test_split'],
+        'feature_engineering': data['feature_engineering'],
+        'hyperparameters': data['hyperparameters']
+    }
+    comparison = compare_models(options, data.get('model_types'))
+    return jsonify(comparison)
+
+@app.route('/api/train/cross-validate', methods=['POST'])
+def cross_validate_model():
+    data = request.json
+    options: TrainingOptions = {
+        'model_type': data['model_type'],
+        'train_test_split': data.get('train_test_split', 0.8),
+        'feature_engineering': data['feature_engineering'],
+        'hyperparameters': data['hyperparameters']
+    }
+    result = cross_validate(options, data.get('folds', 5), data.get('stratify'), data.get('seed'))
+    return jsonify(result)
+
+@app.route('/api/train/search', methods=['POST'])
+def search_model_hyperparameters():
+    data = request.json
+    options: TrainingOptions = {
+        'model_type': data['model_type'],
+        'train_test_split': data.get('train_test_split', 0.8),
+        'feature_engineering': data['feature_engineering'],
+        'hyperparameters': data.get('hyperparameters', {})
+    }
+    result = search_hyperparameters(
+        options, data.get('strategy', 'random'), data.get('space'), data.get('trials', 20),
+        data.get('rungs', 3), data.get('eta', 3), data.get('seed')
+    )
+    return jsonify(result)
+
+@app.route('/api/train/update', methods=['POST'])
+def update_model():
+    result = update_incremental_model()
+    return jsonify(result)
+
+@app.route('/api/train/<job_id>')
+def training_job(job_id):
+    status = get_training_job(job_id)
+    if status is None:
+        return jsonify({'error': 'Unknown training job'}), 404
+    return jsonify(status)
+
+@app.route('/api/models')
+def models():
+    registered = list_models()
+    return jsonify(registered)
+
+@app.route('/api/models/<name>/promote', methods=['POST'])
+def promote(name):
+    data = request.json
+    registered = promote_model(name, data['version'])
+    return jsonify(registered)
+
+@app.route('/api/models/<name>/canary', methods=['POST'])
+def canary(name):
+    data = request.json
+    registered = set_model_canary(name, data['version'], data.get('percent', 0))
+    return jsonify(registered)
 
 @app.route('/api/dataset/stats')
 def dataset_stats():
     stats = get_dataset_stats()
     return jsonify(stats)
 
+@app.route('/api/startup')
+def startup_report():
+    report = get_startup_report()
+    return jsonify(report)
+
+@app.route('/metrics')
+def metrics():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+startup_complete()
+
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
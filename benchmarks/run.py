@@ -0,0 +1,203 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Benchmarks must not write model artifacts or read them back
+os.environ.setdefault('MODEL_PERSISTENCE_ENABLED', 'false')
+
+import numpy as np
+from benchmarks.synthetic import generate_training_records, generate_demographics
+from ml import api
+from ml.compiled import compile_model
+from ml.preprocessing import preprocess_data, split_train_test, features_to_matrix, encode_demographics
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+MODEL_TYPES = ['randomForest', 'gradientBoosting', 'neuralNetwork']
+
+def measure(name: str, rows: int, fn: Callable[[], Any], repeat: int, track_memory: bool) -> Dict[str, Any]:
+    """
+    Best-of-repeat wall time of fn, plus its peak traced allocation from a
+    separate run (tracemalloc slows code down, so it never overlaps timing)
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    peak_memory = None
+    if track_memory:
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    seconds = min(timings)
+    result = {
+        'name': name,
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds > 0 else None,
+        'peak_memory_bytes': peak_memory,
+    }
+    print(f"{name:<40} {rows:>10} rows {seconds * 1000:>12.2f} ms {result['rows_per_second'] or 0:>14.0f} rows/s")
+    return result
+
+def bench_preprocessing(size: int, seed: int, repeat: int, track_memory: bool) -> List[Dict[str, Any]]:
+    records = generate_training_records(size, seed)
+    processed = preprocess_data(records)
+    return [
+        measure('preprocess_data', size, lambda: preprocess_data(records), repeat, track_memory),
+        measure('preprocess_data[columnar]', size, lambda: preprocess_data(records, columnar=True), repeat, track_memory),
+        measure('split_train_test', size, lambda: split_train_test(processed, 0.8, seed), repeat, track_memory),
+        measure('split_train_test[stratified]', size, lambda: split_train_test(processed, 0.8, seed, 'label'), repeat, track_memory),
+    ]
+
+def bench_models(size: int, seed: int, repeat: int, track_memory: bool) -> List[Dict[str, Any]]:
+    processed = preprocess_data(generate_training_records(size, seed))
+    train, test = split_train_test(processed, 0.8, seed)
+    features = features_to_matrix(test)
+    results = []
+
+    for model_type in MODEL_TYPES:
+        trained: Dict[str, Any] = {}
+
+        def train_model() -> None:
+            trained['model'] = api._train_model(model_type, train, lambda **update: None)[1]
+
+        results.append(measure(f'{model_type}.train', len(train), train_model, repeat, track_memory))
+        model = trained['model']
+        results.append(measure(f'{model_type}.evaluate', len(test), lambda: api.evaluate_model(model, test), repeat, track_memory))
+        results.append(measure(f'{model_type}.predict', len(test), lambda: [model.predict(record['features']) for record in test], repeat, track_memory))
+        results.append(measure(f'{model_type}.predict[batch]', len(test), lambda: api._predict_rows(model, features), repeat, track_memory))
+        compiled = compile_model(model)
+        if compiled is not None:
+            results.append(measure(f'{model_type}.predict[compiled]', len(test), lambda: compiled.predict_batch(features), repeat, track_memory))
+
+    return results
+
+def bench_endpoints(size: int, seed: int, repeat: int, track_memory: bool) -> List[Dict[str, Any]]:
+    from app import app
+
+    # Serve a model trained on synthetic data
+    processed = preprocess_data(generate_training_records(max(size, 1000), seed))
+    train, test = split_train_test(processed, 0.8, seed)
+    slot, model = api._train_model('randomForest', train, lambda **update: None)
+    api.install_models({
+        'model_type': 'randomForest',
+        'models': {slot: model},
+        'metrics': api.evaluate_model(model, test),
+        'train_data': train,
+        'test_data': test,
+        'age_min': 0.0,
+        'age_max': 100.0,
+        'feature_schema': None,
+    })
+
+    demographics = generate_demographics(size, seed + 1)
+    client = app.test_client()
+
+    def single() -> None:
+        for demographic in demographics:
+            client.post('/api/predict', json=demographic)
+
+    def batch() -> None:
+        client.post('/api/predict/batch', json={'demographics': demographics})
+
+    return [
+        measure('POST /api/predict', size, single, repeat, track_memory),
+        measure('POST /api/predict/batch', size, batch, repeat, track_memory),
+        measure('encode_demographics', size, lambda: encode_demographics(demographics), repeat, track_memory),
+    ]
+
+SUITES = {
+    'preprocessing': bench_preprocessing,
+    'models': bench_models,
+    'endpoints': bench_endpoints,
+}
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, tolerance: float) -> List[str]:
+    """
+    Names of benchmarks whose throughput fell more than tolerance below the baseline
+    """
+    with open(baseline_path) as f:
+        baseline = {(entry['name'], entry['rows']): entry for entry in json.load(f)['results']}
+
+    regressions = []
+    for entry in results:
+        previous = baseline.get((entry['name'], entry['rows']))
+        if not previous or not previous['rows_per_second'] or not entry['rows_per_second']:
+            continue
+        change = entry['rows_per_second'] / previous['rows_per_second'] - 1
+        if change < -tolerance:
+            regressions.append(f"{entry['name']} @ {entry['rows']} rows: {change:+.1%} throughput")
+    return regressions
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark preprocessing, training and inference hot paths')
+    parser.add_argument('--suite', choices=sorted(SUITES), action='append', help='suites to run (default: all)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='dataset sizes in rows')
+    parser.add_argument('--model-max-rows', type=int, default=10000, help='largest size used for model and endpoint suites')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per benchmark; the best is kept')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak-memory run')
+    parser.add_argument('--output', default=os.path.join(ROOT, 'benchmarks', 'results', 'latest.json'))
+    parser.add_argument('--baseline', help='results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed throughput drop before failing')
+    args = parser.parse_args()
+    # The models draw initial weights and bootstrap samples from the random module
+    random.seed(args.seed)
+
+    results: List[Dict[str, Any]] = []
+    for suite in args.suite or list(SUITES):
+        for size in args.sizes:
+            if suite != 'preprocessing' and size > args.model_max_rows:
+                continue
+            results.extend(SUITES[suite](size, args.seed, args.repeat, not args.no_memory))
+
+    report = {
+        'meta': {
+            'timestamp': time.time(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {args.output}')
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
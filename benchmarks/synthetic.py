@@ -0,0 +1,60 @@
+from typing import Any, Dict, List
+import numpy as np
+from ml.preprocessing import GENDERS, REGIONS, EDUCATION_LEVELS, ETHNICITIES
+from types import Demographic
+
+def _columns(n: int, seed: int, n_names: int) -> Dict[str, list]:
+    """
+    Random demographic columns, reproducible from the seed
+    """
+    rng = np.random.default_rng(seed)
+    return {
+        'age': rng.integers(16, 90, n).tolist(),
+        'gender': np.array(GENDERS)[rng.integers(0, len(GENDERS), n)].tolist(),
+        'location': np.array(REGIONS)[rng.integers(0, len(REGIONS), n)].tolist(),
+        'education_level': np.array(EDUCATION_LEVELS)[rng.integers(0, len(EDUCATION_LEVELS), n)].tolist(),
+        'ethnicity': np.array(ETHNICITIES)[rng.integers(0, len(ETHNICITIES), n)].tolist(),
+        # Zipf-like name frequencies, as in real name data
+        'name': [f'Name{index}' for index in (rng.zipf(1.3, n) % n_names).tolist()],
+    }
+
+def generate_training_records(n: int, seed: int = 0, n_names: int = 500) -> List[Dict[str, Any]]:
+    """
+    Raw training records in the shape preprocess_data expects
+    """
+    columns = _columns(n, seed, n_names)
+    return [
+        {
+            'demographic': {
+                'age': age,
+                'gender': gender,
+                'location': location,
+                'educationLevel': education_level,
+                'ethnicity': ethnicity,
+            },
+            'name': name,
+        }
+        for age, gender, location, education_level, ethnicity, name in zip(
+            columns['age'], columns['gender'], columns['location'],
+            columns['education_level'], columns['ethnicity'], columns['name'],
+        )
+    ]
+
+def generate_demographics(n: int, seed: int = 0) -> List[Demographic]:
+    """
+    Demographics in the shape the prediction API accepts
+    """
+    columns = _columns(n, seed, 1)
+    return [
+        {
+            'age': age,
+            'gender': gender,
+            'location': location,
+            'education_level': education_level,
+            'ethnicity': ethnicity,
+        }
+        for age, gender, location, education_level, ethnicity in zip(
+            columns['age'], columns['gender'], columns['location'],
+            columns['education_level'], columns['ethnicity'],
+        )
+    ]
@@ -0,0 +1,30 @@
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+wsgi_app = 'app:app'
+
+# Import the app, and with it the saved models, once in the master before
+# forking workers; the workers then share those pages copy-on-write
+# instead of each loading its own copy
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+if preload_app:
+    # Garbage collection writes to every object it visits, which would copy
+    # the shared pages into each worker; collection stays off while the app
+    # loads and everything loaded by then is frozen out of it before forking
+    gc.disable()
+    # torch's thread pools do not survive a fork: the master loads the
+    # network weights, and each worker starts torch and traces them
+    os.environ.setdefault('DEFER_TORCH_INIT', 'true')
+
+def when_ready(server):
+    if preload_app:
+        gc.freeze()
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
+        from ml.compiled import start_torch
+        start_torch()
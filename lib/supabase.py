@@ -1,12 +1,32 @@
 import os
+import threading
+from typing import Any, Optional
 from supabase import create_client, Client
 
-# Get Supabase credentials from environment variables
-supabase_url = os.getenv('SUPABASE_URL')
-supabase_anon_key = os.getenv('SUPABASE_ANON_KEY')
+_client: Optional[Client] = None
+_client_lock = threading.Lock()
 
-if not supabase_url or not supabase_anon_key:
-    raise ValueError('Missing Supabase environment variables')
+def get_supabase() -> Client:
+    """
+    Returns the shared Supabase client, creating it on first use so that
+    importing this module does not need credentials
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # Get Supabase credentials from environment variables
+                supabase_url = os.getenv('SUPABASE_URL')
+                supabase_anon_key = os.getenv('SUPABASE_ANON_KEY')
 
-# Initialize Supabase client
-supabase: Client = create_client(supabase_url, supabase_anon_key) 
\ No newline at end of file
+                if not supabase_url or not supabase_anon_key:
+                    raise ValueError('Missing Supabase environment variables')
+
+                _client = create_client(supabase_url, supabase_anon_key)
+    return _client
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from lib.supabase import supabase` working
+    if name == 'supabase':
+        return get_supabase()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
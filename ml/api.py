@@ -1,102 +1,670 @@
+import atexit
+import copy
+import os
 import time
 import random
-from typing import Dict, List, Any, Optional, Tuple
-from types import Demographic, PredictionResult, ModelMetrics, DatasetStats, TrainingOptions
-from .preprocessing import preprocess_data, split_train_test, extract_features_from_demographic
+import threading
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Any, Optional, Tuple, TypedDict
+import numpy as np
+from types import Demographic, NamePrediction, PredictionResult, BatchPredictionItem, ModelMetrics, DatasetStats, TrainingOptions, TrainingJobStatus, ModelComparison, CrossValidationResult, IncrementalUpdateResult, HyperparameterSearchResult, HyperparameterTrial, SearchStrategy, RegisteredModel
+from .preprocessing import split_train_test, stratify_by, extract_features_from_demographic, encode_demographics, features_to_matrix, reference_features, FEATURE_NAMES
+from .features import FeatureSchema, build_features
+from .evaluation import compute_metrics
+from .splitting import kfold_indices, split_indices, take
+from .prediction_table import PredictionTable
+from .prediction_cache import PredictionCache
+from .persistence import MODEL_ARTIFACT_DIR, save_model, load_model, set_latest
+from .jobs import TrainingJobQueue
+from .sources import source_from_config
+from .stats import CachedDatasetStats
+from .instrumentation import timed, increment, observe
+from .streaming import StreamingClassifier, fit_streaming, update_streaming, resolve_streaming_hyperparameters, STREAMING_AGE_RANGE
+from .vocabulary import LabelVocabulary
+from .compiled import compile_model
+from .registry import ModelRegistry, ModelVersion
+from .batching import MicroBatcher
+from .search import DEFAULT_SEARCH_SPACES, SearchSpace, SharedDataset, resolve_hyperparameters, validate_space, grid_configurations, random_configurations, rung_fractions, should_prune
+from .writeback import BufferedWriter
 from .models.random_forest import RandomForestClassifier
 from .models.gradient_boosting import GradientBoostingClassifier
 from .models.neural_network import NeuralNetwork
 from .data.sample_data import sample_name_data, extended_name_data
 
-# Store trained models for later use
-random_forest_model: Optional[RandomForestClassifier] = None
-gradient_boosting_model: Optional[GradientBoostingClassifier] = None
-neural_network_model: Optional[NeuralNetwork] = None
+# Save every trained model to disk, and load the latest saved ones on startup
+MODEL_PERSISTENCE_ENABLED = os.getenv('MODEL_PERSISTENCE_ENABLED', 'true').lower() == 'true'
+
+# Serializes installs from synchronous and background training, so saved
+# artifacts and registered versions go live in the same order
+_install_lock = threading.Lock()
+
+# Serializes incremental updates, so two never build on the same model
+_update_lock = threading.Lock()
+
+# Serve compiled (batched float32) versions of the trained models where one exists
+COMPILED_INFERENCE_ENABLED = os.getenv('COMPILED_INFERENCE_ENABLED', 'true').lower() == 'true'
+
+# Slots in order of preference when picking the model to serve, with display names
+SERVING_ORDER = [
+    ('neuralNetwork', 'Neural Network'),
+    ('gradientBoosting', 'Gradient Boosting'),
+    ('randomForest', 'Random Forest'),
+    ('incremental', 'Incremental'),
+]
+
+# Versions kept per model name; the oldest standby versions are dropped first
+MODEL_REGISTRY_MAX_VERSIONS = int(os.getenv('MODEL_REGISTRY_MAX_VERSIONS', '3'))
+
+# With a percentage set, newly trained models start as canaries serving that
+# share of their model's traffic and go live once promoted; 0 puts them live at once
+MODEL_CANARY_PERCENT = float(os.getenv('MODEL_CANARY_PERCENT', '0'))
+
+# Every trained model by name and version, with the live and canary version of each
+model_registry = ModelRegistry([slot for slot, _ in SERVING_ORDER], MODEL_REGISTRY_MAX_VERSIONS)
+
+# Predicted once by every version before it is registered
+WARM_UP_DEMOGRAPHIC: Demographic = {'age': 30, 'gender': 'female', 'location': 'West', 'education_level': 'bachelors', 'ethnicity': 'Asian'}
+
+# Recent predictions keyed on (model name, model version, encoded features)
+prediction_cache = PredictionCache(
+    max_entries=int(os.getenv('PREDICTION_CACHE_SIZE', '10000')),
+    ttl_seconds=float(os.getenv('PREDICTION_CACHE_TTL', '0'))
+)
+
+# Precomputed predictions for the categorical demographic space, built for every registered version
+PREDICTION_TABLE_ENABLED = os.getenv('PREDICTION_TABLE_ENABLED', 'false').lower() == 'true'
+
+# Coalesce concurrent single predictions into one model call: a batch closes
+# PREDICTION_BATCH_WINDOW_MS after its first request or at PREDICTION_BATCH_MAX_SIZE
+PREDICTION_BATCHING_ENABLED = os.getenv('PREDICTION_BATCHING_ENABLED', 'false').lower() == 'true'
+PREDICTION_BATCH_TIMEOUT = float(os.getenv('PREDICTION_BATCH_TIMEOUT', '10'))
+
+# Log training metrics to the model_metrics table, and served predictions to
+# the demographics and names tables. Predicted names land in the table that
+# training reads from, so prediction logging is off by default.
+METRICS_LOGGING_ENABLED = os.getenv('METRICS_LOGGING_ENABLED', 'true' if os.getenv('SUPABASE_URL') else 'false').lower() == 'true'
+PREDICTION_LOGGING_ENABLED = os.getenv('PREDICTION_LOGGING_ENABLED', 'false').lower() == 'true'
+
+# Logged rows are inserted in batches of up to WRITEBACK_BATCH_SIZE, at most
+# WRITEBACK_FLUSH_INTERVAL seconds after they were logged; beyond
+# WRITEBACK_MAX_BUFFERED_ROWS waiting rows new ones are dropped
+WRITEBACK_BATCH_SIZE = int(os.getenv('WRITEBACK_BATCH_SIZE', '500'))
+WRITEBACK_FLUSH_INTERVAL = float(os.getenv('WRITEBACK_FLUSH_INTERVAL', '1'))
+WRITEBACK_MAX_BUFFERED_ROWS = int(os.getenv('WRITEBACK_MAX_BUFFERED_ROWS', '10000'))
+WRITEBACK_MAX_RETRIES = int(os.getenv('WRITEBACK_MAX_RETRIES', '5'))
+
+# Where dataset statistics are computed from: 'supabase' or a database URL
+# such as 'sqlite:///local.db'; without one the bundled sample data is described
+DATASET_STATS_SOURCE = os.getenv('DATASET_STATS_SOURCE', 'supabase' if os.getenv('SUPABASE_URL') else '')
+DATASET_STATS_REFRESH_INTERVAL = float(os.getenv('DATASET_STATS_REFRESH_INTERVAL', '300'))
+dataset_stats: Optional[CachedDatasetStats] = None
+
+# Where the 'incremental' model type streams its training data from:
+# 'supabase', a database URL, or a .csv / .parquet path
+TRAINING_DATA_SOURCE = os.getenv('TRAINING_DATA_SOURCE', 'supabase')
+TRAINING_CHUNK_SIZE = int(os.getenv('TRAINING_CHUNK_SIZE', '10000'))
+
+# Model types trained side by side by compare_models (lstm and transformer fall back to the neural network)
+COMPARED_MODEL_TYPES = ['randomForest', 'gradientBoosting', 'neuralNetwork']
+
+# Seed for train/test splits and cross-validation folds; unset draws a fresh split every run
+TRAINING_SEED = int(os.environ['TRAINING_SEED']) if os.getenv('TRAINING_SEED') else None
+
+# Comma-separated keys splits are stratified by: 'label' and/or gender, location,
+# education, age, ethnicity; empty for a plain random split
+TRAINING_STRATIFY = [key.strip() for key in os.getenv('TRAINING_STRATIFY', 'label').split(',') if key.strip()]
+
+# Processed records of the running cross-validation, set once per worker process
+_fold_data: List[Dict[str, Any]] = []
+
+# Worker processes running hyperparameter search trials; defaults to one per CPU
+SEARCH_WORKERS = int(os.getenv('SEARCH_WORKERS', str(os.cpu_count() or 1)))
+
+# Trials that must reach a rung before median pruning stops any trial there
+SEARCH_PRUNING_MIN_TRIALS = int(os.getenv('SEARCH_PRUNING_MIN_TRIALS', '3'))
+
+# Shared encoded dataset of the running search, attached once per worker process
+_trial_data: Optional[SharedDataset] = None
+_trial_feature_names: List[str] = []
+_trial_label_names: List[str] = []
 
 # Store training and test data
 train_data: List[Dict[str, Any]] = []
 test_data: List[Dict[str, Any]] = []
 
+class TrainedModels(TypedDict):
+    model_type: str
+    models: Dict[str, Any]  # slot name -> newly trained model
+    metrics: Optional[ModelMetrics]  # None when an incremental update had nothing to evaluate on
+    feature_schema: Optional[FeatureSchema]  # None for the full FEATURE_NAMES layout
+    train_data: List[Dict[str, Any]]
+    test_data: List[Dict[str, Any]]
+    age_min: float
+    age_max: float
+
 def train_models(options: TrainingOptions) -> ModelMetrics:
     """
     Trains ML models with the provided options
     """
+    trained = fit_models(options)
+    install_models(trained)
+    return trained['metrics']
+
+def fit_models(options: TrainingOptions, progress: Optional[Callable[..., None]] = None) -> TrainedModels:
+    """
+    Trains a model without touching the serving state, so it can run in a
+    worker process. progress, if given, is called with keyword updates
+    (stage, epochs_total, epochs_completed) as training advances.
+    """
+    report = progress or (lambda **update: None)
     print(f'Starting model training with options: {options}')
     
+    if options['model_type'] == 'incremental':
+        return _fit_incremental_model(options, report)
+    
     # In a real application, we would load real data here
     # For demo purposes, we'll use our sample data
-    raw_data = extended_name_data if options['model_type'] == 'randomForest' else sample_name_data
+    raw_data, dataset_version = _bundled_training_data(options['model_type'])
     
-    # Preprocess data
-    processed_data = preprocess_data(raw_data)
+    # Preprocess data, building only the feature columns the options ask for
+    report(stage='preprocessing')
+    processed_data, schema = build_features(raw_data, options['feature_engineering'], dataset_version)
     
     # Split into training and test sets
-    train, test = split_train_test(processed_data, options['train_test_split'])
-    global train_data, test_data
-    train_data = train
-    test_data = test
+    train, test = split_train_test(processed_data, options['train_test_split'], TRAINING_SEED, TRAINING_STRATIFY)
     
-    accuracy = 0
     start_time = time.time()
     
     # Train the appropriate model
-    global random_forest_model, gradient_boosting_model, neural_network_model
+    report(stage='training')
+    slot, model = _train_model(options['model_type'], train, report, options.get('hyperparameters'))
+    models: Dict[str, Any] = {slot: model}
+    
+    end_time = time.time()
+    training_time = (end_time - start_time) * 1000  # Convert to milliseconds
+    
+    report(stage='evaluating')
+    metrics = evaluate_model(model, test)
+    accuracy = metrics['accuracy']
+    
+    print(f"Model training completed in {training_time:.2f}ms with accuracy: {accuracy:.4f}")
+    observe('training_duration_seconds', training_time / 1000, model=options['model_type'])
+    
+    return {
+        'model_type': options['model_type'],
+        'models': models,
+        'metrics': metrics,
+        'train_data': train,
+        'test_data': test,
+        'age_min': schema.age_min,
+        'age_max': schema.age_max,
+        'feature_schema': schema
+    }
+
+def _fit_incremental_model(options: TrainingOptions, report: Callable[..., None]) -> TrainedModels:
+    """
+    Trains the incremental model chunk by chunk from TRAINING_DATA_SOURCE,
+    so the dataset never has to fit in memory
+    """
+    params = resolve_streaming_hyperparameters(options.get('hyperparameters'))
+    start_time = time.time()
+    report(stage='training')
+    model, holdout_features, holdout_labels = fit_streaming(
+        source_from_config(TRAINING_DATA_SOURCE), TRAINING_CHUNK_SIZE, options['train_test_split'],
+        alpha=params['alpha'], learning_rate=params['learningRate']
+    )
+    training_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+    
+    report(stage='evaluating')
+    predictions = _predict_rows(model, holdout_features)
+    predicted_labels = [names[0]['name'] if names else '' for names in predictions]
+    true_labels = model.vocabulary.decode(holdout_labels.tolist())
+    metrics = compute_metrics(true_labels, predicted_labels, holdout_features)
+    
+    print(f"Model training completed in {training_time:.2f}ms with accuracy: {metrics['accuracy']:.4f}")
+    observe('training_duration_seconds', training_time / 1000, model='incremental')
     
-    if options['model_type'] == 'randomForest':
-        random_forest_model = RandomForestClassifier(20, 7)
-        random_forest_model.train(train_data)
-        accuracy = random_forest_model.evaluate(test_data)['accuracy']
+    return {
+        'model_type': 'incremental',
+        'models': {'incremental': model},
+        'metrics': metrics,
+        # Not materialized: the data only ever existed chunk by chunk
+        'train_data': [],
+        'test_data': [],
+        'age_min': STREAMING_AGE_RANGE[0],
+        'age_max': STREAMING_AGE_RANGE[1],
+        'feature_schema': None
+    }
+
+def _train_model(model_type: str, train: List[Dict[str, Any]], report: Callable[..., None],
+                 hyperparameters: Optional[Dict[str, Any]] = None) -> Tuple[str, Any]:
+    """
+    Trains one model, returning its serving slot and the model.
+    Hyperparameters left out fall back to DEFAULT_HYPERPARAMETERS.
+    """
+    params = resolve_hyperparameters(model_type, hyperparameters)
+    
+    if model_type == 'randomForest':
+        model = RandomForestClassifier(params['numTrees'], params['maxDepth'])
+        model.train(train)
+        return 'randomForest', model
         
-    elif options['model_type'] == 'gradientBoosting':
-        gradient_boosting_model = GradientBoostingClassifier(15, 0.1)
-        gradient_boosting_model.train(train_data)
-        accuracy = gradient_boosting_model.evaluate(test_data)['accuracy']
+    elif model_type == 'gradientBoosting':
+        model = GradientBoostingClassifier(params['numTrees'], params['learningRate'])
+        model.train(train)
+        return 'gradientBoosting', model
         
-    elif options['model_type'] == 'neuralNetwork':
+    elif model_type == 'neuralNetwork':
         # Determine input size from the first sample
-        input_size = len(train_data[0]['features'])
-        neural_network_model = NeuralNetwork(input_size, 15, 0.05)
-        neural_network_model.train(train_data, 200)
-        accuracy = neural_network_model.evaluate(test_data)['accuracy']
+        input_size = len(train[0]['features'])
+        model = NeuralNetwork(input_size, params['neuronsPerLayer'], params['learningRate'])
+        report(epochs_total=params['epochs'], epochs_completed=0)
+        model.train(train, params['epochs'])
+        report(epochs_completed=params['epochs'])
+        return 'neuralNetwork', model
         
-    elif options['model_type'] in ['lstm', 'transformer']:
+    elif model_type in ['lstm', 'transformer']:
         # These would be more complex to implement in Python
         # For demo purposes, we'll use the neural network as a fallback
-        print(f"{options['model_type']} not fully implemented, using Neural Network instead")
-        input_size = len(train_data[0]['features'])
-        neural_network_model = NeuralNetwork(input_size, 20, 0.05)
-        neural_network_model.train(train_data, 300)
-        accuracy = neural_network_model.evaluate(test_data)['accuracy']
+        print(f"{model_type} not fully implemented, using Neural Network instead")
+        input_size = len(train[0]['features'])
+        model = NeuralNetwork(input_size, params['neuronsPerLayer'], params['learningRate'])
+        report(epochs_total=params['epochs'], epochs_completed=0)
+        model.train(train, params['epochs'])
+        report(epochs_completed=params['epochs'])
+        return 'neuralNetwork', model
         
     else:
-        raise ValueError(f"Unknown model type: {options['model_type']}")
+        raise ValueError(f"Unknown model type: {model_type}")
+
+def _bundled_training_data(model_type: str) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    The bundled sample data a model type trains on, with the dataset
+    version its encoded feature blocks are cached under
+    """
+    if model_type == 'randomForest':
+        return extended_name_data, 'extended_name_data'
+    return sample_name_data, 'sample_name_data'
+
+def evaluate_model(model: Any, test: List[Dict[str, Any]]) -> ModelMetrics:
+    """
+    Computes metrics from the model's top prediction for every test record
+    """
+    feature_names = list(test[0]['features']) if test else FEATURE_NAMES
+    features = features_to_matrix(test, feature_names)
+    predictions = _predict_rows(model, features, feature_names)
+    predicted_labels = [names[0]['name'] if names else '' for names in predictions]
+    # Bias metrics need every demographic group, even ones the model's features leave out
+    groups = features if feature_names == FEATURE_NAMES else reference_features(test)
+    return compute_metrics([record['label'] for record in test], predicted_labels, groups)
+
+def update_incremental_model() -> IncrementalUpdateResult:
+    """
+    Updates the incremental model with only the rows inserted since its
+    watermark and swaps the result in; without a model yet, one is
+    trained from the start of the source. Metrics compare the previous
+    model's predictions for the new rows, made before it saw them.
+    """
+    with _update_lock:
+        source = source_from_config(TRAINING_DATA_SOURCE)
+        if not hasattr(source, 'training_pages_since'):
+            raise ValueError('Incremental updates need a source with created_at: supabase or a database URL')
+        
+        live = model_registry.live('incremental')
+        current = live.model if live else None
+        if current is not None and current.watermark is None:
+            raise ValueError('The incremental model has no watermark; retrain it before updating')
+        
+        start_time = time.time()
+        # Update a copy: the serving model keeps answering until the swap
+        if current is not None:
+            model = copy.deepcopy(current)
+        else:
+            params = resolve_streaming_hyperparameters(None)
+            model = StreamingClassifier(LabelVocabulary(), params['alpha'], params['learningRate'])
+        update = update_streaming(model, source, TRAINING_CHUNK_SIZE)
+        training_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+        
+        metrics = compute_metrics(update['true_labels'], update['predicted_labels'], update['features']) if update['true_labels'] else None
+        print(f"Incremental update over {update['rows']} new rows completed in {training_time:.2f}ms")
+        observe('training_duration_seconds', training_time / 1000, model='incremental', mode='update')
+        
+        if update['rows'] and model.fitted:
+            install_models({
+                'model_type': 'incremental',
+                'models': {'incremental': model},
+                'metrics': metrics,
+                'train_data': [],
+                'test_data': [],
+                'age_min': STREAMING_AGE_RANGE[0],
+                'age_max': STREAMING_AGE_RANGE[1],
+                'feature_schema': None
+            })
+        
+        age_stats = model.age_stats
+        return {
+            'model_type': 'incremental',
+            'rows': update['rows'],
+            'new_labels': update['new_labels'],
+            'watermark': update['watermark'],
+            'age_min': age_stats.min if age_stats.count else None,
+            'age_max': age_stats.max if age_stats.count else None,
+            'age_mean': age_stats.mean if age_stats.count else None,
+            'metrics': metrics,
+            'training_time': training_time
+        }
+
+def compare_models(options: TrainingOptions, model_types: Optional[List[str]] = None) -> List[ModelComparison]:
+    """
+    Trains every model type concurrently in worker processes on the same
+    train/test split and compares accuracy, training time and per-prediction
+    latency. The serving models are left untouched.
+    """
+    model_types = model_types or COMPARED_MODEL_TYPES
     
-    end_time = time.time()
-    training_time = (end_time - start_time) * 1000  # Convert to milliseconds
+    processed_data, _ = build_features(extended_name_data, options['feature_engineering'], 'extended_name_data')
+    train, test = split_train_test(processed_data, options['train_test_split'], TRAINING_SEED, TRAINING_STRATIFY)
+    
+    with ProcessPoolExecutor(max_workers=min(len(model_types), os.cpu_count() or 1)) as executor:
+        futures = [
+            executor.submit(_fit_and_time, model_type, train, test, options.get('hyperparameters'))
+            for model_type in model_types
+        ]
+        return [future.result() for future in futures]
+
+def _fit_and_time(model_type: str, train: List[Dict[str, Any]], test: List[Dict[str, Any]],
+                  hyperparameters: Optional[Dict[str, Any]] = None) -> ModelComparison:
+    start_time = time.time()
+    _, model = _train_model(model_type, train, lambda **update: None, hyperparameters)
+    training_time = (time.time() - start_time) * 1000  # Convert to milliseconds
     
-    # Generate random but realistic metrics for demo purposes
-    # In a real application, these would be calculated from the model evaluation
-    metrics: ModelMetrics = {
+    accuracy = evaluate_model(model, test)['accuracy']
+    
+    start_time = time.time()
+    for record in test:
+        model.predict(record['features'])
+    prediction_latency = (time.time() - start_time) * 1000 / max(len(test), 1)
+    
+    return {
+        'model_type': model_type,
         'accuracy': accuracy,
-        'precision': 0.75 + random.random() * 0.2,
-        'recall': 0.7 + random.random() * 0.25,
-        'f1_score': 0.72 + random.random() * 0.23,
-        'confusion_matrix': [
-            [random.randint(0, 50), random.randint(0, 10)],
-            [random.randint(0, 15), random.randint(0, 45)]
-        ],
-        'bias_metrics': {
-            'gender_bias': random.random() * 0.3,
-            'age_bias': random.random() * 0.25,
-            'location_bias': random.random() * 0.2,
-            'education_bias': random.random() * 0.15,
-            'ethnicity_bias': random.random() * 0.35
+        'training_time': training_time,
+        'prediction_latency': prediction_latency
+    }
+
+def cross_validate(options: TrainingOptions, k: int = 5, stratify: Optional[List[str]] = None,
+                   seed: Optional[int] = None) -> CrossValidationResult:
+    """
+    k-fold cross-validation of options['model_type'], with the folds
+    trained and evaluated in parallel worker processes. Each worker
+    receives the processed records once and every fold as row indices
+    only. The serving models are left untouched.
+    """
+    stratify = TRAINING_STRATIFY if stratify is None else stratify
+    seed = TRAINING_SEED if seed is None else seed
+    
+    raw_data, dataset_version = _bundled_training_data(options['model_type'])
+    processed_data, _ = build_features(raw_data, options['feature_engineering'], dataset_version)
+    strata = stratify_by(processed_data, stratify) if stratify else None
+    folds = kfold_indices(len(processed_data), k, seed, strata)
+    
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=min(k, os.cpu_count() or 1), initializer=_init_fold_worker,
+                             initargs=(processed_data,)) as executor:
+        futures = [
+            executor.submit(_fit_fold, options['model_type'], train_indices, test_indices,
+                            None if seed is None else seed + fold, options.get('hyperparameters'))
+            for fold, (train_indices, test_indices) in enumerate(folds)
+        ]
+        accuracies = [future.result() for future in futures]
+    training_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+    
+    return {
+        'model_type': options['model_type'],
+        'folds': k,
+        'stratify': stratify,
+        'seed': seed,
+        'fold_accuracies': accuracies,
+        'mean_accuracy': float(np.mean(accuracies)),
+        'std_accuracy': float(np.std(accuracies)),
+        'training_time': training_time
+    }
+
+def _init_fold_worker(processed_data: List[Dict[str, Any]]) -> None:
+    global _fold_data
+    _fold_data = processed_data
+
+def _fit_fold(model_type: str, train_indices: np.ndarray, test_indices: np.ndarray, seed: Optional[int],
+              hyperparameters: Optional[Dict[str, Any]] = None) -> float:
+    if seed is not None:
+        # The models draw their initial weights and bootstrap samples from these
+        random.seed(seed)
+        np.random.seed(seed)
+    _, model = _train_model(model_type, take(_fold_data, train_indices), lambda **update: None, hyperparameters)
+    return evaluate_model(model, take(_fold_data, test_indices))['accuracy']
+
+def search_hyperparameters(options: TrainingOptions, strategy: SearchStrategy = 'random',
+                           space: Optional[SearchSpace] = None, trials: int = 20, rungs: int = 3, eta: int = 3,
+                           seed: Optional[int] = None) -> HyperparameterSearchResult:
+    """
+    Searches hyperparameters of options['model_type'] on a train/validation
+    split, running trials in parallel worker processes. The encoded dataset
+    is placed in shared memory once; every trial gets row indices only.
+    
+    Trials train on a growing share of the training rows, one rung at a
+    time, each rung with eta times the rows of the one before and the last
+    with all of them. grid and random trials stop early once their
+    validation accuracy at a rung falls below the median other trials
+    reached there; halving runs every trial rung by rung and keeps the
+    best 1/eta for the next. The serving models are left untouched.
+    """
+    model_type = options['model_type']
+    space = space or DEFAULT_SEARCH_SPACES.get(model_type)
+    if space is None:
+        raise ValueError(f'Hyperparameter search does not support {model_type} models')
+    validate_space(model_type, space)
+    seed = TRAINING_SEED if seed is None else seed
+    
+    if strategy == 'grid':
+        configurations = grid_configurations(space)
+    elif strategy in ('random', 'halving'):
+        configurations = random_configurations(space, trials, seed)
+    else:
+        raise ValueError(f'Unknown search strategy: {strategy}')
+    if not configurations:
+        raise ValueError('Hyperparameter search needs at least one trial')
+    # Pin every value a trial trains with, defaults included
+    configurations = [resolve_hyperparameters(model_type, configuration) for configuration in configurations]
+    fractions = rung_fractions(rungs, eta)
+    
+    raw_data, dataset_version = _bundled_training_data(model_type)
+    processed_data, schema = build_features(raw_data, options['feature_engineering'], dataset_version)
+    vocabulary = LabelVocabulary()
+    labels = vocabulary.encode([record['label'] for record in processed_data])
+    strata = stratify_by(processed_data, TRAINING_STRATIFY) if TRAINING_STRATIFY else None
+    train_indices, validation_indices = split_indices(len(processed_data), options['train_test_split'], seed, strata)
+    
+    results: List[HyperparameterTrial] = [
+        {
+            'trial': trial,
+            'hyperparameters': configuration,
+            'status': 'completed',
+            'rung_accuracies': [],
+            'accuracy': 0.0,
+            'training_fraction': 0.0,
+            'wall_time': 0.0
         }
+        for trial, configuration in enumerate(configurations)
+    ]
+    
+    def run(executor: ProcessPoolExecutor, trial: int, rung: int) -> Future:
+        # Training rows are shuffled already, so each rung's rows extend the previous rung's
+        rows = train_indices[:max(1, int(len(train_indices) * fractions[rung]))]
+        trial_seed = None if seed is None else seed + trial
+        return executor.submit(_fit_trial, model_type, configurations[trial], rows, validation_indices, trial_seed)
+    
+    def record(trial: int, rung: int, future: Future) -> float:
+        accuracy, wall_time = future.result()
+        results[trial]['rung_accuracies'].append(accuracy)
+        results[trial]['accuracy'] = accuracy
+        results[trial]['training_fraction'] = fractions[rung]
+        results[trial]['wall_time'] += wall_time
+        return accuracy
+    
+    dataset = SharedDataset.create(features_to_matrix(processed_data, schema.feature_names), labels)
+    start_time = time.time()
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, min(SEARCH_WORKERS, len(configurations))), initializer=_init_trial_worker,
+                                 initargs=(dataset.spec, schema.feature_names, vocabulary.names)) as executor:
+            if strategy == 'halving':
+                survivors = list(range(len(configurations)))
+                for rung in range(rungs):
+                    futures = {trial: run(executor, trial, rung) for trial in survivors}
+                    for trial, future in futures.items():
+                        record(trial, rung, future)
+                    if rung == rungs - 1:
+                        break
+                    ranked = sorted(survivors, key=lambda trial: results[trial]['accuracy'], reverse=True)
+                    survivors = ranked[:max(1, len(ranked) // eta)]
+                    for trial in ranked[len(survivors):]:
+                        results[trial]['status'] = 'pruned'
+            else:
+                # Trials advance independently; a finished rung is judged
+                # against whatever other trials have reached there so far
+                rung_accuracies: List[List[float]] = [[] for _ in range(rungs)]
+                pending = {run(executor, trial, 0): (trial, 0) for trial in range(len(configurations))}
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        trial, rung = pending.pop(future)
+                        accuracy = record(trial, rung, future)
+                        if rung < rungs - 1:
+                            if should_prune(accuracy, rung_accuracies[rung], SEARCH_PRUNING_MIN_TRIALS):
+                                results[trial]['status'] = 'pruned'
+                            else:
+                                pending[run(executor, trial, rung + 1)] = (trial, rung + 1)
+                        rung_accuracies[rung].append(accuracy)
+    finally:
+        dataset.release()
+    training_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+    
+    completed = [result for result in results if result['status'] == 'completed']
+    best = max(completed, key=lambda result: result['accuracy'])
+    print(f"{strategy} search over {len(results)} {model_type} trials completed in {training_time:.2f}ms, "
+          f"best accuracy {best['accuracy']:.4f} with {best['hyperparameters']}")
+    
+    return {
+        'model_type': model_type,
+        'strategy': strategy,
+        'rungs': rungs,
+        'best_hyperparameters': best['hyperparameters'],
+        'best_accuracy': best['accuracy'],
+        'trials': results,
+        'pruned_trials': len(results) - len(completed),
+        'training_time': training_time
     }
+
+def _init_trial_worker(spec: Tuple[str, int, int], feature_names: List[str], label_names: List[str]) -> None:
+    global _trial_data, _trial_feature_names, _trial_label_names
+    _trial_data = SharedDataset.attach(spec)
+    _trial_feature_names = feature_names
+    _trial_label_names = label_names
+
+def _fit_trial(model_type: str, hyperparameters: Dict[str, Any], train_indices: np.ndarray,
+               validation_indices: np.ndarray, seed: Optional[int]) -> Tuple[float, float]:
+    """
+    Trains one configuration on the given rows of the shared dataset and
+    returns its validation accuracy and wall time in milliseconds
+    """
+    start_time = time.time()
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    features, labels = _trial_data.features, _trial_data.labels
+    train = [
+        {'features': dict(zip(_trial_feature_names, row)), 'label': _trial_label_names[label]}
+        for row, label in zip(features[train_indices].tolist(), labels[train_indices].tolist())
+    ]
+    _, model = _train_model(model_type, train, lambda **update: None, hyperparameters)
     
-    print(f"Model training completed in {training_time:.2f}ms with accuracy: {accuracy:.4f}")
+    predictions = _predict_rows(model, features[validation_indices], _trial_feature_names)
+    predicted_labels = [names[0]['name'] if names else '' for names in predictions]
+    true_labels = [_trial_label_names[label] for label in labels[validation_indices].tolist()]
+    accuracy = sum(predicted == true for predicted, true in zip(predicted_labels, true_labels)) / max(len(true_labels), 1)
+    return accuracy, (time.time() - start_time) * 1000
+
+def install_models(trained: TrainedModels) -> None:
+    """
+    Registers newly trained models. Each is compiled, tabled and warmed
+    up before the registry swaps it in, so the first requests it serves
+    pay no setup cost; requests already running keep the version they
+    started with.
+    """
+    global train_data, test_data
     
-    return metrics
+    with _install_lock:
+        for slot, model in trained['models'].items():
+            # Models go live straight away until there is a live version to compare a
+            # canary with; incremental updates build on the live model, so they always go live
+            canary = slot != 'incremental' and model_registry.live(slot) is not None
+            canary_percent = MODEL_CANARY_PERCENT if canary else 0.0
+            schema = trained['feature_schema']
+            # Compiled once, both to serve and to save: its arrays are what warm starts map from disk
+            compiled = compile_model(model, schema.feature_names if schema else FEATURE_NAMES)
+            version = None
+            if MODEL_PERSISTENCE_ENABLED:
+                version = _save_trained_model(slot, model, trained, compiled, mark_latest=canary_percent == 0)
+            entry = _prepare_version(slot, version or model_registry.next_version(), model, compiled,
+                                     schema, trained['metrics'])
+            # Retired versions never serve again; free their cached predictions
+            for retired in model_registry.register(entry, canary_percent):
+                prediction_cache.drop_version(slot, retired)
+            print(f"Registered {slot} model version {entry.version}" + (f' as a {canary_percent:g}% canary' if canary_percent else ''))
+        
+        train_data = trained['train_data']
+        test_data = trained['test_data']
+    
+    if trained['metrics'] is not None:
+        _log_training_metrics(trained['model_type'], trained['metrics'])
+
+def list_models() -> List[RegisteredModel]:
+    """
+    Gets every registered model version with its role and prediction counters
+    """
+    return model_registry.describe()
+
+def promote_model(name: str, version: str) -> List[RegisteredModel]:
+    """
+    Makes a registered version live, ending its canary; promoting an
+    older version rolls back to it
+    """
+    with _install_lock:
+        model_registry.promote(name, version)
+        # Restarted workers warm-start from the promoted version too
+        if MODEL_PERSISTENCE_ENABLED and os.path.isdir(os.path.join(MODEL_ARTIFACT_DIR, name, version)):
+            set_latest(name, version)
+    return model_registry.describe()
+
+def set_model_canary(name: str, version: str, percent: float) -> List[RegisteredModel]:
+    """
+    Routes percent of a model's traffic to one of its registered versions
+    """
+    model_registry.set_canary(name, version, percent)
+    return model_registry.describe()
+
+def submit_training_job(options: TrainingOptions) -> str:
+    """
+    Queues model training in a background process and returns the job id;
+    the trained model is swapped in when the job succeeds
+    """
+    return training_jobs.submit(options)
+
+def get_training_job(job_id: str) -> Optional[TrainingJobStatus]:
+    """
+    Gets status, progress and (once finished) metrics of a training job
+    """
+    return training_jobs.status(job_id)
 
 def predict_name(demographic: Demographic) -> PredictionResult:
     """
@@ -104,31 +672,292 @@ def predict_name(demographic: Demographic) -> PredictionResult:
     """
     start_time = time.time()
     
-    # Check if any model is trained
-    if not random_forest_model and not gradient_boosting_model and not neural_network_model:
-        raise ValueError('No trained model available. Please train a model first.')
-    
-    # Extract features
-    features = extract_features_from_demographic(demographic)
-    
-    # Make prediction using the best available model
-    predictions = []
-    model_used = ''
-    
-    if neural_network_model:
-        predictions = neural_network_model.predict(features)
-        model_used = 'Neural Network'
-    elif gradient_boosting_model:
-        predictions = gradient_boosting_model.predict(features)
-        model_used = 'Gradient Boosting'
-    elif random_forest_model:
-        predictions = random_forest_model.predict(features)
-        model_used = 'Random Forest'
-    else:
-        raise ValueError('No trained model available')
+    # Pick the version serving this request: the best available model, or its canary
+    entry = model_registry.route()
+    model_used = entry.display_name
+    
+    # Serve from the version's precomputed table when the demographic falls inside it
+    with timed('table_lookup'):
+        predictions = entry.table.lookup(demographic) if entry.table else None
+    if predictions is not None:
+        processing_time = (time.time() - start_time) * 1000
+        increment('predictions_total', model=model_used, source='table')
+        entry.record(processing_time / 1000)
+        return _build_result(predictions, model_used, entry.version, processing_time)
+    
+    try:
+        # Extract features, in the layout the model was trained on
+        with timed('feature_extraction', model=model_used):
+            features = extract_features_from_demographic(demographic, entry.schema)
+        
+        # Make prediction using the selected version, unless a cached one exists
+        cache_key = (entry.name, entry.version, tuple(features.values()))
+        with timed('cache_lookup', model=model_used):
+            predictions = prediction_cache.get(cache_key) if prediction_cache.max_entries > 0 else None
+        if predictions is None:
+            with timed('model_inference', model=model_used):
+                predictions = entry.serving_model.predict(features)
+            if prediction_cache.max_entries > 0:
+                prediction_cache.put(cache_key, predictions)
+            increment('predictions_total', model=model_used, source='model')
+        else:
+            increment('predictions_total', model=model_used, source='cache')
+    except Exception:
+        entry.record_error()
+        raise
     
     end_time = time.time()
     processing_time = (end_time - start_time) * 1000  # Convert to milliseconds
+    entry.record(processing_time / 1000)
+    
+    return _build_result(predictions, model_used, entry.version, processing_time)
+
+def predict_name_batched(demographic: Demographic) -> PredictionResult:
+    """
+    Makes a prediction through the micro-batching queue, sharing one model
+    call with the requests that arrive around the same time
+    """
+    start_time = time.time()
+    
+    # Table hits are cheaper than any batching could make them
+    entry = model_registry.route()
+    with timed('table_lookup'):
+        predictions = entry.table.lookup(demographic) if entry.table else None
+    if predictions is not None:
+        processing_time = (time.time() - start_time) * 1000
+        increment('predictions_total', model=entry.display_name, source='table')
+        entry.record(processing_time / 1000)
+        return _build_result(predictions, entry.display_name, entry.version, processing_time)
+    
+    item = prediction_batcher.submit(demographic).result(timeout=PREDICTION_BATCH_TIMEOUT)
+    if item['error']:
+        raise ValueError(item['error'])
+    
+    # Report the caller's own latency, including its time in the queue
+    result = item['result']
+    result['metadata']['processing_time'] = (time.time() - start_time) * 1000
+    return result
+
+def predict_names_batch(demographics: List[Dict[str, Any]]) -> List[BatchPredictionItem]:
+    """
+    Makes predictions for many demographics with a single model call.
+    Invalid items get an error entry instead of failing the whole batch;
+    results are returned in input order.
+    """
+    start_time = time.time()
+    
+    # The whole batch is served by one version
+    entry = model_registry.route()
+    model_used, schema = entry.display_name, entry.schema
+    
+    items: List[BatchPredictionItem] = [{'index': index, 'result': None, 'error': None} for index in range(len(demographics))]
+    valid_indices: List[int] = []
+    valid_demographics: List[Demographic] = []
+    
+    for index, raw in enumerate(demographics):
+        try:
+            valid_demographics.append(_parse_demographic(raw))
+            valid_indices.append(index)
+        except ValueError as error:
+            items[index]['error'] = str(error)
+    
+    if not valid_demographics:
+        return items
+    
+    # Encode the whole batch into one matrix and run the model once
+    try:
+        with timed('feature_extraction', model=model_used, mode='batch'):
+            features = schema.encode_demographics(valid_demographics) if schema else encode_demographics(valid_demographics)
+        with timed('model_inference', model=model_used, mode='batch'):
+            batch_predictions = _predict_rows(entry.serving_model, features, schema.feature_names if schema else None)
+    except Exception:
+        entry.record_error()
+        raise
+    increment('predictions_total', len(valid_demographics), model=model_used, source='batch')
+    
+    end_time = time.time()
+    # Report each item's share of the batch time
+    processing_time = (end_time - start_time) * 1000 / len(valid_demographics)
+    entry.record(processing_time / 1000, len(valid_demographics))
+    
+    for index, predictions in zip(valid_indices, batch_predictions):
+        items[index]['result'] = _build_result(predictions, model_used, entry.version, processing_time)
+    
+    return items
+
+def get_prediction_table_stats() -> Dict[str, Any]:
+    """
+    Gets size and hit rate of the precomputed prediction table
+    """
+    entry = model_registry.primary()
+    table = entry.table if entry else None
+    if not table:
+        return {'enabled': PREDICTION_TABLE_ENABLED, 'cells': 0, 'hits': 0, 'misses': 0, 'hit_rate': 0.0}
+    return {'enabled': True, 'model_version': entry.version, **table.stats()}
+
+def get_prediction_batching_stats() -> Dict[str, Any]:
+    """
+    Gets queue depth and batch size counters of the micro-batching queue
+    """
+    return {'enabled': PREDICTION_BATCHING_ENABLED, **prediction_batcher.stats()}
+
+def get_prediction_cache_stats() -> Dict[str, Any]:
+    """
+    Gets hit, miss and eviction counters of the prediction cache
+    """
+    return {'registry_generation': model_registry.generation, **prediction_cache.stats()}
+
+def log_predictions(demographics: List[Demographic], results: List[PredictionResult]) -> None:
+    """
+    Queues served predictions for the demographics and names tables: one
+    demographics row per request and one names row per predicted name
+    """
+    if not PREDICTION_LOGGING_ENABLED:
+        return
+    demographic_rows = []
+    name_rows = []
+    for demographic, result in zip(demographics, results):
+        # Ids are generated here so names rows can reference their demographic before it is inserted
+        demographic_id = str(uuid.uuid4())
+        demographic_rows.append({
+            'id': demographic_id,
+            'age': int(round(demographic['age'])),
+            'gender': demographic['gender'],
+            'location': demographic['location'],
+            'education_level': demographic['education_level'],
+            'ethnicity': demographic['ethnicity'],
+        })
+        name_rows.extend(
+            {'name': prediction['name'], 'demographic_id': demographic_id, 'confidence_score': prediction['confidence']}
+            for prediction in result['names']
+        )
+    supabase_writer.enqueue('demographics', demographic_rows)
+    supabase_writer.enqueue('names', name_rows)
+
+def get_writeback_stats() -> Dict[str, Any]:
+    """
+    Gets buffer depth and write counters of the Supabase writer
+    """
+    return {
+        'metrics_logging': METRICS_LOGGING_ENABLED,
+        'prediction_logging': PREDICTION_LOGGING_ENABLED,
+        **supabase_writer.stats(),
+    }
+
+def _log_training_metrics(model_type: str, metrics: ModelMetrics) -> None:
+    """
+    Queues a model_metrics row for a newly installed model
+    """
+    if not METRICS_LOGGING_ENABLED:
+        return
+    supabase_writer.enqueue('model_metrics', [{
+        'model_type': model_type,
+        'accuracy': metrics['accuracy'],
+        'precision': metrics['precision'],
+        'recall': metrics['recall'],
+        'f1_score': metrics['f1_score'],
+        'bias_metrics': metrics['bias_metrics'],
+    }])
+
+def _insert_rows(table: str, rows: List[Dict[str, Any]]) -> None:
+    # Imported here so the supabase package only loads when rows are written
+    from lib.supabase import get_supabase
+    get_supabase().table(table).insert(rows).execute()
+
+def _prepare_version(slot: str, version: str, model: Any, compiled: Any, schema: Optional[FeatureSchema],
+                     metrics: Optional[ModelMetrics]) -> ModelVersion:
+    """
+    Builds everything serving a model version needs before it is swapped
+    in: its prediction table and a warm-up prediction. Predictions run on
+    the compiled form of the model when there is one.
+    """
+    feature_names = schema.feature_names if schema else FEATURE_NAMES
+    serving_model = compiled if compiled is not None and COMPILED_INFERENCE_ENABLED else model
+    encode = schema.encode_demographics if schema else encode_demographics
+    predict_demographics = lambda demographics: _predict_rows(serving_model, encode(demographics), feature_names)
+    display_name = dict(SERVING_ORDER)[slot]
+    
+    table = PredictionTable.build(predict_demographics, display_name) if PREDICTION_TABLE_ENABLED else None
+    # The first call through a model can pay one-off costs (lazy imports, graph
+    # optimization); pay them here rather than in a request
+    serving_model.predict(extract_features_from_demographic(WARM_UP_DEMOGRAPHIC, schema))
+    predict_demographics([WARM_UP_DEMOGRAPHIC])
+    
+    return ModelVersion(slot, version, model, serving_model, schema, display_name, metrics, table)
+
+def _save_trained_model(slot: str, model: Any, trained: TrainedModels, compiled: Any = None,
+                        mark_latest: bool = True) -> Optional[str]:
+    """
+    Saves a newly trained model together with what is needed to serve it,
+    returning its artifact version (None if it could not be saved)
+    """
+    label_names = getattr(model, 'label_names', None) or sorted(set(record['label'] for record in trained['train_data']))
+    schema = trained['feature_schema']
+    feature_names = schema.feature_names if schema else FEATURE_NAMES
+    feature_engineering = schema.feature_engineering if schema else None
+    
+    try:
+        version = save_model(model, slot, feature_names, trained['age_min'], trained['age_max'], label_names,
+                             feature_engineering, compiled=compiled, mark_latest=mark_latest)
+        print(f'Saved {slot} model version {version}')
+        return version
+    except OSError as error:
+        # Serving the freshly trained model matters more than persisting it
+        print(f'Could not save {slot} model: {error}')
+        return None
+
+def _warm_start() -> None:
+    """
+    Registers the latest saved model of each type so a fresh worker can
+    serve without retraining
+    """
+    for slot, _ in SERVING_ORDER:
+        loaded = load_model(slot)
+        if loaded:
+            model, compiled, manifest = loaded
+            entry = _prepare_version(slot, manifest['version'], model, compiled, FeatureSchema.from_manifest(manifest), None)
+            model_registry.register(entry)
+
+def _predict_rows(model: Any, features: np.ndarray, feature_names: Optional[List[str]] = None) -> List[List[NamePrediction]]:
+    """
+    Runs the model over every row of a feature matrix (columns named by
+    feature_names, by default FEATURE_NAMES), using its batch entry point
+    when it has one
+    """
+    predict_batch = getattr(model, 'predict_batch', None)
+    if predict_batch is not None:
+        return predict_batch(features)
+    feature_names = feature_names or FEATURE_NAMES
+    return [model.predict(dict(zip(feature_names, row))) for row in features.tolist()]
+
+def _parse_demographic(raw: Any) -> Demographic:
+    """
+    Validates a raw request item and converts it to a Demographic
+    """
+    if not isinstance(raw, dict):
+        raise ValueError('Demographic must be an object')
+    missing = [key for key in ('age', 'gender', 'location', 'education_level', 'ethnicity') if key not in raw]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+    if isinstance(raw['age'], bool) or not isinstance(raw['age'], (int, float)):
+        raise ValueError('Age must be a number')
+    not_text = [key for key in ('gender', 'location', 'education_level', 'ethnicity') if not isinstance(raw[key], str)]
+    if not_text:
+        raise ValueError(f"Fields must be strings: {', '.join(not_text)}")
+    return {
+        'age': raw['age'],
+        'gender': raw['gender'],
+        'location': raw['location'],
+        'education_level': raw['education_level'],
+        'ethnicity': raw['ethnicity']
+    }
+
+def _build_result(predictions: List[NamePrediction], model_used: str, model_version: str, processing_time: float) -> PredictionResult:
+    # Models list predictions best first; make sure every entry carries its rank
+    predictions = [
+        {'name': prediction['name'], 'confidence': prediction['confidence'], 'rank': rank}
+        for rank, prediction in enumerate(predictions, 1)
+    ]
     
     # Calculate an overall confidence score (weighted average of top predictions)
     overall_confidence = sum(pred['confidence'] * (3 - idx) / 6 for idx, pred in enumerate(predictions))
@@ -141,6 +970,7 @@ def predict_name(demographic: Demographic) -> PredictionResult:
         'metadata': {
             'processing_time': processing_time,
             'model_used': model_used,
+            'model_version': model_version,
             'confidence': overall_confidence,
             'data_quality': data_quality
         }
@@ -150,7 +980,17 @@ def get_dataset_stats() -> DatasetStats:
     """
     Gets dataset statistics
     """
-    # In a real application, this would analyze the actual dataset
+    global dataset_stats
+    if dataset_stats is None and DATASET_STATS_SOURCE:
+        dataset_stats = CachedDatasetStats(source_from_config(DATASET_STATS_SOURCE), DATASET_STATS_REFRESH_INTERVAL)
+    if dataset_stats is not None:
+        return dataset_stats.get()
+    return _sample_dataset_stats()
+
+def _sample_dataset_stats() -> DatasetStats:
+    """
+    Statistics for the bundled sample data, used when no database is configured
+    """
     # For demo purposes, we'll generate realistic statistics
     
     total_records = len(extended_name_data)
@@ -201,4 +1041,35 @@ def get_dataset_stats() -> DatasetStats:
             'Middle Eastern': int(total_records * 0.03),
             'Other': int(total_records * 0.02)
         }
-    } 
\ No newline at end of file
+    }
+
+# Single predictions waiting to share a model call; its thread starts on first use
+prediction_batcher = MicroBatcher(
+    predict_names_batch,
+    window_seconds=float(os.getenv('PREDICTION_BATCH_WINDOW_MS', '2')) / 1000,
+    max_batch_size=int(os.getenv('PREDICTION_BATCH_MAX_SIZE', '64'))
+)
+
+# Rows logged for Supabase, inserted in batches from a background thread
+supabase_writer = BufferedWriter(
+    _insert_rows,
+    max_rows=WRITEBACK_BATCH_SIZE,
+    flush_interval=WRITEBACK_FLUSH_INTERVAL,
+    max_buffered_rows=WRITEBACK_MAX_BUFFERED_ROWS,
+    max_retries=WRITEBACK_MAX_RETRIES
+)
+# Give rows still buffered at shutdown a last chance to be written
+atexit.register(supabase_writer.flush, WRITEBACK_FLUSH_INTERVAL * 5)
+
+# Background training runs in worker processes and installs its result here
+# Finished jobs are kept for status queries up to a count and an age in seconds
+training_jobs = TrainingJobQueue(
+    fit_models,
+    install_models,
+    max_workers=int(os.getenv('TRAINING_WORKERS', '1')),
+    max_finished_jobs=int(os.getenv('TRAINING_JOB_HISTORY', '100')),
+    finished_ttl_seconds=float(os.getenv('TRAINING_JOB_TTL', '3600'))
+)
+
+if MODEL_PERSISTENCE_ENABLED:
+    _warm_start()
@@ -0,0 +1,104 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .instrumentation import increment, observe, set_gauge
+
+class MicroBatcher:
+    """
+    Collects items submitted from many threads and runs them through
+    predict_batch together. A batch closes window_seconds after its first
+    item arrived or once it holds max_batch_size items; while a batch is
+    running, new items queue up for the next one.
+    """
+
+    def __init__(self, predict_batch: Callable[[List[Any]], List[Any]], window_seconds: float = 0.002,
+                 max_batch_size: int = 64, name: str = 'prediction'):
+        self.predict_batch = predict_batch
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self.name = name
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self._queue: 'queue.Queue[Tuple[Any, Future, float]]' = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any) -> Future:
+        """
+        Queues an item; the returned future resolves to its entry of the
+        predict_batch result
+        """
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        set_gauge(f'{self.name}_queue_depth', self._queue.qsize())
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            batches, items, largest_batch = self.batches, self.items, self.largest_batch
+        return {
+            'window_ms': self.window_seconds * 1000,
+            'max_batch_size': self.max_batch_size,
+            'queue_depth': self._queue.qsize(),
+            'batches': batches,
+            'items': items,
+            'mean_batch_size': items / batches if batches else 0.0,
+            'largest_batch': largest_batch,
+        }
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            # Threads do not survive a fork, so a forked server worker starts its own
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=f'{self.name}-batcher', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            start = time.perf_counter()
+            for _, _, enqueued_at in batch:
+                observe(f'{self.name}_batch_wait_seconds', start - enqueued_at)
+            with self._lock:
+                self.batches += 1
+                self.items += len(batch)
+                self.largest_batch = max(self.largest_batch, len(batch))
+            increment(f'{self.name}_batches_total')
+            increment(f'{self.name}_batched_items_total', len(batch))
+            set_gauge(f'{self.name}_batch_size', len(batch))
+            set_gauge(f'{self.name}_queue_depth', self._queue.qsize())
+
+            try:
+                results = self.predict_batch([item for item, _, _ in batch])
+            except Exception as error:
+                for _, future, _ in batch:
+                    future.set_exception(error)
+                continue
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def _next_batch(self) -> List[Tuple[Any, Future, float]]:
+        """
+        Blocks for the first item, then gathers more until the window
+        closes or the batch is full. Items that waited past the window
+        behind a running batch are taken without waiting any longer.
+        """
+        first = self._queue.get()
+        batch = [first]
+        deadline = first[2] + self.window_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
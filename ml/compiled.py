@@ -0,0 +1,357 @@
+import logging
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from types import NamePrediction
+from .instrumentation import increment
+from .preprocessing import FEATURE_NAMES
+from .vocabulary import LabelVocabulary
+
+# Threads used by compiled inference: torch intra-op threads for the
+# network, row chunks scored in parallel for the tree ensembles
+INFERENCE_THREADS = int(os.getenv('INFERENCE_THREADS', str(os.cpu_count() or 1)))
+
+# Rows per chunk when a batch is split across inference threads
+INFERENCE_CHUNK_ROWS = int(os.getenv('INFERENCE_CHUNK_ROWS', '4096'))
+
+# Leave torch alone until start_torch() is called. Set when the app is
+# preloaded in a server master: torch's thread pools do not survive a fork,
+# so networks are traced in each worker after it forks instead
+DEFER_TORCH_INIT = os.getenv('DEFER_TORCH_INIT', 'false').lower() == 'true'
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_torch_configured = False
+_torch_deferred = DEFER_TORCH_INIT
+# Networks built while torch was deferred, traced by start_torch()
+_untraced_networks: 'weakref.WeakSet[CompiledNeuralNetwork]' = weakref.WeakSet()
+
+class CompiledModel:
+    """
+    Batched float32 inference for a trained model. Subclasses implement
+    _scores, returning one score per vocabulary label for every row.
+    """
+
+    # Whether chunks may be scored on the thread pool; torch already
+    # parallelizes a whole batch by itself
+    parallel_chunks = True
+
+    def __init__(self, vocabulary: LabelVocabulary):
+        self.vocabulary = vocabulary
+
+    @property
+    def label_names(self) -> List[str]:
+        return self.vocabulary.names
+
+    def predict_batch(self, features: np.ndarray, top_k: int = 3) -> List[List[NamePrediction]]:
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        chunks = [features[start:start + INFERENCE_CHUNK_ROWS] for start in range(0, len(features), INFERENCE_CHUNK_ROWS)]
+        if len(chunks) > 1 and self.parallel_chunks and INFERENCE_THREADS > 1:
+            results = list(_chunk_executor().map(lambda chunk: self._top_k(chunk, top_k), chunks))
+        else:
+            results = [self._top_k(chunk, top_k) for chunk in chunks]
+        return [predictions for result in results for predictions in result]
+
+    def predict(self, features: Dict[str, float]) -> List[NamePrediction]:
+        # Feature dicts list their columns in schema order
+        row = np.array([list(features.values())], dtype=np.float32)
+        return self._top_k(row, 3)[0]
+
+    def _top_k(self, features: np.ndarray, top_k: int) -> List[List[NamePrediction]]:
+        return self.vocabulary.top_k(self._scores(features), top_k)
+
+    def _scores(self, features: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+class CompiledNeuralNetwork(CompiledModel):
+    """
+    The two-layer sigmoid network as a frozen TorchScript graph, or as
+    numpy matrix products when torch is unavailable or not started yet
+    """
+
+    parallel_chunks = False
+
+    def __init__(self, vocabulary: LabelVocabulary, weights1: np.ndarray, bias1: np.ndarray,
+                 weights2: np.ndarray, bias2: np.ndarray):
+        super().__init__(vocabulary)
+        self.weights1, self.bias1, self.weights2, self.bias2 = weights1, bias1, weights2, bias2
+        self.graph = None
+        self._trace()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The TorchScript graph does not pickle; it is traced again on load
+        return {**self.__dict__, 'graph': None}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._trace()
+
+    def _trace(self) -> None:
+        if _torch_deferred:
+            _untraced_networks.add(self)
+            return
+        self.graph = _trace_network(self.weights1, self.bias1, self.weights2, self.bias2)
+
+    def _scores(self, features: np.ndarray) -> np.ndarray:
+        if self.graph is not None:
+            import torch
+            with torch.inference_mode():
+                return self.graph(torch.from_numpy(features)).numpy()
+        hidden = _sigmoid(features @ self.weights1 + self.bias1)
+        output = _sigmoid(hidden @ self.weights2 + self.bias2)
+        return _softmax(output)
+
+class CompiledForest(CompiledModel):
+    """
+    Random forest with every tree flattened into shared node arrays; all
+    rows walk all trees at once, one level per step
+    """
+
+    def __init__(self, vocabulary: LabelVocabulary, nodes: 'FlatTrees', n_trees: int):
+        super().__init__(vocabulary)
+        self.nodes = nodes
+        self.n_trees = n_trees
+
+    def _scores(self, features: np.ndarray) -> np.ndarray:
+        leaves = self.nodes.leaves(features)
+        classes = self.nodes.leaf_class[leaves]
+        n_labels = len(self.vocabulary)
+        flat = (np.arange(len(features))[:, None] * n_labels + classes).ravel()
+        votes = np.bincount(flat, minlength=len(features) * n_labels).reshape(len(features), n_labels)
+        return votes.astype(np.float32) / self.n_trees
+
+    def _top_k(self, features: np.ndarray, top_k: int) -> List[List[NamePrediction]]:
+        # Only names that received a vote are candidates, as in the forest's own predict
+        return [
+            [prediction for prediction in predictions if prediction['confidence'] > 0]
+            for predictions in super()._top_k(features, top_k)
+        ]
+
+class CompiledGradientBoosting(CompiledModel):
+    """
+    Gradient boosting with its regression trees flattened into shared node
+    arrays, scored with the model's own distance-based class confidences
+    """
+
+    def __init__(self, vocabulary: LabelVocabulary, nodes: 'FlatTrees', learning_rate: float):
+        super().__init__(vocabulary)
+        self.nodes = nodes
+        self.learning_rate = learning_rate
+
+    def _scores(self, features: np.ndarray) -> np.ndarray:
+        leaves = self.nodes.leaves(features)
+        raw = self.learning_rate * self.nodes.leaf_value[leaves].sum(axis=1)
+        probability = _sigmoid(raw.astype(np.float32))
+        n_labels = len(self.vocabulary)
+        distance = np.abs(np.arange(n_labels, dtype=np.float32) - (probability * n_labels)[:, None])
+        confidences = 1 / (1 + distance)
+        return confidences / confidences.sum(axis=1, keepdims=True)
+
+class FlatTrees:
+    """
+    Decision trees stored as parallel node arrays. Leaves point back at
+    themselves, so walking max_depth steps from the roots always ends on
+    each row's leaf without any per-node branching.
+    """
+
+    def __init__(self, roots: np.ndarray, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 right: np.ndarray, leaf_class: np.ndarray, leaf_value: np.ndarray, max_depth: int):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.leaf_class = leaf_class
+        self.leaf_value = leaf_value
+        self.max_depth = max_depth
+
+    @classmethod
+    def build(cls, roots: List[Dict[str, Any]], feature_names: List[str], vocabulary: Optional[LabelVocabulary] = None) -> 'FlatTrees':
+        """
+        Flattens tree dicts ({'type': 'node', 'feature', 'threshold', 'left',
+        'right'} or {'type': 'leaf', 'prediction' | 'value'}); split
+        features become column indices into feature_names, and leaf
+        predictions are interned into vocabulary when one is given
+        """
+        feature_index = {name: index for index, name in enumerate(feature_names)}
+        feature: List[int] = []
+        threshold: List[float] = []
+        left: List[int] = []
+        right: List[int] = []
+        leaf_class: List[int] = []
+        leaf_value: List[float] = []
+        root_ids: List[int] = []
+        max_depth = 0
+
+        for root in roots:
+            root_id = _append_node(feature, threshold, left, right, leaf_class, leaf_value)
+            root_ids.append(root_id)
+            stack: List[Tuple[Dict[str, Any], int, int]] = [(root, root_id, 0)]
+            while stack:
+                node, node_id, depth = stack.pop()
+                max_depth = max(max_depth, depth)
+                if node['type'] == 'leaf':
+                    left[node_id] = right[node_id] = node_id
+                    if 'prediction' in node and vocabulary is not None:
+                        leaf_class[node_id] = vocabulary.intern(node['prediction'])
+                    leaf_value[node_id] = float(node.get('value', 0.0))
+                    continue
+                feature[node_id] = feature_index[node['feature']]
+                threshold[node_id] = float(node['threshold'])
+                left[node_id] = _append_node(feature, threshold, left, right, leaf_class, leaf_value)
+                right[node_id] = _append_node(feature, threshold, left, right, leaf_class, leaf_value)
+                stack.append((node['left'], left[node_id], depth + 1))
+                stack.append((node['right'], right[node_id], depth + 1))
+
+        return cls(
+            np.array(root_ids, dtype=np.int32),
+            np.array(feature, dtype=np.int32),
+            np.array(threshold, dtype=np.float32),
+            np.array(left, dtype=np.int32),
+            np.array(right, dtype=np.int32),
+            np.array(leaf_class, dtype=np.int32),
+            np.array(leaf_value, dtype=np.float32),
+            max_depth,
+        )
+
+    def leaves(self, features: np.ndarray) -> np.ndarray:
+        """
+        Leaf reached by every row in every tree, shape (n_rows, n_trees)
+        """
+        rows = np.arange(len(features))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(features), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = features[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+def compile_model(model: Any, feature_names: List[str] = FEATURE_NAMES) -> Optional[CompiledModel]:
+    """
+    Converts a trained model into its compiled form, or returns None when
+    the model has no compiled equivalent (it is then served as is).
+    feature_names are the model's input columns, in order.
+
+    Model internals are read by their TypeScript field names, as plain,
+    private (_name), camelCase or _camelCase attributes. A model whose
+    internals cannot be read is counted in model_compile_fallbacks_total
+    and served uncompiled.
+    """
+    kind = type(model).__name__
+    try:
+        if kind == 'NeuralNetwork':
+            return CompiledNeuralNetwork(
+                LabelVocabulary(_attribute(model, 'labels')),
+                np.asarray(_attribute(model, 'weights1'), dtype=np.float32),
+                np.asarray(_attribute(model, 'bias1'), dtype=np.float32),
+                np.asarray(_attribute(model, 'weights2'), dtype=np.float32),
+                np.asarray(_attribute(model, 'bias2'), dtype=np.float32),
+            )
+        if kind == 'RandomForestClassifier':
+            trees = _attribute(model, 'trees')
+            vocabulary = LabelVocabulary()
+            nodes = FlatTrees.build([_attribute(tree, 'root') for tree in trees], feature_names, vocabulary)
+            return CompiledForest(vocabulary, nodes, _attribute(model, 'num_trees'))
+        if kind == 'GradientBoostingClassifier':
+            nodes = FlatTrees.build([_attribute(tree, 'tree') for tree in _attribute(model, 'trees')], feature_names)
+            return CompiledGradientBoosting(LabelVocabulary(_attribute(model, 'unique_labels')), nodes,
+                                            _attribute(model, 'learning_rate'))
+    except (AttributeError, KeyError, TypeError, ValueError) as error:
+        increment('model_compile_fallbacks_total', model=kind)
+        logger.warning('Could not compile %s model, serving it uncompiled: %s', kind, error)
+    return None
+
+def _attribute(obj: Any, name: str) -> Any:
+    """
+    Reads a model field by its snake_case name, also trying the private
+    and camelCase spellings
+    """
+    head, *rest = name.split('_')
+    camel = head + ''.join(part.title() for part in rest)
+    for candidate in dict.fromkeys([name, f'_{name}', camel, f'_{camel}']):
+        if hasattr(obj, candidate):
+            return getattr(obj, candidate)
+    raise AttributeError(f'{type(obj).__name__} has no {name} field')
+
+def _append_node(feature: List[int], threshold: List[float], left: List[int], right: List[int],
+                 leaf_class: List[int], leaf_value: List[float]) -> int:
+    """
+    Appends a blank node and returns its id
+    """
+    feature.append(0)
+    threshold.append(0.0)
+    left.append(-1)
+    right.append(-1)
+    leaf_class.append(0)
+    leaf_value.append(0.0)
+    return len(feature) - 1
+
+def _trace_network(weights1: np.ndarray, bias1: np.ndarray, weights2: np.ndarray, bias2: np.ndarray) -> Any:
+    """
+    Traces the network into a frozen TorchScript graph, or returns None
+    when torch is not installed
+    """
+    try:
+        import torch
+    except ImportError:
+        return None
+    _configure_torch(torch)
+
+    network = torch.nn.Sequential(
+        torch.nn.Linear(weights1.shape[0], weights1.shape[1]),
+        torch.nn.Sigmoid(),
+        torch.nn.Linear(weights2.shape[0], weights2.shape[1]),
+        torch.nn.Sigmoid(),
+        torch.nn.Softmax(dim=1),
+    )
+    with torch.no_grad():
+        # nn.Linear stores weights as (out, in); the model keeps (in, out)
+        network[0].weight.copy_(torch.from_numpy(weights1.T.copy()))
+        network[0].bias.copy_(torch.tensor(bias1))
+        network[2].weight.copy_(torch.from_numpy(weights2.T.copy()))
+        network[2].bias.copy_(torch.tensor(bias2))
+    network.eval()
+
+    graph = torch.jit.trace(network, torch.zeros(1, weights1.shape[0]))
+    return torch.jit.optimize_for_inference(torch.jit.freeze(graph))
+
+def start_torch() -> None:
+    """
+    Ends DEFER_TORCH_INIT: traces the networks built so far, configuring
+    torch's thread pools on the way. Call it in each forked worker.
+    """
+    global _torch_deferred
+    _torch_deferred = False
+    for network in list(_untraced_networks):
+        network._trace()
+    _untraced_networks.clear()
+
+def _configure_torch(torch: Any) -> None:
+    global _torch_configured
+    if _torch_configured:
+        return
+    torch.set_num_threads(INFERENCE_THREADS)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Only settable before torch runs any parallel work
+        pass
+    _torch_configured = True
+
+def _chunk_executor() -> ThreadPoolExecutor:
+    global _executor, _executor_pid
+    # Threads do not survive a fork, so a forked worker starts its own pool
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix='inference')
+        _executor_pid = os.getpid()
+    return _executor
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1 / (1 + np.exp(-x))
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    exp = np.exp(x)
+    return exp / exp.sum(axis=1, keepdims=True)
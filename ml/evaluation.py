@@ -0,0 +1,108 @@
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from types import AveragedScores, BiasMetrics, ModelMetrics
+from .preprocessing import (
+    GENDERS, REGIONS, EDUCATION_LEVELS, AGE_BINS, ETHNICITIES,
+    GENDER_OFFSET, REGION_OFFSET, EDUCATION_OFFSET, AGE_BIN_OFFSET, ETHNICITY_OFFSET,
+)
+
+# Above this many labels the confusion matrix is returned as sparse
+# [true, predicted, count] triplets instead of a dense n x n grid
+DENSE_CONFUSION_LIMIT = 256
+
+# One-hot block (offset, width) of the feature matrix behind each bias metric
+BIAS_GROUPS: Dict[str, Tuple[int, int]] = {
+    'gender_bias': (GENDER_OFFSET, len(GENDERS)),
+    'age_bias': (AGE_BIN_OFFSET, len(AGE_BINS)),
+    'location_bias': (REGION_OFFSET, len(REGIONS)),
+    'education_bias': (EDUCATION_OFFSET, len(EDUCATION_LEVELS)),
+    'ethnicity_bias': (ETHNICITY_OFFSET, len(ETHNICITIES)),
+}
+
+def compute_metrics(true_labels: Sequence[str], predicted_labels: Sequence[str], features: np.ndarray) -> ModelMetrics:
+    """
+    Computes model metrics from top-1 predictions in one vectorized pass.
+
+    precision, recall and f1_score are macro averages over every label seen
+    in either sequence; bias metrics are the gap between the best and worst
+    group accuracy for each demographic attribute, with groups read from
+    the one-hot blocks of the feature matrix.
+    """
+    n = len(true_labels)
+    labels, encoded = np.unique(np.array(list(true_labels) + list(predicted_labels), dtype=str), return_inverse=True)
+    n_labels = len(labels)
+    y_true = encoded[:n]
+    y_pred = encoded[n:]
+    correct = y_true == y_pred
+
+    confusion_matrix, matrix_format = _confusion_matrix(y_true, y_pred, n_labels)
+    macro, micro = _averaged_scores(y_true, y_pred, correct, n_labels)
+
+    bias_metrics: BiasMetrics = {
+        name: _accuracy_gap(features[:, offset:offset + width], correct)
+        for name, (offset, width) in BIAS_GROUPS.items()
+    }
+
+    return {
+        'accuracy': float(correct.mean()) if n else 0.0,
+        'precision': macro['precision'],
+        'recall': macro['recall'],
+        'f1_score': macro['f1_score'],
+        'confusion_matrix': confusion_matrix,
+        'confusion_matrix_format': matrix_format,
+        'labels': labels.tolist(),
+        'macro_average': macro,
+        'micro_average': micro,
+        'bias_metrics': bias_metrics,
+    }
+
+def _confusion_matrix(y_true: np.ndarray, y_pred: np.ndarray, n_labels: int) -> Tuple[List[List[int]], str]:
+    # Each (true, predicted) pair as one flat index
+    pairs = y_true.astype(np.int64) * n_labels + y_pred
+    if n_labels <= DENSE_CONFUSION_LIMIT:
+        return np.bincount(pairs, minlength=n_labels * n_labels).reshape(n_labels, n_labels).tolist(), 'dense'
+
+    cells, counts = np.unique(pairs, return_counts=True)
+    triplets = np.stack([cells // n_labels, cells % n_labels, counts], axis=1)
+    return triplets.tolist(), 'coo'
+
+def _averaged_scores(y_true: np.ndarray, y_pred: np.ndarray, correct: np.ndarray, n_labels: int) -> Tuple[AveragedScores, AveragedScores]:
+    true_positives = np.bincount(y_true[correct], minlength=n_labels).astype(np.float64)
+    predicted_counts = np.bincount(y_pred, minlength=n_labels)
+    true_counts = np.bincount(y_true, minlength=n_labels)
+
+    precision = _safe_divide(true_positives, predicted_counts)
+    recall = _safe_divide(true_positives, true_counts)
+    f1 = _safe_divide(2 * precision * recall, precision + recall)
+
+    macro: AveragedScores = {
+        'precision': float(precision.mean()) if n_labels else 0.0,
+        'recall': float(recall.mean()) if n_labels else 0.0,
+        'f1_score': float(f1.mean()) if n_labels else 0.0,
+    }
+
+    # With exactly one prediction per row, micro precision, recall and F1
+    # all reduce to accuracy
+    accuracy = float(correct.mean()) if len(correct) else 0.0
+    micro: AveragedScores = {'precision': accuracy, 'recall': accuracy, 'f1_score': accuracy}
+
+    return macro, micro
+
+def _accuracy_gap(block: np.ndarray, correct: np.ndarray) -> float:
+    """
+    Largest difference in accuracy between groups of a one-hot block; rows
+    with no column set (e.g. under-18 ages) form a group of their own
+    """
+    if len(correct) == 0:
+        return 0.0
+    width = block.shape[1]
+    groups = np.where(block.any(axis=1), block.argmax(axis=1), width)
+    totals = np.bincount(groups, minlength=width + 1)
+    hits = np.bincount(groups, weights=correct, minlength=width + 1)
+    accuracies = hits[totals > 0] / totals[totals > 0]
+    return float(accuracies.max() - accuracies.min())
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    result = np.zeros(len(numerator), dtype=np.float64)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
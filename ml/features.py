@@ -0,0 +1,298 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+from types import Demographic, FeatureEngineering
+from .preprocessing import (
+    GENDERS, REGIONS, EDUCATION_LEVELS, AGE_BINS, ETHNICITIES, AGE_BIN_EDGES, FEATURE_NAMES,
+    GENDER_OFFSET, REGION_OFFSET, EDUCATION_OFFSET, AGE_BIN_OFFSET, ETHNICITY_OFFSET, AGE_COLUMN,
+    clean_data,
+)
+
+# Every flag on: the full FEATURE_NAMES layout that engineer_features produces
+FULL_FEATURE_ENGINEERING: FeatureEngineering = {
+    'one_hot_encoding': True,
+    'age_binning': True,
+    'geographic_clustering': True,
+    'cultural_markers': True,
+}
+
+# Encoded column blocks kept across training runs; a block is reused while
+# the dataset version (and, for age-scaled blocks, the age range) is unchanged
+FEATURE_BLOCK_CACHE_SIZE = int(os.getenv('FEATURE_BLOCK_CACHE_SIZE', '64'))
+
+# Demographic attribute -> one value per row
+Columns = Dict[str, np.ndarray]
+
+class FeatureTransform:
+    """
+    Builds one block of feature columns from a single demographic
+    attribute, for the flag combinations enabled accepts
+    """
+
+    def __init__(self, name: str, attribute: str, feature_names: List[str],
+                 encode: Callable[[np.ndarray, Tuple[float, float]], np.ndarray],
+                 enabled: Callable[[FeatureEngineering], bool], uses_age_range: bool = False):
+        self.name = name
+        self.attribute = attribute
+        self.feature_names = feature_names
+        self.encode = encode  # (values, age range) -> float32 block of shape (rows, len(feature_names))
+        self.enabled = enabled
+        self.uses_age_range = uses_age_range
+
+# Registered transforms in column order; a schema takes every enabled one
+FEATURE_TRANSFORMS: List[FeatureTransform] = []
+
+def register_transform(transform: FeatureTransform) -> FeatureTransform:
+    FEATURE_TRANSFORMS.append(transform)
+    return transform
+
+class FeatureBlockCache:
+    """
+    Thread-safe LRU cache of encoded column blocks
+    """
+
+    def __init__(self, max_blocks: int = FEATURE_BLOCK_CACHE_SIZE):
+        self.max_blocks = max_blocks
+        self.hits = 0
+        self.misses = 0
+        self._blocks: 'OrderedDict[Hashable, np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: Hashable, build: Callable[[], np.ndarray]) -> np.ndarray:
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is not None:
+                self._blocks.move_to_end(key)
+                self.hits += 1
+                return block
+            self.misses += 1
+        block = build()
+        # Cached blocks are shared between schemas, so nobody may write to them
+        block.setflags(write=False)
+        with self._lock:
+            self._blocks[key] = block
+            while len(self._blocks) > self.max_blocks:
+                self._blocks.popitem(last=False)
+        return block
+
+block_cache = FeatureBlockCache()
+
+class FeatureSchema:
+    """
+    The feature columns a model was trained on: which transforms, in which
+    order, and the age range the age column was scaled with. Prediction
+    encodes demographics through the same schema, so columns always match.
+    """
+
+    def __init__(self, feature_engineering: Mapping[str, Any], age_min: float, age_max: float):
+        self.feature_engineering = normalize_flags(feature_engineering)
+        self.age_min = age_min
+        self.age_max = age_max
+        self.transforms = [transform for transform in FEATURE_TRANSFORMS if transform.enabled(self.feature_engineering)]
+        self.feature_names = [name for transform in self.transforms for name in transform.feature_names]
+        # (transform, attribute value) -> that transform's columns for one demographic
+        self._row_blocks: Dict[Tuple[str, Any], List[float]] = {}
+
+    def __reduce__(self):
+        # Transforms hold functions; rebuild them from the flags instead of pickling them
+        return FeatureSchema, (self.feature_engineering, self.age_min, self.age_max)
+
+    @classmethod
+    def from_manifest(cls, manifest: Mapping[str, Any]) -> Optional['FeatureSchema']:
+        """
+        The schema recorded in a model artifact manifest, or None for
+        artifacts saved before schemas were recorded
+        """
+        if not manifest.get('feature_engineering'):
+            return None
+        return cls(manifest['feature_engineering'], manifest['age_min'], manifest['age_max'])
+
+    @property
+    def age_range(self) -> Tuple[float, float]:
+        return self.age_min, self.age_max
+
+    def encode_columns(self, columns: Columns, dataset_version: Optional[str] = None) -> np.ndarray:
+        """
+        Encodes demographic columns into a float32 matrix. With a dataset
+        version, each block comes from (or goes into) the block cache.
+        """
+        n = len(columns['age'])
+        blocks = []
+        for transform in self.transforms:
+            values = columns[transform.attribute]
+            build = lambda transform=transform, values=values: transform.encode(values, self.age_range)
+            if dataset_version is None:
+                blocks.append(build())
+                continue
+            key = (dataset_version, transform.name, self.age_range if transform.uses_age_range else None)
+            blocks.append(block_cache.get_or_build(key, build))
+        if not blocks:
+            return np.zeros((n, 0), dtype=np.float32)
+        return np.concatenate(blocks, axis=1)
+
+    def encode_records(self, records: Sequence[Mapping[str, Any]], dataset_version: Optional[str] = None) -> np.ndarray:
+        """
+        Encodes cleaned training records (demographics with educationLevel)
+        """
+        return self.encode_columns(demographic_columns([record['demographic'] for record in records], 'educationLevel'), dataset_version)
+
+    def encode_demographics(self, demographics: Sequence[Demographic]) -> np.ndarray:
+        """
+        Encodes prediction requests into one matrix, for batch prediction
+        """
+        return self.encode_columns(demographic_columns(demographics, 'education_level'))
+
+    def encode_demographic(self, demographic: Demographic) -> Dict[str, float]:
+        """
+        Feature dict of a single prediction request. Every transform reads
+        one attribute, so its columns are memoized per attribute value.
+        """
+        values: List[float] = []
+        for transform in self.transforms:
+            value = demographic[transform.attribute]
+            key = (transform.name, value)
+            block = self._row_blocks.get(key)
+            if block is None:
+                column = np.array([value], dtype=np.float32 if transform.attribute == 'age' else str)
+                block = transform.encode(column, self.age_range)[0].tolist()
+                # Requests can carry arbitrary strings; only remember a bounded number
+                if len(self._row_blocks) < 4096:
+                    self._row_blocks[key] = block
+            values.extend(block)
+        return dict(zip(self.feature_names, values))
+
+def normalize_flags(flags: Optional[Mapping[str, Any]]) -> FeatureEngineering:
+    """
+    Feature engineering flags with missing ones switched on; the camelCase
+    names the web client sends are accepted too
+    """
+    flags = flags or {}
+    aliases = {
+        'one_hot_encoding': 'oneHotEncoding',
+        'age_binning': 'ageBinning',
+        'geographic_clustering': 'geographicClustering',
+        'cultural_markers': 'culturalMarkers',
+    }
+    return {name: bool(flags.get(name, flags.get(alias, True))) for name, alias in aliases.items()}
+
+def build_features(data: List[Dict[str, Any]], feature_engineering: Optional[Mapping[str, Any]],
+                   dataset_version: Optional[str] = None) -> Tuple[List[Dict[str, Any]], FeatureSchema]:
+    """
+    Preprocesses raw records into per-record feature dicts holding only
+    the columns the flags ask for, and returns them with their schema.
+    Records keep a reference to their demographic for bias metrics and
+    stratification, which always look at every demographic group.
+    """
+    cleaned = clean_data(data)
+    ages = [record['demographic']['age'] for record in cleaned]
+    schema = FeatureSchema(feature_engineering, float(min(ages)), float(max(ages)))
+    features = schema.encode_records(cleaned, dataset_version)
+    records = [
+        {'features': dict(zip(schema.feature_names, row)), 'label': record['name'], 'demographic': record['demographic']}
+        for record, row in zip(cleaned, features.tolist())
+    ]
+    return records, schema
+
+def demographic_columns(demographics: Sequence[Mapping[str, Any]], education_key: str) -> Columns:
+    """
+    Column arrays of a list of demographics, keyed by the Demographic
+    attribute names that transforms read
+    """
+    return {
+        'age': np.array([d['age'] for d in demographics], dtype=np.float32),
+        'gender': np.array([d['gender'] for d in demographics], dtype=str),
+        'location': np.array([d['location'] for d in demographics], dtype=str),
+        'education_level': np.array([d[education_key] for d in demographics], dtype=str),
+        'ethnicity': np.array([d['ethnicity'] for d in demographics], dtype=str),
+    }
+
+def _category_codes(categories: List[str], default: Optional[str] = None) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Maps string values to category indices (-1 for unknown values without
+    a default) through a sorted lookup array built once per transform
+    """
+    order = np.argsort(np.array(categories, dtype=str))
+    sorted_categories = np.array(categories, dtype=str)[order]
+    fallback = categories.index(default) if default is not None else -1
+
+    def codes(values: np.ndarray) -> np.ndarray:
+        positions = np.searchsorted(sorted_categories, values).clip(max=len(categories) - 1)
+        return np.where(sorted_categories[positions] == values, order[positions], fallback)
+    return codes
+
+def _one_hot_block(categories: List[str], default: Optional[str] = None) -> Callable[[np.ndarray, Tuple[float, float]], np.ndarray]:
+    category_codes = _category_codes(categories, default)
+
+    def encode(values: np.ndarray, age_range: Tuple[float, float]) -> np.ndarray:
+        block = np.zeros((len(values), len(categories)), dtype=np.float32)
+        codes = category_codes(values)
+        known = np.flatnonzero(codes >= 0)
+        block[known, codes[known]] = 1
+        return block
+    return encode
+
+def _code_block(categories: List[str], default: Optional[str] = None) -> Callable[[np.ndarray, Tuple[float, float]], np.ndarray]:
+    """
+    Single ordinal column: category index scaled to 0-1, unknown values 0
+    """
+    category_codes = _category_codes(categories, default)
+
+    def encode(values: np.ndarray, age_range: Tuple[float, float]) -> np.ndarray:
+        codes = category_codes(values).clip(min=0)
+        return (codes / max(len(categories) - 1, 1)).astype(np.float32)[:, None]
+    return encode
+
+def _age_groups(values: np.ndarray, age_range: Tuple[float, float]) -> np.ndarray:
+    # Same bins as get_age_bin; under-18 rows get no column
+    block = np.zeros((len(values), len(AGE_BINS)), dtype=np.float32)
+    adult = values >= 18
+    block[np.flatnonzero(adult), np.digitize(values[adult], AGE_BIN_EDGES, right=True)] = 1
+    return block
+
+def _age_group_code(values: np.ndarray, age_range: Tuple[float, float]) -> np.ndarray:
+    # Under-18 is 0, then the six bins up to 1
+    codes = np.where(values >= 18, np.digitize(values, AGE_BIN_EDGES, right=True) + 1, 0)
+    return (codes / len(AGE_BINS)).astype(np.float32)[:, None]
+
+def _scaled_age(values: np.ndarray, age_range: Tuple[float, float]) -> np.ndarray:
+    age_min, age_max = age_range
+    if age_max == age_min:
+        return np.full((len(values), 1), 0.5, dtype=np.float32)
+    return ((values - age_min) / (age_max - age_min)).astype(np.float32)[:, None]
+
+# Column names match FEATURE_NAMES, so with every flag on the layout is the full one
+register_transform(FeatureTransform(
+    'gender', 'gender', FEATURE_NAMES[GENDER_OFFSET:REGION_OFFSET], _one_hot_block(GENDERS),
+    lambda flags: flags['one_hot_encoding']))
+register_transform(FeatureTransform(
+    'gender_code', 'gender', ['genderCode'], _code_block(GENDERS),
+    lambda flags: not flags['one_hot_encoding']))
+register_transform(FeatureTransform(
+    'region', 'location', FEATURE_NAMES[REGION_OFFSET:EDUCATION_OFFSET], _one_hot_block(REGIONS),
+    lambda flags: flags['geographic_clustering'] and flags['one_hot_encoding']))
+register_transform(FeatureTransform(
+    'region_code', 'location', ['regionCode'], _code_block(REGIONS),
+    lambda flags: flags['geographic_clustering'] and not flags['one_hot_encoding']))
+register_transform(FeatureTransform(
+    'education', 'education_level', FEATURE_NAMES[EDUCATION_OFFSET:AGE_BIN_OFFSET], _one_hot_block(EDUCATION_LEVELS),
+    lambda flags: flags['one_hot_encoding']))
+register_transform(FeatureTransform(
+    'education_code', 'education_level', ['educationCode'], _code_block(EDUCATION_LEVELS),
+    lambda flags: not flags['one_hot_encoding']))
+register_transform(FeatureTransform(
+    'age_group', 'age', FEATURE_NAMES[AGE_BIN_OFFSET:ETHNICITY_OFFSET], _age_groups,
+    lambda flags: flags['age_binning'] and flags['one_hot_encoding']))
+register_transform(FeatureTransform(
+    'age_group_code', 'age', ['ageGroupCode'], _age_group_code,
+    lambda flags: flags['age_binning'] and not flags['one_hot_encoding']))
+register_transform(FeatureTransform(
+    'ethnicity', 'ethnicity', FEATURE_NAMES[ETHNICITY_OFFSET:AGE_COLUMN], _one_hot_block(ETHNICITIES, default='Other'),
+    lambda flags: flags['cultural_markers'] and flags['one_hot_encoding']))
+register_transform(FeatureTransform(
+    'ethnicity_code', 'ethnicity', ['ethnicityCode'], _code_block(ETHNICITIES, default='Other'),
+    lambda flags: flags['cultural_markers'] and not flags['one_hot_encoding']))
+register_transform(FeatureTransform(
+    'age', 'age', FEATURE_NAMES[AGE_COLUMN:], _scaled_age,
+    lambda flags: True, uses_age_range=True))
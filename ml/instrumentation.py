@@ -0,0 +1,165 @@
+import bisect
+import contextlib
+import os
+import threading
+import time
+from typing import ContextManager, Dict, Iterator, List, Tuple
+
+# With metrics disabled every hook below returns immediately
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+
+# Upper bounds (seconds) of the latency buckets, roughly 1-2.5-5 per decade
+LATENCY_BUCKETS = [
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+]
+
+QUANTILES = [0.5, 0.95, 0.99]
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram; quantiles are interpolated within the
+    bucket they fall in, so memory stays constant however many samples
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= target:
+                lower = LATENCY_BUCKETS[index - 1] if index > 0 else 0.0
+                upper = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max
+                estimate = lower + (upper - lower) * (target - seen) / bucket_count
+                # Never report beyond what was actually observed
+                return min(max(estimate, self.min), self.max)
+            seen += bucket_count
+        return self.max
+
+class MetricsRegistry:
+    def __init__(self):
+        self.histograms: Dict[str, Dict[LabelSet, LatencyHistogram]] = {}
+        self.counters: Dict[str, Dict[LabelSet, float]] = {}
+        self.gauges: Dict[str, Dict[LabelSet, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, labels: LabelSet) -> None:
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def increment(self, name: str, amount: float, labels: LabelSet) -> None:
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + amount
+
+    def set_gauge(self, name: str, value: float, labels: LabelSet) -> None:
+        with self._lock:
+            self.gauges.setdefault(name, {})[labels] = value
+
+    def remove(self, labels: LabelSet) -> None:
+        """
+        Drops every series whose labels include all of the given pairs
+        """
+        wanted = set(labels)
+        with self._lock:
+            for metrics in (self.histograms, self.counters, self.gauges):
+                for series in metrics.values():
+                    for series_labels in [key for key in series if wanted.issubset(key)]:
+                        del series[series_labels]
+
+    def render(self) -> str:
+        """
+        Renders every series in the Prometheus text exposition format;
+        latency histograms are exposed as summaries with p50/p95/p99
+        """
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f'# TYPE {name} summary')
+                for labels, histogram in sorted(series.items()):
+                    for q in QUANTILES:
+                        lines.append(f'{name}{_format_labels(labels + (("quantile", str(q)),))} {histogram.quantile(q):.6g}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} {histogram.sum:.6g}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+            for name, series in sorted(self.counters.items()):
+                lines.append(f'# TYPE {name} counter')
+                for labels, value in sorted(series.items()):
+                    lines.append(f'{name}{_format_labels(labels)} {value:.6g}')
+            for name, series in sorted(self.gauges.items()):
+                lines.append(f'# TYPE {name} gauge')
+                for labels, value in sorted(series.items()):
+                    lines.append(f'{name}{_format_labels(labels)} {value:.6g}')
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+
+_disabled = contextlib.nullcontext()
+
+def timed(stage: str, **labels: str) -> ContextManager:
+    """
+    Times a block as one sample of stage_duration_seconds{stage=...}
+    """
+    if not METRICS_ENABLED:
+        return _disabled
+    return _timed('stage_duration_seconds', _label_set(stage=stage, **labels))
+
+def observe(name: str, seconds: float, **labels: str) -> None:
+    if METRICS_ENABLED:
+        registry.observe(name, seconds, _label_set(**labels))
+
+def increment(name: str, amount: float = 1, **labels: str) -> None:
+    if METRICS_ENABLED:
+        registry.increment(name, amount, _label_set(**labels))
+
+def set_gauge(name: str, value: float, **labels: str) -> None:
+    if METRICS_ENABLED:
+        registry.set_gauge(name, value, _label_set(**labels))
+
+def remove_series(**labels: str) -> None:
+    """
+    Drops the series of everything labelled with these values, e.g. a
+    model version that is no longer registered
+    """
+    if METRICS_ENABLED:
+        registry.remove(_label_set(**labels))
+
+def render_metrics() -> str:
+    return registry.render()
+
+@contextlib.contextmanager
+def _timed(name: str, labels: LabelSet) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - start, labels)
+
+def _label_set(**labels: str) -> LabelSet:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
@@ -0,0 +1,125 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from types import TrainingJobStatus, TrainingOptions
+
+class TrainingJobQueue:
+    """
+    Runs training jobs in a process pool so the request that submits one
+    returns immediately. Workers report progress through a shared managed
+    dict; when a job succeeds its result is handed to install in this
+    process, which swaps the new model into serving.
+
+    Finished jobs stay queryable until there are more than
+    max_finished_jobs of them or they are older than finished_ttl_seconds
+    (0 disables the TTL); queued and running jobs are never evicted.
+    """
+
+    def __init__(self, fit: Callable[..., Any], install: Callable[[Any], None], max_workers: int = 1,
+                 max_finished_jobs: int = 100, finished_ttl_seconds: float = 3600):
+        self._fit = fit
+        self._install = install
+        self._max_workers = max_workers
+        self.max_finished_jobs = max_finished_jobs
+        self.finished_ttl_seconds = finished_ttl_seconds
+        self.evictions = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        # Finished job ids, oldest first, with the monotonic time they finished
+        self._finished: 'OrderedDict[str, float]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, options: TrainingOptions) -> str:
+        """
+        Queues a training run and returns its job id
+        """
+        with self._lock:
+            if self._executor is None:
+                # Started on first use so importing the API stays cheap
+                self._manager = multiprocessing.Manager()
+                self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+
+            job_id = uuid.uuid4().hex
+            progress = self._manager.dict()
+            self._jobs[job_id] = {
+                'status': 'queued',
+                'submitted_at': time.time(),
+                'finished_at': None,
+                'progress': progress,
+                'metrics': None,
+                'error': None,
+            }
+            future = self._executor.submit(_run_job, self._fit, options, progress)
+
+        future.add_done_callback(lambda done: self._finish(job_id, done))
+        return job_id
+
+    def status(self, job_id: str) -> Optional[TrainingJobStatus]:
+        with self._lock:
+            self._evict_finished()
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            progress = dict(job['progress'])
+            status = job['status']
+            if status == 'queued' and 'started_at' in progress:
+                status = 'running'
+
+            started_at = progress.get('started_at', job['submitted_at'])
+            finished_at = job['finished_at'] or time.time()
+
+            return {
+                'job_id': job_id,
+                'status': status,
+                'stage': progress.get('stage'),
+                'epochs_total': progress.get('epochs_total'),
+                'epochs_completed': progress.get('epochs_completed'),
+                'elapsed_time': (finished_at - started_at) * 1000,  # Convert to milliseconds
+                'metrics': job['metrics'],
+                'error': job['error'],
+            }
+
+    def _finish(self, job_id: str, future: Future) -> None:
+        error: Optional[str] = None
+        metrics = None
+        try:
+            trained = future.result()
+            self._install(trained)
+            metrics = trained['metrics']
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+
+        with self._lock:
+            job = self._jobs[job_id]
+            job['status'] = 'failed' if error else 'succeeded'
+            job['finished_at'] = time.time()
+            job['metrics'] = metrics
+            job['error'] = error
+            # Keep the last reported progress but drop the managed proxy
+            job['progress'] = dict(job['progress'])
+            self._finished[job_id] = time.monotonic()
+            self._evict_finished()
+
+    def _evict_finished(self) -> None:
+        """
+        Drops the oldest finished jobs past the count limit or the TTL;
+        called with the lock held
+        """
+        now = time.monotonic()
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            expired = self.finished_ttl_seconds and now - finished_at > self.finished_ttl_seconds
+            if len(self._finished) <= self.max_finished_jobs and not expired:
+                break
+            self._finished.popitem(last=False)
+            del self._jobs[job_id]
+            self.evictions += 1
+
+def _run_job(fit: Callable[..., Any], options: TrainingOptions, progress: Any) -> Any:
+    progress['started_at'] = time.time()
+    return fit(options, progress=lambda **update: progress.update(update))
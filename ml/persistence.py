@@ -0,0 +1,146 @@
+import itertools
+import json
+import mmap
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple, TypedDict
+from types import FeatureEngineering
+
+# Bump when the on-disk layout changes; older artifacts are then ignored
+ARTIFACT_FORMAT_VERSION = 2
+
+# Root directory for model artifacts, one sub-directory per model type
+MODEL_ARTIFACT_DIR = os.getenv('MODEL_ARTIFACT_DIR', 'artifacts/models')
+
+# Raw buffers are aligned so arrays mapped from them are aligned too
+BUFFER_ALIGNMENT = 64
+
+_version_sequence = itertools.count(1)
+
+class ArtifactManifest(TypedDict):
+    format_version: int
+    model_type: str
+    version: str
+    created_at: float
+    feature_names: List[str]
+    age_min: float
+    age_max: float
+    label_names: List[str]
+    feature_engineering: Optional[FeatureEngineering]  # flags feature_names were built from; None for the full layout
+    compiled: bool  # whether the artifact holds the model's compiled form
+    buffers: List[Tuple[int, int]]  # (offset, length) of each out-of-band buffer
+
+def save_model(model: Any, model_type: str, feature_names: List[str], age_min: float, age_max: float,
+               label_names: List[str], feature_engineering: Optional[FeatureEngineering] = None,
+               compiled: Optional[Any] = None, mark_latest: bool = True, root: str = MODEL_ARTIFACT_DIR) -> str:
+    """
+    Saves a trained model, and its compiled form (see ml.compiled) when it
+    has one, as a new artifact version and, unless mark_latest is False,
+    marks it latest.
+
+    Both are pickled with protocol 5, so the NumPy arrays of the compiled
+    form are written out-of-band to buffers.bin, which load_model
+    memory-maps. The models themselves keep their weights in Python lists
+    and stay in model.pkl.
+    """
+    buffers: List[pickle.PickleBuffer] = []
+    payload = pickle.dumps({'model': model, 'compiled': compiled}, protocol=5, buffer_callback=buffers.append)
+
+    model_dir = os.path.join(root, model_type)
+    os.makedirs(model_dir, exist_ok=True)
+    # The sequence keeps versions saved by one process within the same second apart
+    version = time.strftime('%Y%m%d%H%M%S') + f'-{os.getpid()}-{next(_version_sequence)}'
+
+    # Write into a temporary directory and rename it into place so readers
+    # never see a half-written artifact
+    staging_dir = tempfile.mkdtemp(prefix='.staging-', dir=model_dir)
+    try:
+        layout = []
+        with open(os.path.join(staging_dir, 'buffers.bin'), 'wb') as f:
+            for buffer in buffers:
+                raw = buffer.raw()
+                padding = -f.tell() % BUFFER_ALIGNMENT
+                f.write(b'\0' * padding)
+                layout.append((f.tell(), raw.nbytes))
+                f.write(raw)
+
+        with open(os.path.join(staging_dir, 'model.pkl'), 'wb') as f:
+            f.write(payload)
+
+        manifest: ArtifactManifest = {
+            'format_version': ARTIFACT_FORMAT_VERSION,
+            'model_type': model_type,
+            'version': version,
+            'created_at': time.time(),
+            'feature_names': feature_names,
+            'age_min': age_min,
+            'age_max': age_max,
+            'label_names': label_names,
+            'feature_engineering': feature_engineering,
+            'compiled': compiled is not None,
+            'buffers': layout,
+        }
+        with open(os.path.join(staging_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+
+        os.rename(staging_dir, os.path.join(model_dir, version))
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    if mark_latest:
+        set_latest(model_type, version, root)
+    return version
+
+def set_latest(model_type: str, version: str, root: str = MODEL_ARTIFACT_DIR) -> None:
+    """
+    Marks a saved version as the one load_model returns by default
+    """
+    _write_atomic(os.path.join(root, model_type, 'LATEST'), version)
+
+def load_model(model_type: str, version: Optional[str] = None,
+               root: str = MODEL_ARTIFACT_DIR) -> Optional[Tuple[Any, Optional[Any], ArtifactManifest]]:
+    """
+    Loads an artifact (the latest one by default) as the model, its
+    compiled form (None if it was saved without one) and the manifest, or
+    returns None if there is none. The compiled form's arrays are mapped
+    read-only from buffers.bin, so every process loading the same
+    artifact shares the same pages.
+    """
+    model_dir = os.path.join(root, model_type)
+    if version is None:
+        try:
+            with open(os.path.join(model_dir, 'LATEST')) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    artifact_dir = os.path.join(model_dir, version)
+    try:
+        with open(os.path.join(artifact_dir, 'manifest.json')) as f:
+            manifest: ArtifactManifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if manifest['format_version'] != ARTIFACT_FORMAT_VERSION:
+        return None
+
+    buffers: List[memoryview] = []
+    if manifest['buffers']:
+        with open(os.path.join(artifact_dir, 'buffers.bin'), 'rb') as f:
+            # The mapping stays alive as long as arrays reference it
+            mapped = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        buffers = [mapped[offset:offset + length] for offset, length in manifest['buffers']]
+
+    with open(os.path.join(artifact_dir, 'model.pkl'), 'rb') as f:
+        payload = pickle.loads(f.read(), buffers=buffers)
+
+    return payload['model'], payload['compiled'], manifest
+
+def _write_atomic(path: str, content: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', dir=os.path.dirname(path))
+    with os.fdopen(fd, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
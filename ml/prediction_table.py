@@ -0,0 +1,114 @@
+import threading
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from types import Demographic, NamePrediction
+from .preprocessing import GENDERS, REGIONS, EDUCATION_LEVELS, AGE_BINS, ETHNICITIES, AGE_BIN_EDGES
+from .vocabulary import LabelVocabulary
+
+# Age bins covered by the table: under-18 plus the six binned groups
+TABLE_AGE_BINS = ['under-18'] + AGE_BINS
+
+# Age used to stand in for every age in a bin when the table is built
+REPRESENTATIVE_AGES = [16, 21, 30, 40, 50, 60, 72]
+
+GENDER_INDEX = {value: index for index, value in enumerate(GENDERS)}
+REGION_INDEX = {value: index for index, value in enumerate(REGIONS)}
+EDUCATION_INDEX = {value: index for index, value in enumerate(EDUCATION_LEVELS)}
+ETHNICITY_INDEX = {value: index for index, value in enumerate(ETHNICITIES)}
+
+TABLE_SHAPE = (len(GENDERS), len(REGIONS), len(EDUCATION_LEVELS), len(TABLE_AGE_BINS), len(ETHNICITIES))
+
+class PredictionTable:
+    """
+    Dense lookup table of a model's top-k predictions for every categorical
+    demographic cell, so serving a prediction is an array index instead of
+    a model forward pass. Age is resolved to its bin.
+    """
+
+    def __init__(self, name_ids: np.ndarray, confidences: np.ndarray, names: List[str], model_used: str):
+        self.name_ids = name_ids  # int32, (n_cells, k), -1 where a cell has fewer than k names
+        self.confidences = confidences  # float32, (n_cells, k)
+        self.names = names
+        self.model_used = model_used
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, predict_demographics: Callable[[List[Demographic]], List[List[NamePrediction]]], model_used: str, top_k: int = 3) -> 'PredictionTable':
+        """
+        Runs the model once over every cell of the demographic space;
+        predict_demographics encodes the cells the way the model expects
+        """
+        demographics = [
+            {
+                'age': REPRESENTATIVE_AGES[age_bin],
+                'gender': GENDERS[gender],
+                'location': REGIONS[region],
+                'education_level': EDUCATION_LEVELS[education],
+                'ethnicity': ETHNICITIES[ethnicity],
+            }
+            for gender, region, education, age_bin, ethnicity in np.ndindex(*TABLE_SHAPE)
+        ]
+        batch_predictions = predict_demographics(demographics)
+
+        n_cells = len(demographics)
+        name_ids = np.full((n_cells, top_k), -1, dtype=np.int32)
+        confidences = np.zeros((n_cells, top_k), dtype=np.float32)
+        vocabulary = LabelVocabulary()
+
+        for cell, predictions in enumerate(batch_predictions):
+            for rank, prediction in enumerate(predictions[:top_k]):
+                name_ids[cell, rank] = vocabulary.intern(prediction['name'])
+                confidences[cell, rank] = prediction['confidence']
+
+        return cls(name_ids, confidences, vocabulary.names, model_used)
+
+    def lookup(self, demographic: Demographic) -> Optional[List[NamePrediction]]:
+        """
+        Returns the stored predictions for the demographic's cell, or None
+        when it falls outside the table (unknown category values)
+        """
+        cell = cell_index(demographic)
+        with self._lock:
+            if cell is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        ids = self.name_ids[cell]
+        confidences = self.confidences[cell]
+        return [
+            {'name': self.names[name_id], 'confidence': float(confidence), 'rank': rank + 1}
+            for rank, (name_id, confidence) in enumerate(zip(ids.tolist(), confidences.tolist()))
+            if name_id >= 0
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'cells': int(self.name_ids.shape[0]),
+            'model_used': self.model_used,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total else 0.0,
+        }
+
+def cell_index(demographic: Demographic) -> Optional[int]:
+    """
+    Flat table index of a demographic's categorical cell
+    """
+    gender = GENDER_INDEX.get(demographic['gender'])
+    region = REGION_INDEX.get(demographic['location'])
+    education = EDUCATION_INDEX.get(demographic['education_level'])
+    if gender is None or region is None or education is None:
+        return None
+    # Anything outside the named groups counts as 'Other', as in feature extraction
+    ethnicity = ETHNICITY_INDEX.get(demographic['ethnicity'], ETHNICITY_INDEX['Other'])
+
+    age = demographic['age']
+    age_bin = 0 if age < 18 else 1 + int(np.searchsorted(AGE_BIN_EDGES, age, side='left'))
+
+    return int(np.ravel_multi_index((gender, region, education, age_bin, ethnicity), TABLE_SHAPE))
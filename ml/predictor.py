@@ -1,83 +1,104 @@
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-import pandas as pd
-from typing import Dict, List
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+from types import Demographic, NamePrediction
+from .persistence import ArtifactManifest, load_model
+from .features import FULL_FEATURE_ENGINEERING, Columns, FeatureSchema, demographic_columns
+from .compiled import compile_model
+
+# Demographic attributes a prediction input must provide, as columns or keys
+DEMOGRAPHIC_ATTRIBUTES = ['age', 'gender', 'location', 'education_level', 'ethnicity']
 
 class NamePredictor:
-    def __init__(self):
-        # Initialize your model here
-        # This is a placeholder - you would load your trained model
-        self.model = RandomForestClassifier()
-        self._load_model()
-    
-    def _load_model(self):
+    """
+    Serves a saved model: demographics are encoded with the feature schema
+    the model was trained with, all rows at once, and run through the
+    model in a single batched call
+    """
+
+    def __init__(self, model_type: str = 'randomForest', version: Optional[str] = None, compiled: bool = True):
+        loaded = load_model(model_type, version)
+        if loaded is None:
+            raise ValueError(f'No saved {model_type} model found. Please train a model first.')
+        self.model_type = model_type
+        self.model, saved_compiled, self.manifest = loaded
+        self.schema = self._load_schema(self.manifest)
+        # Batched float32 inference where the model has a compiled form;
+        # the saved one is mapped from disk rather than rebuilt
+        self.compiled = (saved_compiled or compile_model(self.model, self.schema.feature_names)) if compiled else None
+
+    @property
+    def feature_names(self) -> List[str]:
+        return self.schema.feature_names
+
+    @property
+    def version(self) -> str:
+        return self.manifest['version']
+
+    def _load_schema(self, manifest: ArtifactManifest) -> FeatureSchema:
         """
-        Load the trained model and any necessary data
-        In a real implementation, this would load from a saved model file
+        The schema recorded with the model; artifacts saved before schemas
+        were recorded were trained on the full layout
         """
-        # Placeholder for model loading
-        pass
-    
-    def _preprocess_demographic(self, demographic: Dict) -> np.ndarray:
+        schema = FeatureSchema.from_manifest(manifest) or FeatureSchema(FULL_FEATURE_ENGINEERING, manifest['age_min'], manifest['age_max'])
+        if schema.feature_names != manifest['feature_names']:
+            raise ValueError(f"Saved {self.model_type} model expects features {manifest['feature_names']}, not {schema.feature_names}")
+        return schema
+
+    def encode(self, demographics: Any) -> np.ndarray:
         """
-        Convert demographic data into model features
+        Encodes a list of demographic dicts or a DataFrame with one column
+        per attribute into the model's feature matrix
         """
-        # This is a placeholder - implement your actual feature engineering
-        features = np.array([
-            demographic['age'],
-            1 if demographic['gender'] == 'male' else 0,
-            self._encode_location(demographic['location']),
-            self._encode_education(demographic['education_level']),
-            self._encode_ethnicity(demographic['ethnicity'])
-        ]).reshape(1, -1)
-        return features
-    
-    def _encode_location(self, location: str) -> int:
-        locations = {
-            'Northeast': 0,
-            'Midwest': 1,
-            'South': 2,
-            'West': 3
-        }
-        return locations.get(location, 0)
-    
-    def _encode_education(self, education: str) -> int:
-        education_levels = {
-            'high-school': 0,
-            'some-college': 1,
-            'bachelors': 2,
-            'masters': 3,
-            'doctorate': 4,
-            'other': 5
-        }
-        return education_levels.get(education, 0)
-    
-    def _encode_ethnicity(self, ethnicity: str) -> int:
-        ethnicities = {
-            'White': 0,
-            'Black': 1,
-            'Hispanic': 2,
-            'Asian': 3,
-            'Middle Eastern': 4,
-            'Other': 5
-        }
-        return ethnicities.get(ethnicity, 0)
-    
-    def predict(self, demographic: Dict) -> List[Dict]:
+        return self.schema.encode_columns(self._columns(demographics))
+
+    def _columns(self, demographics: Any) -> Columns:
+        if hasattr(demographics, 'columns'):
+            missing = [name for name in DEMOGRAPHIC_ATTRIBUTES if name not in demographics.columns]
+            if missing:
+                raise ValueError(f'Missing demographic columns: {missing}')
+            # Take the DataFrame's columns as they are instead of going through rows
+            return {
+                name: demographics[name].to_numpy(dtype=np.float32 if name == 'age' else str)
+                for name in DEMOGRAPHIC_ATTRIBUTES
+            }
+        for index, demographic in enumerate(demographics):
+            missing = [name for name in DEMOGRAPHIC_ATTRIBUTES if name not in demographic]
+            if missing:
+                raise ValueError(f'Demographic {index} is missing fields: {missing}')
+        return demographic_columns(demographics, 'education_level')
+
+    def predict(self, demographics: Union[Demographic, Sequence[Demographic], Any], top_k: int = 3) -> Union[List[NamePrediction], List[List[NamePrediction]]]:
         """
         Make name predictions based on demographic data
-        Returns a list of dictionaries with name predictions and confidence scores
+        A single demographic dict gets its top_k names with confidence
+        scores; a list or DataFrame of them gets one such list per row
         """
-        features = self._preprocess_demographic(demographic)
-        
-        # This is a placeholder - implement your actual prediction logic
-        # For demonstration, return some dummy predictions
-        dummy_names = [
-            {'name': 'John', 'confidence': 0.85},
-            {'name': 'Michael', 'confidence': 0.75},
-            {'name': 'David', 'confidence': 0.65},
-            {'name': 'James', 'confidence': 0.55},
-            {'name': 'Robert', 'confidence': 0.45}
+        if isinstance(demographics, Mapping):
+            return self.predict_batch([demographics], top_k)[0]
+        return self.predict_batch(demographics, top_k)
+
+    def predict_batch(self, demographics: Any, top_k: int = 3) -> List[List[NamePrediction]]:
+        features = self.encode(demographics)
+        if len(features) == 0:
+            return []
+        if self.compiled is not None:
+            return self.compiled.predict_batch(features, top_k)
+        predict_batch = getattr(self.model, 'predict_batch', None)
+        if predict_batch is not None:
+            return predict_batch(features, top_k)
+        # Models without a batch entry point predict one feature dict at a
+        # time and return their own top names
+        return [
+            self.model.predict(dict(zip(self.feature_names, row)))[:top_k]
+            for row in features.tolist()
         ]
-        
-        return dummy_names 
\ No newline at end of file
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'model_type': self.model_type,
+            'version': self.version,
+            'compiled': self.compiled is not None,
+            'feature_names': self.feature_names,
+            'feature_engineering': self.schema.feature_engineering,
+            'age_range': list(self.schema.age_range),
+        }
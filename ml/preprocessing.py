@@ -1,12 +1,65 @@
-import random
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Sequence, Tuple, TypedDict, Union
+import numpy as np
 from types import Demographic
+from .splitting import split_indices, take
+from .vocabulary import LabelVocabulary
 
-def preprocess_data(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+# Category vocabularies, in the same order as their one-hot columns
+GENDERS = ['male', 'female', 'nonbinary', 'other']
+REGIONS = ['Northeast', 'Midwest', 'South', 'West']
+EDUCATION_LEVELS = ['high-school', 'some-college', 'bachelors', 'masters', 'doctorate', 'other']
+AGE_BINS = ['18-24', '25-34', '35-44', '45-54', '55-64', '65+']
+ETHNICITIES = ['White', 'Black', 'Hispanic', 'Asian', 'Middle Eastern', 'Other']
+
+# Inclusive upper edges of every age bin but the last (see get_age_bin)
+AGE_BIN_EDGES = np.array([24, 34, 44, 54, 64], dtype=np.float32)
+
+# Fixed column order of the feature matrix, identical to the feature dict key order
+FEATURE_NAMES = [
+    'genderMale', 'genderFemale', 'genderNonBinary', 'genderOther',
+    'regionNortheast', 'regionMidwest', 'regionSouth', 'regionWest',
+    'educationHighSchool', 'educationSomeCollege', 'educationBachelors',
+    'educationMasters', 'educationDoctorate', 'educationOther',
+    'ageGroup18To24', 'ageGroup25To34', 'ageGroup35To44',
+    'ageGroup45To54', 'ageGroup55To64', 'ageGroup65Plus',
+    'ethnicityWhite', 'ethnicityBlack', 'ethnicityHispanic',
+    'ethnicityAsian', 'ethnicityMiddleEastern', 'ethnicityOther',
+    'age',
+]
+
+GENDER_OFFSET = 0
+REGION_OFFSET = GENDER_OFFSET + len(GENDERS)
+EDUCATION_OFFSET = REGION_OFFSET + len(REGIONS)
+AGE_BIN_OFFSET = EDUCATION_OFFSET + len(EDUCATION_LEVELS)
+ETHNICITY_OFFSET = AGE_BIN_OFFSET + len(AGE_BINS)
+AGE_COLUMN = ETHNICITY_OFFSET + len(ETHNICITIES)
+
+# One-hot block (offset, width) behind each demographic a split can be stratified by
+STRATIFY_GROUPS: Dict[str, Tuple[int, int]] = {
+    'gender': (GENDER_OFFSET, len(GENDERS)),
+    'location': (REGION_OFFSET, len(REGIONS)),
+    'education': (EDUCATION_OFFSET, len(EDUCATION_LEVELS)),
+    'age': (AGE_BIN_OFFSET, len(AGE_BINS)),
+    'ethnicity': (ETHNICITY_OFFSET, len(ETHNICITIES)),
+}
+
+class EncodedData(TypedDict):
+    features: np.ndarray  # float32, shape (n_records, len(FEATURE_NAMES))
+    labels: np.ndarray  # int32 indices into label_names
+    label_names: List[str]
+    age_min: float
+    age_max: float
+
+def preprocess_data(data: List[Dict[str, Any]], columnar: bool = False) -> Union[List[Dict[str, Any]], EncodedData]:
     """
     Preprocesses demographic data for model training
+
+    With columnar=True the cleaned records are encoded straight into a
+    feature matrix and label vector instead of per-record feature dicts.
     """
     cleaned_data = clean_data(data)
+    if columnar:
+        return encode_features(cleaned_data)
     engineered_data = engineer_features(cleaned_data)
     return normalize_data(engineered_data)
 
@@ -31,6 +84,8 @@ def engineer_features(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Engineers features from demographic data
     """
+    age_bins = [get_age_bin(record['demographic']['age']) for record in data]
+
     return [
         {
             'features': {
@@ -55,12 +110,12 @@ def engineer_features(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
                 'educationOther': 1 if record['demographic']['educationLevel'] == 'other' else 0,
 
                 # Binned age groups
-                'ageGroup18To24': 1 if get_age_bin(record['demographic']['age']) == '18-24' else 0,
-                'ageGroup25To34': 1 if get_age_bin(record['demographic']['age']) == '25-34' else 0,
-                'ageGroup35To44': 1 if get_age_bin(record['demographic']['age']) == '35-44' else 0,
-                'ageGroup45To54': 1 if get_age_bin(record['demographic']['age']) == '45-54' else 0,
-                'ageGroup55To64': 1 if get_age_bin(record['demographic']['age']) == '55-64' else 0,
-                'ageGroup65Plus': 1 if get_age_bin(record['demographic']['age']) == '65+' else 0,
+                'ageGroup18To24': 1 if age_bin == '18-24' else 0,
+                'ageGroup25To34': 1 if age_bin == '25-34' else 0,
+                'ageGroup35To44': 1 if age_bin == '35-44' else 0,
+                'ageGroup45To54': 1 if age_bin == '45-54' else 0,
+                'ageGroup55To64': 1 if age_bin == '55-64' else 0,
+                'ageGroup65Plus': 1 if age_bin == '65+' else 0,
 
                 # Simplified ethnicity groups - in production, this would be more comprehensive
                 'ethnicityWhite': 1 if record['demographic']['ethnicity'] == 'White' else 0,
@@ -75,9 +130,16 @@ def engineer_features(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             },
             'label': record['name'],
         }
-        for record in data
+        for record, age_bin in zip(data, age_bins)
     ]
 
+def get_age_range(data: List[Dict[str, Any]]) -> Tuple[float, float]:
+    """
+    Min and max age of cleaned records, the scale used by normalize_data
+    """
+    ages = [record['demographic']['age'] for record in data]
+    return float(min(ages)), float(max(ages))
+
 def normalize_data(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Normalize numeric features to a 0-1 range
@@ -99,6 +161,119 @@ def normalize_data(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         for record in data
     ]
 
+def encode_features(data: List[Dict[str, Any]], age_range: Optional[Tuple[float, float]] = None,
+                    vocabulary: Optional[LabelVocabulary] = None) -> EncodedData:
+    """
+    Encodes cleaned records into a float32 feature matrix (columns in
+    FEATURE_NAMES order, age min/max scaled) and an integer label vector
+
+    Chunks of a larger dataset are encoded consistently by passing a fixed
+    age_range and a shared vocabulary, which new labels are added to.
+    """
+    n = len(data)
+    features = np.zeros((n, len(FEATURE_NAMES)), dtype=np.float32)
+    vocabulary = vocabulary if vocabulary is not None else LabelVocabulary()
+    if n == 0:
+        return {
+            'features': features,
+            'labels': np.zeros(0, dtype=np.int32),
+            'label_names': list(vocabulary.names),
+            'age_min': age_range[0] if age_range else 0.0,
+            'age_max': age_range[1] if age_range else 0.0,
+        }
+
+    demographics = [record['demographic'] for record in data]
+    rows = np.arange(n)
+
+    _one_hot(features, rows, [d['gender'] for d in demographics], GENDERS, GENDER_OFFSET)
+    _one_hot(features, rows, [d['location'] for d in demographics], REGIONS, REGION_OFFSET)
+    _one_hot(features, rows, [d['educationLevel'] for d in demographics], EDUCATION_LEVELS, EDUCATION_OFFSET)
+    # Anything outside the named groups counts as 'Other', as in engineer_features
+    _one_hot(features, rows, [d['ethnicity'] for d in demographics], ETHNICITIES, ETHNICITY_OFFSET, default='Other')
+
+    ages = features[:, AGE_COLUMN]
+    ages[:] = [d['age'] for d in demographics]
+    _bin_ages(features, rows, ages)
+
+    # Normalize age to 0-1 range in place
+    age_min, age_max = age_range if age_range else (float(ages.min()), float(ages.max()))
+    if age_max == age_min:
+        ages.fill(0.5)
+    else:
+        ages -= age_min
+        ages /= age_max - age_min
+
+    labels = vocabulary.encode([record['name'] for record in data])
+
+    return {
+        'features': features,
+        'labels': labels,
+        'label_names': list(vocabulary.names),
+        'age_min': age_min,
+        'age_max': age_max,
+    }
+
+def features_to_matrix(data: List[Dict[str, Any]], feature_names: Optional[List[str]] = None) -> np.ndarray:
+    """
+    Stacks the feature dicts of processed records into a matrix with
+    columns in feature_names (by default FEATURE_NAMES) order
+    """
+    feature_names = feature_names or FEATURE_NAMES
+    return np.array([[record['features'][name] for name in feature_names] for record in data], dtype=np.float32).reshape(len(data), len(feature_names))
+
+def reference_features(data: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Full FEATURE_NAMES layout of processed records, whichever feature
+    schema they were built with, so bias metrics and stratification can
+    always see every demographic group
+    """
+    if not data or 'demographic' not in data[0]:
+        return features_to_matrix(data)
+    return encode_features([{'demographic': record['demographic'], 'name': record['label']} for record in data])['features']
+
+def encode_demographics(demographics: List[Demographic]) -> np.ndarray:
+    """
+    Encodes demographics for prediction into one feature matrix, with the
+    same columns and age scaling as extract_features_from_demographic
+    """
+    n = len(demographics)
+    features = np.zeros((n, len(FEATURE_NAMES)), dtype=np.float32)
+    if n == 0:
+        return features
+
+    rows = np.arange(n)
+    _one_hot(features, rows, [d['gender'] for d in demographics], GENDERS, GENDER_OFFSET)
+    _one_hot(features, rows, [d['location'] for d in demographics], REGIONS, REGION_OFFSET)
+    _one_hot(features, rows, [d['education_level'] for d in demographics], EDUCATION_LEVELS, EDUCATION_OFFSET)
+    _one_hot(features, rows, [d['ethnicity'] for d in demographics], ETHNICITIES, ETHNICITY_OFFSET, default='Other')
+
+    ages = features[:, AGE_COLUMN]
+    ages[:] = [d['age'] for d in demographics]
+    _bin_ages(features, rows, ages)
+    ages /= 100  # Simple normalization for demo
+
+    return features
+
+def _one_hot(features: np.ndarray, rows: np.ndarray, values: List[str], categories: List[str], offset: int, default: Optional[str] = None) -> None:
+    """
+    Sets the one-hot column of each value; values outside categories (and
+    without a default) leave the whole block at zero
+    """
+    uniques, inverse = np.unique(np.array(values, dtype=str), return_inverse=True)
+    fallback = categories.index(default) if default is not None else -1
+    lookup = np.array([categories.index(u) if u in categories else fallback for u in uniques.tolist()], dtype=np.int64)
+    columns = lookup[inverse]
+    known = columns >= 0
+    features[rows[known], offset + columns[known]] = 1
+
+def _bin_ages(features: np.ndarray, rows: np.ndarray, ages: np.ndarray) -> None:
+    """
+    Sets the age group column for each row; under-18 rows get no column
+    """
+    bins = np.digitize(ages, AGE_BIN_EDGES, right=True)
+    adult = ages >= 18
+    features[rows[adult], AGE_BIN_OFFSET + bins[adult]] = 1
+
 def get_age_bin(age: int) -> str:
     """
     Bins age into standard demographic groups
@@ -118,24 +293,54 @@ def get_age_bin(age: int) -> str:
     else:
         return '65+'
 
-def split_train_test(data: List[Dict[str, Any]], train_ratio: float = 0.8) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+def split_train_test(data: List[Dict[str, Any]], train_ratio: float = 0.8, seed: Optional[int] = None,
+                     stratify: Union[None, str, Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     """
     Splits data into training and testing sets
+
+    The split is drawn over row indices, so records are shared with data
+    rather than copied. stratify takes 'label' and/or demographic group
+    names (see stratify_by); the same seed always gives the same split.
     """
-    # Shuffle the data
-    shuffled = data.copy()
-    random.shuffle(shuffled)
-    
-    train_size = int(len(data) * train_ratio)
-    train_data = shuffled[:train_size]
-    test_data = shuffled[train_size:]
-    
-    return train_data, test_data
+    strata = stratify_by(data, stratify) if stratify else None
+    train_indices, test_indices = split_indices(len(data), train_ratio, seed, strata)
+    return take(data, train_indices), take(data, test_indices)
 
-def extract_features_from_demographic(demographic: Demographic) -> Dict[str, float]:
+def stratify_by(data: List[Dict[str, Any]], by: Union[str, Sequence[str]]) -> np.ndarray:
+    """
+    One integer group code per processed record, combining the label
+    and/or the demographic groups named in by (keys of STRATIFY_GROUPS)
+    """
+    keys = [by] if isinstance(by, str) else list(by)
+    unknown = [key for key in keys if key != 'label' and key not in STRATIFY_GROUPS]
+    if unknown:
+        raise ValueError(f"Unknown stratification keys: {unknown}")
+
+    features = reference_features(data) if any(key != 'label' for key in keys) else None
+    codes = np.zeros(len(data), dtype=np.int64)
+    for key in keys:
+        if key == 'label':
+            _, column = np.unique(np.array([record['label'] for record in data], dtype=str), return_inverse=True)
+            width = int(column.max()) + 1 if len(column) else 1
+        else:
+            offset, width = STRATIFY_GROUPS[key]
+            block = features[:, offset:offset + width]
+            # Rows with an empty block (e.g. under-18 ages) form a group of their own
+            column = np.where(block.any(axis=1), block.argmax(axis=1) + 1, 0)
+            width += 1
+        codes = codes * width + column.reshape(-1)
+    return codes
+
+def extract_features_from_demographic(demographic: Demographic, schema: Any = None) -> Dict[str, float]:
     """
     Extracts features from a single demographic record for prediction
+
+    With the FeatureSchema a model was trained with, the features follow
+    that schema's columns and age scaling instead of the full layout.
     """
+    if schema is not None:
+        return schema.encode_demographic(demographic)
+
     age_bin = get_age_bin(demographic['age'])
     
     return {
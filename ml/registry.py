@@ -0,0 +1,233 @@
+import itertools
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from types import ModelMetrics, ModelVersionStatus, RegisteredModel
+from .instrumentation import LatencyHistogram, increment, observe, remove_series
+from .prediction_table import PredictionTable
+
+class ModelVersion:
+    """
+    One registered version of a named model: the trained model, what its
+    predictions run on, the feature schema it was trained with, and its
+    own prediction counters
+    """
+
+    def __init__(self, name: str, version: str, model: Any, serving_model: Any, schema: Any, display_name: str,
+                 metrics: Optional[ModelMetrics] = None, table: Optional[PredictionTable] = None):
+        self.name = name
+        self.version = version
+        self.model = model
+        self.serving_model = serving_model  # the compiled form of model when there is one
+        self.schema = schema  # FeatureSchema, or None for the full FEATURE_NAMES layout
+        self.display_name = display_name
+        self.metrics = metrics
+        self.table = table
+        self.registered_at = time.time()
+        self.predictions = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+        self._lock = threading.Lock()
+
+    @property
+    def accuracy(self) -> Optional[float]:
+        # Holdout accuracy measured when the version was trained
+        return self.metrics['accuracy'] if self.metrics else None
+
+    def record(self, seconds: float, count: int = 1) -> None:
+        """
+        Counts count predictions served by this version in seconds
+        (per prediction)
+        """
+        with self._lock:
+            self.predictions += count
+            self.latency.observe(seconds)
+        observe('model_prediction_seconds', seconds, model=self.name, version=self.version)
+        increment('model_predictions_total', count, model=self.name, version=self.version)
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+        increment('model_prediction_errors_total', model=self.name, version=self.version)
+
+    def status(self, role: str) -> ModelVersionStatus:
+        with self._lock:
+            return {
+                'version': self.version,
+                'role': role,
+                'registered_at': self.registered_at,
+                'accuracy': self.accuracy,
+                'predictions': self.predictions,
+                'errors': self.errors,
+                'latency_mean': self.latency.sum / self.latency.count * 1000 if self.latency.count else 0.0,
+                'latency_p50': self.latency.quantile(0.5) * 1000,
+                'latency_p95': self.latency.quantile(0.95) * 1000,
+                'latency_p99': self.latency.quantile(0.99) * 1000,
+            }
+
+class RegistryState:
+    """
+    An immutable snapshot of the registry. Writers build a new one and
+    swap it in with a single assignment; readers keep using the snapshot
+    they picked up, so they never see a half-applied change.
+    """
+
+    def __init__(self, versions: Dict[str, Dict[str, ModelVersion]], live: Dict[str, str],
+                 canaries: Dict[str, Tuple[str, float]], generation: int):
+        self.versions = versions  # name -> version -> entry, oldest first
+        self.live = live  # name -> version serving its traffic
+        self.canaries = canaries  # name -> (candidate version, percent of traffic)
+        self.generation = generation  # bumped by every change
+
+    def copy(self) -> 'RegistryState':
+        return RegistryState(
+            {name: dict(versions) for name, versions in self.versions.items()},
+            dict(self.live), dict(self.canaries), self.generation + 1
+        )
+
+class ModelRegistry:
+    """
+    Named, versioned models with read-copy-update swaps. Each name has a
+    live version and optionally a canary version that receives a set
+    percentage of that name's traffic. Requests go to the first name in
+    serving_order that has a live version.
+    """
+
+    def __init__(self, serving_order: List[str], max_versions: int = 3):
+        self.serving_order = serving_order
+        self.max_versions = max_versions
+        self._state = RegistryState({}, {}, {}, 0)
+        self._write_lock = threading.Lock()
+        self._sequence = itertools.count(1)
+
+    @property
+    def generation(self) -> int:
+        return self._state.generation
+
+    def next_version(self) -> str:
+        """
+        A fresh version id for a model that has no artifact version
+        """
+        return time.strftime('%Y%m%d%H%M%S') + f'-{next(self._sequence)}'
+
+    def register(self, entry: ModelVersion, canary_percent: float = 0.0) -> List[str]:
+        """
+        Adds a version. It goes live at once unless canary_percent is set
+        and the name already has a live version; then it becomes that
+        name's canary, replacing any previous one. Returns the versions of
+        the name evicted to make room.
+        """
+        with self._write_lock:
+            state = self._state.copy()
+            state.versions.setdefault(entry.name, {})[entry.version] = entry
+            if canary_percent > 0 and entry.name in state.live:
+                state.canaries[entry.name] = (entry.version, canary_percent)
+            else:
+                state.live[entry.name] = entry.version
+                state.canaries.pop(entry.name, None)
+            evicted = self._evict(state, entry.name)
+            self._state = state
+
+        # Evicted versions never serve again, so their series would only pile up
+        for version in evicted:
+            remove_series(model=entry.name, version=version)
+        return evicted
+
+    def promote(self, name: str, version: str) -> None:
+        """
+        Makes a registered version live (also how to roll back to an older one)
+        """
+        with self._write_lock:
+            state = self._state.copy()
+            self._require(state, name, version)
+            state.live[name] = version
+            if state.canaries.get(name, ('', 0.0))[0] == version:
+                del state.canaries[name]
+            self._state = state
+
+    def set_canary(self, name: str, version: str, percent: float) -> None:
+        """
+        Routes percent of name's traffic to version; 0 stops the canary
+        """
+        if not 0 <= percent <= 100:
+            raise ValueError(f'Canary percent must be between 0 and 100, got {percent}')
+        with self._write_lock:
+            state = self._state.copy()
+            self._require(state, name, version)
+            if percent == 0:
+                state.canaries.pop(name, None)
+            elif state.live.get(name) == version:
+                raise ValueError(f'{name} version {version} is already live')
+            else:
+                state.canaries[name] = (version, percent)
+            self._state = state
+
+    def route(self) -> ModelVersion:
+        """
+        The version that serves the next request
+        """
+        state = self._state
+        for name in self.serving_order:
+            if name not in state.live:
+                continue
+            canary = state.canaries.get(name)
+            if canary is not None and random.random() * 100 < canary[1]:
+                return state.versions[name][canary[0]]
+            return state.versions[name][state.live[name]]
+        raise ValueError('No trained model available. Please train a model first.')
+
+    def primary(self) -> Optional[ModelVersion]:
+        """
+        The live version of the first name in serving order, if any
+        """
+        state = self._state
+        for name in self.serving_order:
+            if name in state.live:
+                return state.versions[name][state.live[name]]
+        return None
+
+    def live(self, name: str) -> Optional[ModelVersion]:
+        state = self._state
+        version = state.live.get(name)
+        return state.versions[name][version] if version is not None else None
+
+    def describe(self) -> List[RegisteredModel]:
+        state = self._state
+        described: List[RegisteredModel] = []
+        for name in self.serving_order:
+            if name not in state.versions:
+                continue
+            canary_version, canary_percent = state.canaries.get(name, (None, 0.0))
+            statuses = []
+            for version, entry in state.versions[name].items():
+                role = 'live' if version == state.live.get(name) else 'canary' if version == canary_version else 'standby'
+                statuses.append(entry.status(role))
+            described.append({
+                'name': name,
+                'live_version': state.live.get(name),
+                'canary_version': canary_version,
+                'canary_percent': canary_percent,
+                'versions': statuses,
+            })
+        return described
+
+    def _require(self, state: RegistryState, name: str, version: str) -> None:
+        if version not in state.versions.get(name, {}):
+            raise ValueError(f'Unknown {name} model version: {version}')
+
+    def _evict(self, state: RegistryState, name: str) -> List[str]:
+        """
+        Drops the oldest standby versions beyond max_versions and returns
+        them; the live and canary versions are always kept
+        """
+        versions = state.versions[name]
+        keep = {state.live.get(name), state.canaries.get(name, (None, 0.0))[0]}
+        evicted = []
+        for version in list(versions):
+            if len(versions) <= self.max_versions:
+                break
+            if version not in keep:
+                del versions[version]
+                evicted.append(version)
+        return evicted
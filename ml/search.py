@@ -0,0 +1,164 @@
+import itertools
+import math
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Mapping, Optional, Tuple, TypedDict, Union
+import numpy as np
+
+# Hyperparameters each model type accepts, with the defaults used when a
+# training request leaves them out (the web client's camelCase names)
+DEFAULT_HYPERPARAMETERS: Dict[str, Dict[str, Union[int, float]]] = {
+    'randomForest': {'numTrees': 20, 'maxDepth': 7},
+    'gradientBoosting': {'numTrees': 15, 'learningRate': 0.1},
+    'neuralNetwork': {'neuronsPerLayer': 15, 'learningRate': 0.05, 'epochs': 200},
+    # lstm and transformer fall back to a larger neural network
+    'lstm': {'neuronsPerLayer': 20, 'learningRate': 0.05, 'epochs': 300},
+    'transformer': {'neuronsPerLayer': 20, 'learningRate': 0.05, 'epochs': 300},
+}
+
+# Searched when a search request brings no space of its own: value lists,
+# or ranges sampled by random search
+DEFAULT_SEARCH_SPACES: Dict[str, Dict[str, Any]] = {
+    'randomForest': {'numTrees': [10, 20, 40], 'maxDepth': [5, 7, 9]},
+    'gradientBoosting': {'numTrees': [10, 15, 30], 'learningRate': [0.05, 0.1, 0.2]},
+    'neuralNetwork': {'neuronsPerLayer': [10, 15, 25], 'learningRate': [0.01, 0.05, 0.1]},
+    'lstm': {'neuronsPerLayer': [15, 20, 30], 'learningRate': [0.01, 0.05, 0.1]},
+    'transformer': {'neuronsPerLayer': [15, 20, 30], 'learningRate': [0.01, 0.05, 0.1]},
+}
+
+# A range to sample from instead of a list of values; log ranges are
+# sampled uniformly in log space
+class SearchRange(TypedDict, total=False):
+    min: float
+    max: float
+    log: bool
+
+SearchSpace = Dict[str, Union[List[Any], SearchRange]]
+
+def resolve_hyperparameters(model_type: str, hyperparameters: Optional[Mapping[str, Any]]) -> Dict[str, Union[int, float]]:
+    """
+    The model type's defaults overridden by the given values, cast to the
+    defaults' types. Names the model type does not use are ignored.
+    """
+    defaults = DEFAULT_HYPERPARAMETERS.get(model_type)
+    if defaults is None:
+        raise ValueError(f'Unknown model type: {model_type}')
+    resolved = dict(defaults)
+    for name, default in defaults.items():
+        value = (hyperparameters or {}).get(name)
+        if value is None:
+            continue
+        try:
+            resolved[name] = int(round(float(value))) if isinstance(default, int) else float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'Hyperparameter {name} must be a number, got {value!r}')
+        if resolved[name] <= 0:
+            raise ValueError(f'Hyperparameter {name} must be positive, got {value!r}')
+    return resolved
+
+def validate_space(model_type: str, space: SearchSpace) -> None:
+    known = DEFAULT_HYPERPARAMETERS.get(model_type)
+    if known is None:
+        raise ValueError(f'Unknown model type: {model_type}')
+    for name, values in space.items():
+        if name not in known:
+            raise ValueError(f'{model_type} has no hyperparameter {name}; searchable: {sorted(known)}')
+        if isinstance(values, Mapping):
+            if 'min' not in values or 'max' not in values or values['min'] > values['max']:
+                raise ValueError(f'Range of {name} needs min <= max')
+            if values.get('log') and values['min'] <= 0:
+                raise ValueError(f'Log range of {name} must be positive')
+        elif not values:
+            raise ValueError(f'No values given for {name}')
+
+def grid_configurations(space: SearchSpace) -> List[Dict[str, Any]]:
+    """
+    Every combination of the listed values
+    """
+    if any(isinstance(values, Mapping) for values in space.values()):
+        raise ValueError('Grid search needs a list of values for every hyperparameter, not a range')
+    names = list(space)
+    return [dict(zip(names, combination)) for combination in itertools.product(*(space[name] for name in names))]
+
+def random_configurations(space: SearchSpace, n: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    n configurations drawn independently: listed values uniformly, ranges
+    uniformly (or log-uniformly)
+    """
+    rng = np.random.default_rng(seed)
+    configurations = []
+    for _ in range(n):
+        configuration: Dict[str, Any] = {}
+        for name, values in space.items():
+            if isinstance(values, Mapping):
+                low, high = float(values['min']), float(values['max'])
+                if values.get('log'):
+                    configuration[name] = float(math.exp(rng.uniform(math.log(low), math.log(high))))
+                else:
+                    configuration[name] = float(rng.uniform(low, high))
+            else:
+                configuration[name] = values[int(rng.integers(len(values)))]
+        configurations.append(configuration)
+    return configurations
+
+def rung_fractions(rungs: int, eta: int) -> List[float]:
+    """
+    Share of the training rows a trial trains on at each rung: the last
+    rung uses all of them, every earlier one 1/eta of the next
+    """
+    if rungs < 1 or eta < 2:
+        raise ValueError('Searches need at least one rung and eta >= 2')
+    return [float(eta) ** (rung - rungs + 1) for rung in range(rungs)]
+
+def should_prune(accuracy: float, rung_accuracies: List[float], min_trials: int) -> bool:
+    """
+    Median stopping: a trial stops once it falls below the median
+    accuracy other trials reached at the same rung
+    """
+    if len(rung_accuracies) < min_trials:
+        return False
+    return accuracy < float(np.median(rung_accuracies))
+
+class SharedDataset:
+    """
+    An encoded dataset (float32 features, int32 labels) in one shared
+    memory block, so worker processes map it instead of each receiving a
+    pickled copy. The creating process owns the block and must unlink it.
+    """
+
+    def __init__(self, block: shared_memory.SharedMemory, n_rows: int, n_features: int):
+        self.block = block
+        self.n_rows = n_rows
+        self.n_features = n_features
+        self.features = np.ndarray((n_rows, n_features), dtype=np.float32, buffer=block.buf)
+        self.labels = np.ndarray((n_rows,), dtype=np.int32, buffer=block.buf, offset=n_rows * n_features * 4)
+
+    @classmethod
+    def create(cls, features: np.ndarray, labels: np.ndarray) -> 'SharedDataset':
+        n_rows, n_features = features.shape
+        # SharedMemory refuses zero-sized blocks
+        block = shared_memory.SharedMemory(create=True, size=max(n_rows * (n_features + 1) * 4, 1))
+        dataset = cls(block, n_rows, n_features)
+        dataset.features[:] = features
+        dataset.labels[:] = labels
+        return dataset
+
+    @classmethod
+    def attach(cls, spec: Tuple[str, int, int]) -> 'SharedDataset':
+        name, n_rows, n_features = spec
+        return cls(shared_memory.SharedMemory(name=name), n_rows, n_features)
+
+    @property
+    def spec(self) -> Tuple[str, int, int]:
+        """
+        What a worker needs to attach: block name and shape
+        """
+        return self.block.name, self.n_rows, self.n_features
+
+    def release(self) -> None:
+        """
+        Closes and removes the block; only the creating process calls this
+        """
+        # Views must go before the buffer they point into can be closed
+        self.features = self.labels = None
+        self.block.close()
+        self.block.unlink()
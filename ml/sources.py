@@ -0,0 +1,229 @@
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypedDict
+
+# Rows fetched per round trip when paging through a table
+DEFAULT_PAGE_SIZE = 1000
+
+# Flat columns of a training row: the name plus its demographic
+TRAINING_COLUMNS = ['name', 'age', 'gender', 'location', 'education_level', 'ethnicity']
+
+class Watermark(TypedDict):
+    # Position of the last names row consumed, in (created_at, id) order
+    created_at: str
+    id: str
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+class SupabaseSource:
+    """
+    Pages through Supabase tables in primary-key order (keyset pagination,
+    so late pages cost the same as early ones)
+    """
+
+    def __init__(self, client: Any = None):
+        self._client = client
+
+    def pages(self, table: str, columns: List[str], page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        client = self._client
+        if client is None:
+            # Imported here so the supabase package only loads when it is used
+            from lib.supabase import get_supabase
+            client = get_supabase()
+
+        select = ','.join(['id'] + [column for column in columns if column != 'id'])
+        last_id: Optional[str] = None
+        while True:
+            query = client.table(table).select(select).order('id').limit(page_size)
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            rows = query.execute().data
+            if not rows:
+                return
+            yield rows
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]['id']
+
+    def training_pages(self, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Pages through names joined with their demographics as flat training rows
+        """
+        # PostgREST embeds the referenced demographics row through the foreign key
+        columns = ['name', 'demographics(age,gender,location,education_level,ethnicity)']
+        for rows in self.pages('names', columns, page_size):
+            yield [{'name': row['name'], **(row.get('demographics') or {})} for row in rows]
+
+    def training_pages_since(self, watermark: Optional[Watermark], page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Pages through training rows of names inserted after the watermark,
+        in (created_at, id) order; every row also carries its id and created_at
+        """
+        client = self._client
+        if client is None:
+            from lib.supabase import get_supabase
+            client = get_supabase()
+
+        select = 'id,created_at,name,demographics(age,gender,location,education_level,ethnicity)'
+        while True:
+            query = client.table('names').select(select).order('created_at').order('id').limit(page_size)
+            if watermark is not None:
+                created_at, last_id = watermark['created_at'], watermark['id']
+                query = query.or_(f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{last_id})')
+            rows = query.execute().data
+            if not rows:
+                return
+            yield [
+                {'id': row['id'], 'created_at': row['created_at'], 'name': row['name'], **(row.get('demographics') or {})}
+                for row in rows
+            ]
+            if len(rows) < page_size:
+                return
+            watermark = {'created_at': rows[-1]['created_at'], 'id': rows[-1]['id']}
+
+class SQLSource:
+    """
+    Pages through tables of a DB-API database, e.g. a local SQLite or
+    Postgres copy of the Supabase schema used for testing
+    """
+
+    def __init__(self, connect: Callable[[], Any], paramstyle: str = 'qmark'):
+        self._connect = connect
+        self._placeholder = '?' if paramstyle == 'qmark' else '%s'
+
+    @classmethod
+    def from_url(cls, url: str) -> 'SQLSource':
+        """
+        Builds a source from 'sqlite:///path/to.db' or 'postgresql://...'
+        """
+        if url.startswith('sqlite:///'):
+            import sqlite3
+            path = url[len('sqlite:///'):]
+            return cls(lambda: sqlite3.connect(path), 'qmark')
+        if url.startswith(('postgresql://', 'postgres://')):
+            import psycopg2
+            return cls(lambda: psycopg2.connect(url), 'pyformat')
+        raise ValueError(f'Unsupported database URL: {url}')
+
+    def pages(self, table: str, columns: List[str], page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        names = ['id'] + [column for column in columns if column != 'id']
+        for name in [table] + names:
+            if not _IDENTIFIER.match(name):
+                raise ValueError(f'Invalid identifier: {name}')
+
+        select = f"SELECT {', '.join(names)} FROM {table}"
+        connection = self._connect()
+        try:
+            cursor = connection.cursor()
+            last_id = None
+            while True:
+                if last_id is None:
+                    cursor.execute(f'{select} ORDER BY id LIMIT {int(page_size)}')
+                else:
+                    cursor.execute(f'{select} WHERE id > {self._placeholder} ORDER BY id LIMIT {int(page_size)}', (last_id,))
+                rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+                if not rows:
+                    return
+                yield rows
+                if len(rows) < page_size:
+                    return
+                last_id = rows[-1]['id']
+        finally:
+            connection.close()
+
+    def training_pages(self, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Pages through names joined with their demographics as flat training rows
+        """
+        select = (
+            'SELECT n.id, n.name, d.age, d.gender, d.location, d.education_level, d.ethnicity '
+            'FROM names n JOIN demographics d ON d.id = n.demographic_id'
+        )
+        connection = self._connect()
+        try:
+            cursor = connection.cursor()
+            last_id = None
+            while True:
+                if last_id is None:
+                    cursor.execute(f'{select} ORDER BY n.id LIMIT {int(page_size)}')
+                else:
+                    cursor.execute(f'{select} WHERE n.id > {self._placeholder} ORDER BY n.id LIMIT {int(page_size)}', (last_id,))
+                rows = cursor.fetchall()
+                if not rows:
+                    return
+                yield [dict(zip(TRAINING_COLUMNS, row[1:])) for row in rows]
+                if len(rows) < page_size:
+                    return
+                last_id = rows[-1][0]
+        finally:
+            connection.close()
+
+    def training_pages_since(self, watermark: Optional[Watermark], page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Pages through training rows of names inserted after the watermark,
+        in (created_at, id) order; every row also carries its id and created_at
+        """
+        select = (
+            'SELECT n.id, n.created_at, n.name, d.age, d.gender, d.location, d.education_level, d.ethnicity '
+            'FROM names n JOIN demographics d ON d.id = n.demographic_id'
+        )
+        after = f'WHERE n.created_at > {self._placeholder} OR (n.created_at = {self._placeholder} AND n.id > {self._placeholder})'
+        columns = ['id', 'created_at'] + TRAINING_COLUMNS
+        connection = self._connect()
+        try:
+            cursor = connection.cursor()
+            while True:
+                if watermark is None:
+                    cursor.execute(f'{select} ORDER BY n.created_at, n.id LIMIT {int(page_size)}')
+                else:
+                    created_at, last_id = watermark['created_at'], watermark['id']
+                    cursor.execute(f'{select} {after} ORDER BY n.created_at, n.id LIMIT {int(page_size)}', (created_at, created_at, last_id))
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                if not rows:
+                    return
+                yield rows
+                if len(rows) < page_size:
+                    return
+                watermark = {'created_at': rows[-1]['created_at'], 'id': rows[-1]['id']}
+        finally:
+            connection.close()
+
+class CSVSource:
+    """
+    Reads flat training rows (TRAINING_COLUMNS) from a CSV file in chunks
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def training_pages(self, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        import pandas as pd
+        for chunk in pd.read_csv(self.path, usecols=TRAINING_COLUMNS, chunksize=page_size):
+            # Missing cells arrive as NaN; clean_data expects them absent
+            yield chunk.astype(object).where(chunk.notna(), None).to_dict('records')
+
+class ParquetSource:
+    """
+    Reads flat training rows (TRAINING_COLUMNS) from a Parquet file one
+    record batch at a time
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def training_pages(self, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(self.path).iter_batches(batch_size=page_size, columns=TRAINING_COLUMNS):
+            yield batch.to_pylist()
+
+def source_from_config(config: str) -> Any:
+    """
+    Resolves a data source setting: 'supabase', a database URL, or a path
+    to a .csv or .parquet file
+    """
+    if config == 'supabase':
+        return SupabaseSource()
+    if config.endswith('.csv'):
+        return CSVSource(config)
+    if config.endswith('.parquet'):
+        return ParquetSource(config)
+    return SQLSource.from_url(config)
@@ -0,0 +1,77 @@
+import logging
+from typing import Any, List, Optional, Sequence, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def split_indices(n: int, train_ratio: float = 0.8, seed: Optional[int] = None,
+                  strata: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Shuffled train and test row indices for n rows.
+
+    With strata (one group code per row) every group is split at
+    train_ratio on its own. Every group keeps at least one training row,
+    so rare labels are never missing from training, and every group of
+    two or more keeps at least one test row; only single-row groups are
+    left out of the test set, and how many is logged.
+    """
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(n)
+    if strata is None:
+        train_size = int(n * train_ratio)
+        return order[:train_size], order[train_size:]
+
+    grouped, counts, rank = _group_ranks(order, strata)
+    train_counts = np.floor(counts * train_ratio + 0.5).astype(np.int64)
+    if train_ratio < 1:
+        train_counts = np.minimum(train_counts, counts - 1)
+    train_counts = np.maximum(train_counts, 1)
+    singletons = int(np.count_nonzero(counts == 1))
+    if singletons and train_ratio < 1:
+        logger.warning('%d of %d strata have a single row and are left out of the test set', singletons, len(counts))
+    in_train = rank < np.repeat(train_counts, counts)
+    # Rows are grouped by stratum here; shuffle them back into a random order
+    return rng.permutation(grouped[in_train]), rng.permutation(grouped[~in_train])
+
+def kfold_indices(n: int, k: int = 5, seed: Optional[int] = None,
+                  strata: Optional[np.ndarray] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    (train, test) row indices for each of k folds; every row is in exactly
+    one test fold. With strata each group is dealt round-robin across the
+    folds from a random starting fold, so folds have matching group mixes.
+    """
+    if not 2 <= k <= n:
+        raise ValueError(f'k must be between 2 and the number of rows ({n}), got {k}')
+
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(n)
+    folds = np.empty(n, dtype=np.int64)
+    if strata is None:
+        folds[order] = np.arange(n) % k
+    else:
+        grouped, counts, rank = _group_ranks(order, strata)
+        start = rng.integers(0, k, len(counts))
+        folds[grouped] = (rank + np.repeat(start, counts)) % k
+
+    rows = np.arange(n)
+    return [(rows[folds != fold], rows[folds == fold]) for fold in range(k)]
+
+def take(data: Sequence[Any], indices: np.ndarray) -> List[Any]:
+    """
+    The records at the given indices; records are shared, not copied
+    """
+    return [data[index] for index in indices.tolist()]
+
+def _group_ranks(order: np.ndarray, strata: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Regroups the shuffled rows by stratum, returning the grouped row
+    indices, the size of each group and each row's rank within its group
+    """
+    _, codes = np.unique(np.asarray(strata), return_inverse=True)
+    codes = codes.reshape(-1)[order]
+    # A stable sort keeps the shuffled order within each group
+    grouped = order[np.argsort(codes, kind='stable')]
+    counts = np.bincount(codes)
+    starts = np.cumsum(counts) - counts
+    rank = np.arange(len(order)) - np.repeat(starts, counts)
+    return grouped, counts, rank
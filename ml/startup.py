@@ -0,0 +1,118 @@
+import importlib.abc
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Record how long every module takes to import and print the slowest ones
+# once the app has loaded (python -X importtime gives the same, unaggregated)
+STARTUP_REPORT_ENABLED = os.getenv('STARTUP_REPORT_ENABLED', 'false').lower() == 'true'
+
+# Modules listed in the startup report, slowest first
+STARTUP_REPORT_TOP = int(os.getenv('STARTUP_REPORT_TOP', '15'))
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """
+    Times the execution of every module imported while installed. Each
+    module gets its cumulative time (including the imports it triggers)
+    and its self time (excluding them).
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.ready_at: Optional[float] = None
+        self.cumulative: Dict[str, float] = {}
+        self.self_time: Dict[str, float] = {}
+        self._local = threading.local()
+
+    def install(self) -> 'ImportTimer':
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname: str, path: Optional[Sequence[str]], target: Any = None) -> Any:
+        # Let the other finders locate the module, then wrap its loader
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    def mark_ready(self) -> None:
+        """
+        Records the end of startup: the time everything up to here took
+        """
+        self.ready_at = time.perf_counter()
+
+    def report(self, top: int = STARTUP_REPORT_TOP) -> Dict[str, Any]:
+        slowest: List[Tuple[str, float]] = sorted(self.cumulative.items(), key=lambda item: item[1], reverse=True)[:top]
+        return {
+            'startup_seconds': (self.ready_at or time.perf_counter()) - self.started_at,
+            'modules_imported': len(self.cumulative),
+            'imports': [
+                {'module': name, 'cumulative_seconds': seconds, 'self_seconds': self.self_time.get(name, 0.0)}
+                for name, seconds in slowest
+            ],
+        }
+
+    def print_report(self, top: int = STARTUP_REPORT_TOP) -> None:
+        report = self.report(top)
+        print(f"Started in {report['startup_seconds'] * 1000:.1f}ms, importing {report['modules_imported']} modules")
+        for entry in report['imports']:
+            print(f"  {entry['module']:<50} {entry['cumulative_seconds'] * 1000:>10.1f}ms {entry['self_seconds'] * 1000:>10.1f}ms self")
+
+    def _run(self, name: str, exec_module: Any, module: Any) -> None:
+        stack: List[float] = self._local.__dict__.setdefault('children', [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.cumulative[name] = elapsed
+            self.self_time[name] = elapsed - children
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, loader: Any, timer: ImportTimer):
+        self._loader = loader
+        self._timer = timer
+
+    def create_module(self, spec: Any) -> Any:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: Any) -> None:
+        self._timer._run(module.__name__, self._loader.exec_module, module)
+
+    def __getattr__(self, name: str) -> Any:
+        # get_data, get_resource_reader and friends go to the real loader
+        return getattr(self._loader, name)
+
+# Installed as soon as this module is imported, so import it first
+import_timer: Optional[ImportTimer] = ImportTimer().install() if STARTUP_REPORT_ENABLED else None
+
+def startup_complete() -> None:
+    """
+    Ends the startup measurement and prints the import report
+    """
+    if import_timer is None:
+        return
+    import_timer.mark_ready()
+    import_timer.uninstall()
+    import_timer.print_report()
+
+def get_startup_report() -> Dict[str, Any]:
+    if import_timer is None:
+        return {'enabled': False}
+    return {'enabled': True, **import_timer.report()}
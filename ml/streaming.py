@@ -0,0 +1,258 @@
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, TypedDict
+import numpy as np
+from types import NamePrediction
+from .preprocessing import EncodedData, FEATURE_NAMES, AGE_COLUMN, clean_data, encode_features
+from .sources import Watermark
+from .vocabulary import LabelVocabulary
+
+# Fixed age scale for chunked encoding; per-chunk min/max would give every
+# chunk a different scale. 0-100 matches extract_features_from_demographic.
+STREAMING_AGE_RANGE = (0.0, 100.0)
+
+# SGD regularization strength and constant step size of the streaming model
+# when a training request leaves them out (the web client's camelCase names)
+STREAMING_HYPERPARAMETERS: Dict[str, float] = {'alpha': 0.0001, 'learningRate': 0.1}
+
+def to_training_record(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converts a flat source row into the record shape clean_data expects
+    """
+    return {
+        'demographic': {
+            'age': row.get('age'),
+            'gender': row.get('gender'),
+            'location': row.get('location'),
+            'educationLevel': row.get('education_level'),
+            'ethnicity': row.get('ethnicity'),
+        },
+        'name': row.get('name'),
+    }
+
+def iter_training_chunks(pages: Iterable[List[Dict[str, Any]]], vocabulary: LabelVocabulary,
+                         age_range: Tuple[float, float] = STREAMING_AGE_RANGE) -> Iterator[EncodedData]:
+    """
+    Cleans and encodes pages of source rows chunk by chunk, with a shared
+    vocabulary and age scale so chunks line up
+    """
+    for rows in pages:
+        records = clean_data([to_training_record(row) for row in rows])
+        if records:
+            yield encode_features(records, age_range=age_range, vocabulary=vocabulary)
+
+def watermarked_pages(source: Any, chunk_size: int, model: 'StreamingClassifier') -> Iterator[List[Dict[str, Any]]]:
+    """
+    Pages through every training row of a source, in (created_at, id)
+    order when the source supports it, moving model.watermark past each
+    page as it is consumed so later updates start after it
+    """
+    if not hasattr(source, 'training_pages_since'):
+        yield from source.training_pages(chunk_size)
+        return
+    for rows in source.training_pages_since(None, chunk_size):
+        yield rows
+        model.watermark = {'created_at': str(rows[-1]['created_at']), 'id': str(rows[-1]['id'])}
+
+def resolve_streaming_hyperparameters(hyperparameters: Optional[Mapping[str, Any]]) -> Dict[str, float]:
+    """
+    STREAMING_HYPERPARAMETERS overridden by the given values; names the
+    streaming model does not use are ignored
+    """
+    resolved = dict(STREAMING_HYPERPARAMETERS)
+    for name in STREAMING_HYPERPARAMETERS:
+        value = (hyperparameters or {}).get(name)
+        if value is None:
+            continue
+        try:
+            resolved[name] = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'Hyperparameter {name} must be a number, got {value!r}')
+        if resolved[name] <= 0:
+            raise ValueError(f'Hyperparameter {name} must be positive, got {value!r}')
+    return resolved
+
+class RunningRange:
+    """
+    Count, mean, min and max of a value seen across many updates, without
+    keeping the values themselves
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def update(self, values: np.ndarray) -> None:
+        if len(values) == 0:
+            return
+        total = self.count + len(values)
+        self.mean += (float(values.mean()) - self.mean) * len(values) / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+class IncrementalUpdate(TypedDict):
+    rows: int
+    new_labels: int
+    watermark: Optional[Watermark]
+    predicted_labels: List[str]  # the model's top prediction for each new row, made before fitting it
+    true_labels: List[str]
+    features: np.ndarray
+
+class StreamingClassifier:
+    """
+    Linear classifier fitted incrementally with partial_fit, so it can be
+    trained on data that never fits in memory at once.
+
+    Steps use a constant learning_rate rather than SGD's default schedule,
+    whose large early steps push probabilities to 0 or 1 and give classes
+    added by an update near-certain scores after a single chunk.
+    """
+
+    def __init__(self, vocabulary: LabelVocabulary, alpha: float = 0.0001, learning_rate: float = 0.1):
+        from sklearn.linear_model import SGDClassifier
+        self.vocabulary = vocabulary
+        self.classes = np.arange(len(vocabulary))
+        self.estimator = SGDClassifier(loss='log_loss', alpha=alpha, learning_rate='constant', eta0=learning_rate)
+        # Last names row trained on and the raw ages seen, for incremental updates
+        self.watermark: Optional[Watermark] = None
+        self.age_stats = RunningRange()
+
+    @property
+    def label_names(self) -> List[str]:
+        return self.vocabulary.names
+
+    @property
+    def fitted(self) -> bool:
+        return getattr(self.estimator, 'coef_', None) is not None
+
+    def partial_fit(self, features: np.ndarray, labels: np.ndarray) -> None:
+        self._grow()
+        if len(self.classes) < 2:
+            # SGD needs two classes before it can fit anything
+            return
+        self.estimator.partial_fit(features, labels, classes=self.classes)
+
+    def _grow(self) -> None:
+        """
+        Adds classes for labels interned into the vocabulary since the last
+        fit, keeping the weights learned for the existing ones
+        """
+        if len(self.vocabulary) == len(self.classes):
+            return
+        self.classes = np.arange(len(self.vocabulary))
+        if not self.fitted:
+            return
+
+        estimator = self.estimator
+        coef, intercept = estimator.coef_, estimator.intercept_
+        if coef.shape[0] == 1:
+            # A binary model keeps one row scoring class 1 against class 0
+            coef = np.vstack([-coef, coef])
+            intercept = np.concatenate([-intercept, intercept])
+        added = len(self.classes) - coef.shape[0]
+        estimator.coef_ = np.vstack([coef, np.zeros((added, coef.shape[1]), dtype=coef.dtype)])
+        # New classes start no more likely than any existing class on any
+        # row: features lie in [0, 1], so an existing class never scores
+        # below its intercept plus its negative weights
+        floor = (intercept + np.minimum(coef, 0).sum(axis=1)).min()
+        estimator.intercept_ = np.concatenate([intercept, np.full(added, floor, dtype=intercept.dtype)])
+        estimator.classes_ = self.classes
+
+    def predict_batch(self, features: np.ndarray, top_k: int = 3) -> List[List[NamePrediction]]:
+        # predict_proba columns follow self.classes, i.e. vocabulary ids
+        return self.vocabulary.top_k(self.estimator.predict_proba(features), top_k)
+
+    def predict(self, features: Dict[str, float]) -> List[NamePrediction]:
+        row = np.array([[features[name] for name in FEATURE_NAMES]], dtype=np.float32)
+        return self.predict_batch(row)[0]
+
+def fit_streaming(source: Any, chunk_size: int = 10000, train_ratio: float = 0.8, seed: Optional[int] = None,
+                  max_holdout_rows: int = 100000, alpha: float = 0.0001,
+                  learning_rate: float = 0.1) -> Tuple[StreamingClassifier, np.ndarray, np.ndarray]:
+    """
+    Trains a StreamingClassifier on a source without materializing it.
+
+    A first pass collects the label vocabulary (partial_fit needs every
+    class up front); the second pass fits chunk by chunk, holding out rows
+    with probability 1 - train_ratio (capped at max_holdout_rows) for
+    evaluation. Returns the model and the held-out features and labels.
+    The model's watermark ends at the last row read, so update_streaming
+    can continue from there. alpha and learning_rate configure the SGD
+    estimator.
+    """
+    vocabulary = LabelVocabulary()
+    for rows in source.training_pages(chunk_size):
+        vocabulary.encode([record['name'] for record in clean_data([to_training_record(row) for row in rows])])
+    if not len(vocabulary):
+        raise ValueError('Training source has no usable records')
+
+    model = StreamingClassifier(vocabulary, alpha, learning_rate)
+    rng = np.random.default_rng(seed)
+    holdout_features: List[np.ndarray] = []
+    holdout_labels: List[np.ndarray] = []
+    holdout_rows = 0
+
+    low, high = STREAMING_AGE_RANGE
+    for chunk in iter_training_chunks(watermarked_pages(source, chunk_size, model), vocabulary):
+        model.age_stats.update(chunk['features'][:, AGE_COLUMN] * (high - low) + low)
+        held_out = rng.random(len(chunk['labels'])) >= train_ratio
+        if holdout_rows >= max_holdout_rows:
+            held_out[:] = False
+        elif held_out.sum() > max_holdout_rows - holdout_rows:
+            # Only keep as many held-out rows as the cap allows; train on the rest
+            held_out[np.flatnonzero(held_out)[max_holdout_rows - holdout_rows:]] = False
+
+        if (~held_out).any():
+            model.partial_fit(chunk['features'][~held_out], chunk['labels'][~held_out])
+        if held_out.any():
+            holdout_features.append(chunk['features'][held_out])
+            holdout_labels.append(chunk['labels'][held_out])
+            holdout_rows += int(held_out.sum())
+
+    features = np.concatenate(holdout_features) if holdout_features else np.zeros((0, len(FEATURE_NAMES)), dtype=np.float32)
+    labels = np.concatenate(holdout_labels) if holdout_labels else np.zeros(0, dtype=np.int32)
+    return model, features, labels
+
+def update_streaming(model: StreamingClassifier, source: Any, chunk_size: int = 10000) -> IncrementalUpdate:
+    """
+    Fits the model on the rows inserted since its watermark, in place,
+    without revisiting older data. Labels not seen before are added as new
+    classes; the age scale stays at STREAMING_AGE_RANGE while the raw ages
+    are tracked in model.age_stats. Each chunk is predicted before it is
+    fitted, so the returned predictions measure the model on unseen rows.
+    """
+    rows_seen = 0
+    labels_before = len(model.vocabulary)
+    predicted_labels: List[str] = []
+    true_labels: List[str] = []
+    features: List[np.ndarray] = []
+
+    for rows in source.training_pages_since(model.watermark, chunk_size):
+        # Advance past every row, including ones clean_data drops
+        last = rows[-1]
+        model.watermark = {'created_at': str(last['created_at']), 'id': str(last['id'])}
+        rows_seen += len(rows)
+
+        records = clean_data([to_training_record(row) for row in rows])
+        if not records:
+            continue
+        chunk = encode_features(records, age_range=STREAMING_AGE_RANGE, vocabulary=model.vocabulary)
+
+        if model.fitted and len(model.classes) >= 2:
+            predictions = model.predict_batch(chunk['features'], top_k=1)
+            predicted_labels.extend(names[0]['name'] if names else '' for names in predictions)
+            true_labels.extend(record['name'] for record in records)
+            features.append(chunk['features'])
+
+        model.age_stats.update(np.array([record['demographic']['age'] for record in records], dtype=np.float64))
+        model.partial_fit(chunk['features'], chunk['labels'])
+
+    return {
+        'rows': rows_seen,
+        'new_labels': len(model.vocabulary) - labels_before,
+        'watermark': model.watermark,
+        'predicted_labels': predicted_labels,
+        'true_labels': true_labels,
+        'features': np.concatenate(features) if features else np.zeros((0, len(FEATURE_NAMES)), dtype=np.float32),
+    }
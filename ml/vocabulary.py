@@ -0,0 +1,72 @@
+from typing import Dict, Iterable, List, Sequence
+import numpy as np
+from types import NamePrediction
+
+class LabelVocabulary:
+    """
+    Interns label names to dense int ids, shared by training (label
+    vectors) and prediction (turning class score arrays into names)
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for name in names:
+            self.intern(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def intern(self, name: str) -> int:
+        label = self._ids.get(name)
+        if label is None:
+            label = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return label
+
+    def encode(self, names: Sequence[str], grow: bool = True) -> np.ndarray:
+        """
+        Maps names to ids, interning unseen ones (or mapping them to -1
+        when grow is False). Each distinct name is looked up only once.
+        """
+        if len(names) == 0:
+            return np.zeros(0, dtype=np.int32)
+        uniques, inverse = np.unique(np.asarray(names, dtype=str), return_inverse=True)
+        if grow:
+            lookup = np.array([self.intern(name) for name in uniques.tolist()], dtype=np.int32)
+        else:
+            lookup = np.array([self._ids.get(name, -1) for name in uniques.tolist()], dtype=np.int32)
+        return lookup[inverse]
+
+    def decode(self, labels: Iterable[int]) -> List[str]:
+        return [self.names[label] for label in labels]
+
+    def top_k(self, scores: np.ndarray, k: int = 3) -> List[List[NamePrediction]]:
+        """
+        Top-k names per row of a (n_rows, n_labels) score array, using a
+        partial selection so only the k winners of each row get sorted
+        """
+        scores = np.atleast_2d(scores)
+        k = min(k, scores.shape[1])
+        if k == 0:
+            return [[] for _ in range(scores.shape[0])]
+
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(k), (scores.shape[0], k))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        return [
+            [
+                {'name': self.names[label], 'confidence': confidence, 'rank': rank + 1}
+                for rank, (label, confidence) in enumerate(zip(row_labels, row_scores))
+            ]
+            for row_labels, row_scores in zip(top.tolist(), top_scores.tolist())
+        ]
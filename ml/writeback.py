@@ -0,0 +1,164 @@
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .instrumentation import increment, observe, set_gauge
+
+class BufferedWriter:
+    """
+    Buffers rows bound for database tables and inserts them from a
+    background thread, one insert per table per flush. A flush happens
+    once max_rows rows are waiting or flush_interval seconds after the
+    oldest one arrived. Failed inserts are retried with exponential
+    backoff; callers never wait on the database.
+    """
+
+    def __init__(self, insert_rows: Callable[[str, List[Dict[str, Any]]], None], max_rows: int = 500,
+                 flush_interval: float = 1.0, max_buffered_rows: int = 10000, max_retries: int = 5,
+                 retry_backoff: float = 0.5, name: str = 'writeback'):
+        self.insert_rows = insert_rows
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self.max_buffered_rows = max_buffered_rows
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.name = name
+        self.written = 0
+        self.dropped = 0
+        self.retries = 0
+        self.flushes = 0
+        self._pending: List[Tuple[str, Dict[str, Any]]] = []
+        self._oldest: Optional[float] = None
+        self._in_flight = 0
+        self._flush_requested = False
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def enqueue(self, table: str, rows: List[Dict[str, Any]]) -> bool:
+        """
+        Buffers rows for table. Returns False, dropping the rows, when the
+        buffer is full because the database has fallen behind.
+        """
+        if not rows:
+            return True
+        self._ensure_worker()
+        with self._condition:
+            if len(self._pending) + len(rows) > self.max_buffered_rows:
+                self.dropped += len(rows)
+                increment(f'{self.name}_dropped_rows_total', len(rows), table=table)
+                return False
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.extend((table, row) for row in rows)
+            set_gauge(f'{self.name}_buffered_rows', len(self._pending))
+            if len(self._pending) >= self.max_rows:
+                self._condition.notify_all()
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Writes everything buffered so far and waits for it, returning
+        False if that took longer than timeout
+        """
+        if self._thread is None or self._pid != os.getpid():
+            return not self._pending
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                'buffered_rows': len(self._pending),
+                'in_flight_rows': self._in_flight,
+                'written_rows': self.written,
+                'dropped_rows': self.dropped,
+                'retries': self.retries,
+                'flushes': self.flushes,
+                'max_rows': self.max_rows,
+                'flush_interval': self.flush_interval,
+            }
+
+    def _ensure_worker(self) -> None:
+        with self._condition:
+            # Threads do not survive a fork, so a forked server worker starts
+            # its own; rows buffered before the fork belong to the parent
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pending = []
+            self._oldest = None
+            self._in_flight = 0
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=f'{self.name}-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            start = time.perf_counter()
+            # Tables are written in the order their rows first arrived, so rows
+            # referencing another table's rows are inserted after them
+            by_table: Dict[str, List[Dict[str, Any]]] = {}
+            for table, row in batch:
+                by_table.setdefault(table, []).append(row)
+            for table, rows in by_table.items():
+                self._write(table, rows)
+            observe(f'{self.name}_flush_seconds', time.perf_counter() - start)
+
+            with self._condition:
+                self._in_flight = 0
+                self.flushes += 1
+                self._condition.notify_all()
+
+    def _next_batch(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Waits until a flush is due and takes everything buffered
+        """
+        with self._condition:
+            while True:
+                if self._pending:
+                    due = self._oldest + self.flush_interval - time.monotonic()
+                    if len(self._pending) >= self.max_rows or self._flush_requested or due <= 0:
+                        break
+                    self._condition.wait(due)
+                else:
+                    self._flush_requested = False
+                    self._condition.wait()
+            batch, self._pending = self._pending, []
+            self._oldest = None
+            self._in_flight = len(batch)
+            set_gauge(f'{self.name}_buffered_rows', 0)
+            return batch
+
+    def _write(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        for start in range(0, len(rows), self.max_rows):
+            chunk = rows[start:start + self.max_rows]
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self.insert_rows(table, chunk)
+                except Exception as error:
+                    if attempt == self.max_retries:
+                        print(f'Dropping {len(chunk)} {table} rows after {attempt + 1} failed inserts: {error}')
+                        with self._condition:
+                            self.dropped += len(chunk)
+                        increment(f'{self.name}_dropped_rows_total', len(chunk), table=table)
+                        break
+                    with self._condition:
+                        self.retries += 1
+                    increment(f'{self.name}_retries_total', table=table)
+                    # Full jitter keeps workers that failed together from retrying together
+                    time.sleep(random.uniform(0, self.retry_backoff * 2 ** attempt))
+                else:
+                    with self._condition:
+                        self.written += len(chunk)
+                    increment(f'{self.name}_written_rows_total', len(chunk), table=table)
+                    break
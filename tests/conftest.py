@@ -0,0 +1,57 @@
+import importlib.util
+import os
+import random
+import sys
+import types
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The repo's types package shares its name with the standard library module,
+# which the interpreter has imported long before any test runs; load the
+# repo's definitions into that module so `from types import ...` finds them
+with open(os.path.join(ROOT, 'types', '__init__.py')) as f:
+    exec(compile(f.read(), f.name, 'exec'), types.__dict__)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Helper interpreters started with -c (e.g. the shared memory resource
+# tracker) would otherwise put the working directory, and the repo's
+# types package with it, ahead of the standard library
+os.environ.setdefault('PYTHONSAFEPATH', '1')
+
+# Settings read when ml.api is imported: no artifacts from a previous run,
+# no Supabase, single-process training
+os.environ.setdefault('MODEL_PERSISTENCE_ENABLED', 'false')
+os.environ.setdefault('TRAINING_SEED', '7')
+os.environ.setdefault('SEARCH_WORKERS', '1')
+os.environ.pop('SUPABASE_URL', None)
+
+# The Python model classes and bundled sample data are not part of this
+# tree; serve the ports of the TypeScript models in their place
+if importlib.util.find_spec('ml.models') is None:
+    import fixture_models
+    fixture_models.install()
+
+ALL_FEATURES = {'one_hot_encoding': True, 'age_binning': True, 'geographic_clustering': True, 'cultural_markers': True}
+
+TRAINING_OPTIONS = {
+    'model_type': 'randomForest',
+    'train_test_split': 0.8,
+    'feature_engineering': ALL_FEATURES,
+    'hyperparameters': {},
+}
+
+@pytest.fixture(scope='session')
+def api():
+    """
+    ml.api with a random forest trained on the sample records
+    """
+    from ml import api
+    random.seed(0)
+    api.train_models(TRAINING_OPTIONS)
+    return api
+
+@pytest.fixture(scope='session')
+def client(api):
+    import app
+    return app.app.test_client()
@@ -0,0 +1,250 @@
+"""
+Python ports of the TypeScript models in src/ml/models, used wherever the
+tests need the model classes ml.api imports. Attributes follow the
+TypeScript fields, snake_cased, with private fields underscored.
+"""
+import math
+import random
+import sys
+import types
+from collections import Counter
+from typing import Any, Dict, List
+
+class DecisionTree:
+    def __init__(self, max_depth: int = 5):
+        self._max_depth = max_depth
+        self._root: Any = None
+
+    def train(self, data: List[Dict[str, Any]]) -> None:
+        self._root = self._build_tree(data, list(data[0]['features']), 0)
+
+    def _build_tree(self, data: List[Dict[str, Any]], features: List[str], depth: int) -> Dict[str, Any]:
+        if depth >= self._max_depth or not data or not features:
+            return self._create_leaf(data)
+        if len(set(item['label'] for item in data)) == 1:
+            return {'type': 'leaf', 'prediction': data[0]['label']}
+        best = random.choice(features)
+        remaining = [feature for feature in features if feature != best]
+        return {
+            'type': 'node',
+            'feature': best,
+            'threshold': 0.5,
+            'left': self._build_tree([item for item in data if item['features'][best] <= 0.5], remaining, depth + 1),
+            'right': self._build_tree([item for item in data if item['features'][best] > 0.5], remaining, depth + 1),
+        }
+
+    def _create_leaf(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if not data:
+            return {'type': 'leaf', 'prediction': 'unknown'}
+        return {'type': 'leaf', 'prediction': Counter(item['label'] for item in data).most_common(1)[0][0]}
+
+    def predict(self, features: Dict[str, float]) -> str:
+        node = self._root
+        while node['type'] != 'leaf':
+            node = node['left'] if features[node['feature']] <= node['threshold'] else node['right']
+        return node['prediction']
+
+class RandomForestClassifier:
+    def __init__(self, num_trees: int = 10, max_depth: int = 5):
+        self._trees: List[DecisionTree] = []
+        self._num_trees = num_trees
+        self._max_depth = max_depth
+        self._unique_labels: set = set()
+
+    def train(self, data: List[Dict[str, Any]]) -> None:
+        self._unique_labels.update(item['label'] for item in data)
+        for _ in range(self._num_trees):
+            tree = DecisionTree(self._max_depth)
+            tree.train([random.choice(data) for _ in data])
+            self._trees.append(tree)
+
+    def predict(self, features: Dict[str, float]) -> List[Dict[str, Any]]:
+        votes: Dict[str, int] = {}
+        for tree in self._trees:
+            prediction = tree.predict(features)
+            votes[prediction] = votes.get(prediction, 0) + 1
+        predictions = sorted(
+            ({'name': name, 'confidence': count / self._num_trees, 'rank': 0} for name, count in votes.items()),
+            key=lambda prediction: -prediction['confidence']
+        )
+        for rank, prediction in enumerate(predictions, 1):
+            prediction['rank'] = rank
+        return predictions[:3]
+
+class SimpleRegressor:
+    def __init__(self):
+        self._tree: Any = None
+
+    def train(self, data: List[Dict[str, Any]]) -> None:
+        self._tree = self._build_tree(data, list(data[0]['features']), 0, 3)
+
+    def _build_tree(self, data: List[Dict[str, Any]], features: List[str], depth: int, max_depth: int) -> Dict[str, Any]:
+        if depth >= max_depth or len(data) <= 5 or not features:
+            return {'type': 'leaf', 'value': self._average(data)}
+        feature = random.choice(features)
+        left = [item for item in data if item['features'][feature] <= 0.5]
+        right = [item for item in data if item['features'][feature] > 0.5]
+        if not left or not right:
+            return {'type': 'leaf', 'value': self._average(data)}
+        return {
+            'type': 'node',
+            'feature': feature,
+            'threshold': 0.5,
+            'left': self._build_tree(left, features, depth + 1, max_depth),
+            'right': self._build_tree(right, features, depth + 1, max_depth),
+        }
+
+    def _average(self, data: List[Dict[str, Any]]) -> float:
+        return sum(item['label'] for item in data) / len(data) if data else 0.0
+
+    def predict(self, features: Dict[str, float]) -> float:
+        node = self._tree
+        while node['type'] != 'leaf':
+            node = node['left'] if features[node['feature']] <= node['threshold'] else node['right']
+        return node['value']
+
+class GradientBoostingClassifier:
+    def __init__(self, num_trees: int = 10, learning_rate: float = 0.1):
+        self._trees: List[SimpleRegressor] = []
+        self._num_trees = num_trees
+        self._learning_rate = learning_rate
+        self._unique_labels: List[str] = []
+        self._label_mapping: Dict[str, int] = {}
+
+    def train(self, data: List[Dict[str, Any]]) -> None:
+        self._unique_labels = list(dict.fromkeys(item['label'] for item in data))
+        self._label_mapping = {label: index for index, label in enumerate(self._unique_labels)}
+        numeric = [{'features': item['features'], 'label': self._label_mapping[item['label']]} for item in data]
+        predictions = [0.0] * len(numeric)
+        for _ in range(self._num_trees):
+            residuals = [item['label'] - _sigmoid(prediction) for item, prediction in zip(numeric, predictions)]
+            tree = SimpleRegressor()
+            tree.train([{'features': item['features'], 'label': residual} for item, residual in zip(numeric, residuals)])
+            predictions = [prediction + self._learning_rate * tree.predict(item['features']) for item, prediction in zip(numeric, predictions)]
+            self._trees.append(tree)
+
+    def predict(self, features: Dict[str, float]) -> List[Dict[str, Any]]:
+        raw = sum(self._learning_rate * tree.predict(features) for tree in self._trees)
+        probability = _sigmoid(raw)
+        n_labels = len(self._unique_labels)
+        predictions = sorted(
+            ({'name': label, 'confidence': 1 / (1 + abs(index - probability * n_labels)), 'rank': 0}
+             for index, label in enumerate(self._unique_labels)),
+            key=lambda prediction: -prediction['confidence']
+        )
+        total = sum(prediction['confidence'] for prediction in predictions)
+        for rank, prediction in enumerate(predictions, 1):
+            prediction['confidence'] /= total
+            prediction['rank'] = rank
+        return predictions[:3]
+
+class NeuralNetwork:
+    def __init__(self, input_size: int, hidden_size: int = 10, learning_rate: float = 0.1):
+        self._input_size = input_size
+        self._hidden_size = hidden_size
+        self._output_size = 0
+        self._weights1: List[List[float]] = []
+        self._weights2: List[List[float]] = []
+        self._bias1: List[float] = []
+        self._bias2: List[float] = []
+        self._learning_rate = learning_rate
+        self._labels: List[str] = []
+
+    def train(self, data: List[Dict[str, Any]], epochs: int = 100) -> None:
+        if not data:
+            return
+        self._labels = list(dict.fromkeys(item['label'] for item in data))
+        self._output_size = len(self._labels)
+        self._weights1 = [[random.random() - 0.5 for _ in range(self._hidden_size)] for _ in range(self._input_size)]
+        self._weights2 = [[random.random() - 0.5 for _ in range(self._output_size)] for _ in range(self._hidden_size)]
+        self._bias1 = [0.0] * self._hidden_size
+        self._bias2 = [0.0] * self._output_size
+        for _ in range(epochs):
+            for item in random.sample(data, len(data)):
+                inputs = list(item['features'].values())
+                hidden, output = self._forward(inputs)
+                target = [1.0 if label == item['label'] else 0.0 for label in self._labels]
+                output_error = [value - expected for value, expected in zip(output, target)]
+                hidden_error = [
+                    sum(output_error[j] * self._weights2[i][j] for j in range(self._output_size)) * hidden[i] * (1 - hidden[i])
+                    for i in range(self._hidden_size)
+                ]
+                for i in range(self._hidden_size):
+                    for j in range(self._output_size):
+                        self._weights2[i][j] -= self._learning_rate * output_error[j] * hidden[i]
+                for j in range(self._output_size):
+                    self._bias2[j] -= self._learning_rate * output_error[j]
+                for i in range(self._input_size):
+                    for j in range(self._hidden_size):
+                        self._weights1[i][j] -= self._learning_rate * hidden_error[j] * inputs[i]
+                for j in range(self._hidden_size):
+                    self._bias1[j] -= self._learning_rate * hidden_error[j]
+
+    def _forward(self, inputs: List[float]):
+        hidden = [
+            _sigmoid(self._bias1[j] + sum(inputs[i] * self._weights1[i][j] for i in range(self._input_size)))
+            for j in range(self._hidden_size)
+        ]
+        output = [
+            _sigmoid(self._bias2[j] + sum(hidden[i] * self._weights2[i][j] for i in range(self._hidden_size)))
+            for j in range(self._output_size)
+        ]
+        exp_sum = sum(math.exp(value) for value in output)
+        return hidden, [math.exp(value) / exp_sum for value in output]
+
+    def predict(self, features: Dict[str, float]) -> List[Dict[str, Any]]:
+        _, output = self._forward(list(features.values()))
+        predictions = sorted(
+            ({'name': label, 'confidence': probability, 'rank': 0} for label, probability in zip(self._labels, output)),
+            key=lambda prediction: -prediction['confidence']
+        )
+        for rank, prediction in enumerate(predictions, 1):
+            prediction['rank'] = rank
+        return predictions[:3]
+
+def _sigmoid(x: float) -> float:
+    return 1 / (1 + math.exp(-x))
+
+def sample_records(n: int = 240, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Raw training records in the bundled sample data's shape, with names
+    that depend on gender and age so models have something to learn
+    """
+    rng = random.Random(seed)
+    names = {
+        ('female', False): ['Emma', 'Olivia', 'Ava'],
+        ('female', True): ['Karen', 'Linda', 'Susan'],
+        ('male', False): ['Liam', 'Noah', 'Ethan'],
+        ('male', True): ['Robert', 'James', 'David'],
+    }
+    records = []
+    for _ in range(n):
+        gender = rng.choice(['male', 'female'])
+        age = rng.randint(18, 80)
+        records.append({
+            'demographic': {
+                'age': age,
+                'gender': gender,
+                'location': rng.choice(['Northeast', 'Midwest', 'South', 'West']),
+                'educationLevel': rng.choice(['high-school', 'some-college', 'bachelors', 'masters', 'doctorate']),
+                'ethnicity': rng.choice(['White', 'Black', 'Hispanic', 'Asian', 'Middle Eastern']),
+            },
+            'name': rng.choice(names[gender, age >= 45]),
+        })
+    return records
+
+def install() -> None:
+    """
+    Registers the ports as ml.models.* and sample records as ml.data.sample_data
+    """
+    def module(name: str, **attributes: Any) -> None:
+        created = types.ModuleType(name)
+        created.__dict__.update(attributes)
+        sys.modules[name] = created
+
+    module('ml.models')
+    module('ml.models.random_forest', RandomForestClassifier=RandomForestClassifier)
+    module('ml.models.gradient_boosting', GradientBoostingClassifier=GradientBoostingClassifier)
+    module('ml.models.neural_network', NeuralNetwork=NeuralNetwork)
+    module('ml.data')
+    module('ml.data.sample_data', sample_name_data=sample_records(120, seed=1), extended_name_data=sample_records(240, seed=2))
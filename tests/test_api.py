@@ -0,0 +1,64 @@
+DEMOGRAPHIC = {'age': 34, 'gender': 'female', 'location': 'West', 'education_level': 'bachelors', 'ethnicity': 'Asian'}
+
+def test_batch_prediction_keeps_order_and_reports_invalid_items(api):
+    older = dict(DEMOGRAPHIC, age=70, gender='male')
+    items = api.predict_names_batch([DEMOGRAPHIC, dict(DEMOGRAPHIC, age='old'), older, 'not an object'])
+
+    assert [item['index'] for item in items] == [0, 1, 2, 3]
+    assert items[1]['result'] is None and 'Age must be a number' in items[1]['error']
+    assert items[3]['result'] is None and items[3]['error'] == 'Demographic must be an object'
+    for item, demographic in ((items[0], DEMOGRAPHIC), (items[2], older)):
+        assert item['error'] is None
+        single = api.predict_name(demographic)
+        assert [name['name'] for name in item['result']['names']] == [name['name'] for name in single['names']]
+        assert [name['rank'] for name in item['result']['names']] == list(range(1, len(single['names']) + 1))
+
+def test_batch_prediction_reports_non_string_fields(api):
+    items = api.predict_names_batch([DEMOGRAPHIC, dict(DEMOGRAPHIC, gender=['x'], ethnicity=3)])
+
+    assert items[0]['error'] is None and items[0]['result']['names']
+    assert items[1]['result'] is None and items[1]['error'] == 'Fields must be strings: gender, ethnicity'
+
+def test_batch_route(client):
+    response = client.post('/api/predict/batch', json={'demographics': [DEMOGRAPHIC, {'gender': 'female'}]})
+
+    assert response.status_code == 200
+    first, second = response.get_json()
+    assert first['result']['names'] and first['error'] is None
+    assert second['result'] is None and second['error'].startswith('Missing fields')
+
+def test_compare_models_trains_each_type_on_the_same_split(api):
+    options = {'model_type': 'randomForest', 'train_test_split': 0.8, 'feature_engineering': {}, 'hyperparameters': {}}
+    served = api.predict_name(DEMOGRAPHIC)
+    comparisons = api.compare_models(options, ['randomForest', 'gradientBoosting'])
+
+    assert [comparison['model_type'] for comparison in comparisons] == ['randomForest', 'gradientBoosting']
+    for comparison in comparisons:
+        assert 0.0 <= comparison['accuracy'] <= 1.0
+        assert comparison['training_time'] > 0 and comparison['prediction_latency'] >= 0
+    # The serving model is left alone
+    assert api.predict_name(DEMOGRAPHIC)['names'] == served['names']
+
+class RecordingWriter:
+    def __init__(self):
+        self.rows = {'demographics': [], 'names': []}
+
+    def enqueue(self, table, rows):
+        self.rows[table].extend(rows)
+        return True
+
+def test_served_predictions_are_logged(api, client, monkeypatch):
+    writer = RecordingWriter()
+    monkeypatch.setattr(api, 'PREDICTION_LOGGING_ENABLED', True)
+    monkeypatch.setattr(api, 'supabase_writer', writer)
+
+    single = client.post('/api/predict', json=DEMOGRAPHIC)
+    batch = client.post('/api/predict/batch', json={'demographics': [DEMOGRAPHIC, {'gender': 'female'}, dict(DEMOGRAPHIC, age=70)]})
+
+    assert single.status_code == 200 and batch.status_code == 200
+    # One demographics row per answered request; the invalid batch item is not logged
+    assert [row['age'] for row in writer.rows['demographics']] == [34, 34, 70]
+    served = single.get_json()['names'] + [name for item in batch.get_json() if item['result'] for name in item['result']['names']]
+    assert [(row['name'], row['confidence_score']) for row in writer.rows['names']] == [(name['name'], name['confidence']) for name in served]
+    demographic_ids = {row['id'] for row in writer.rows['demographics']}
+    assert {row['demographic_id'] for row in writer.rows['names']} == demographic_ids
@@ -0,0 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from ml.batching import MicroBatcher
+
+def test_concurrent_submits_share_one_batch():
+    batches = []
+    def predict_batch(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+    batcher = MicroBatcher(predict_batch, window_seconds=0.5, max_batch_size=64)
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = list(pool.map(batcher.submit, range(8)))
+    assert [future.result(timeout=5) for future in futures] == [item * 2 for item in range(8)]
+    assert len(batches) == 1 and sorted(batches[0]) == list(range(8))
+    assert batcher.stats()['largest_batch'] == 8
+
+def test_batches_are_capped_and_errors_reach_every_caller():
+    sizes = []
+    def predict_batch(items):
+        sizes.append(len(items))
+        if 'bad' in items:
+            raise ValueError('bad item')
+        return items
+    batcher = MicroBatcher(predict_batch, window_seconds=0.5, max_batch_size=4)
+
+    futures = [batcher.submit(item) for item in range(10)]
+    assert [future.result(timeout=5) for future in futures] == list(range(10))
+    assert sizes == [4, 4, 2]
+
+    failed = [batcher.submit(item) for item in ('ok', 'bad')]
+    for future in failed:
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
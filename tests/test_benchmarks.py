@@ -0,0 +1,26 @@
+import json
+from benchmarks.run import compare
+from benchmarks.synthetic import generate_demographics, generate_training_records
+from ml.preprocessing import preprocess_data
+
+def test_synthetic_data_is_reproducible_and_preprocessable():
+    records = generate_training_records(200, seed=4)
+
+    assert records == generate_training_records(200, seed=4)
+    assert records != generate_training_records(200, seed=5)
+    assert len(preprocess_data(records)) == 200
+    assert generate_demographics(50, seed=4) == generate_demographics(50, seed=4)
+
+def test_compare_flags_throughput_regressions_beyond_tolerance(tmp_path):
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps({'results': [
+        {'name': 'preprocess_data', 'rows': 1000, 'rows_per_second': 1000.0},
+        {'name': 'split_train_test', 'rows': 1000, 'rows_per_second': 1000.0},
+    ]}))
+    results = [
+        {'name': 'preprocess_data', 'rows': 1000, 'rows_per_second': 700.0},
+        {'name': 'split_train_test', 'rows': 1000, 'rows_per_second': 950.0},
+        {'name': 'encode_demographics', 'rows': 1000, 'rows_per_second': 10.0},
+    ]
+
+    assert compare(results, str(baseline), 0.1) == ['preprocess_data @ 1000 rows: -30.0% throughput']
@@ -0,0 +1,77 @@
+import pickle
+import random
+import numpy as np
+import pytest
+from fixture_models import GradientBoostingClassifier, NeuralNetwork, RandomForestClassifier, sample_records
+from ml import compiled, instrumentation
+from ml.compiled import CompiledForest, CompiledGradientBoosting, CompiledNeuralNetwork, compile_model
+from ml.instrumentation import MetricsRegistry
+from ml.preprocessing import preprocess_data
+
+def trained(model, **train_options):
+    random.seed(5)
+    data = preprocess_data(sample_records(120))
+    model.train(data, **train_options)
+    return model, data
+
+def assert_same_predictions(model, compiled, data):
+    feature_names = list(data[0]['features'])
+    features = np.array([[record['features'][name] for name in feature_names] for record in data])
+    for record, batched in zip(data, compiled.predict_batch(features)):
+        expected = model.predict(record['features'])
+        # Names can swap places on tied scores; their confidences cannot differ
+        assert [p['confidence'] for p in batched] == pytest.approx([p['confidence'] for p in expected], abs=1e-5)
+        confidences = {p['name']: p['confidence'] for p in expected}
+        for prediction in batched:
+            if prediction['name'] in confidences:
+                assert prediction['confidence'] == pytest.approx(confidences[prediction['name']], abs=1e-5)
+
+def test_compiled_forest_matches_the_model():
+    model, data = trained(RandomForestClassifier(8, 4))
+    compiled = compile_model(model, list(data[0]['features']))
+
+    assert isinstance(compiled, CompiledForest)
+    assert_same_predictions(model, compiled, data)
+
+def test_compiled_gradient_boosting_matches_the_model():
+    model, data = trained(GradientBoostingClassifier(6, 0.1))
+    compiled = compile_model(model, list(data[0]['features']))
+
+    assert isinstance(compiled, CompiledGradientBoosting)
+    assert_same_predictions(model, compiled, data)
+
+def test_compiled_network_matches_the_model():
+    data = preprocess_data(sample_records(120))
+    model, data = trained(NeuralNetwork(len(data[0]['features']), 6), epochs=3)
+    compiled = compile_model(model, list(data[0]['features']))
+
+    assert isinstance(compiled, CompiledNeuralNetwork)
+    assert_same_predictions(model, compiled, data)
+
+def test_unreadable_models_fall_back_and_are_counted(monkeypatch):
+    metrics = MetricsRegistry()
+    monkeypatch.setattr(instrumentation, 'registry', metrics)
+    monkeypatch.setattr(instrumentation, 'METRICS_ENABLED', True)
+    model = RandomForestClassifier()
+    del model._trees
+
+    assert compile_model(model) is None
+    assert 'model_compile_fallbacks_total{model="RandomForestClassifier"} 1' in instrumentation.render_metrics()
+    assert compile_model(object()) is None
+
+def test_deferred_networks_are_traced_once_torch_starts(monkeypatch):
+    traced = []
+    monkeypatch.setattr(compiled, '_torch_deferred', True)
+    monkeypatch.setattr(compiled, '_trace_network', lambda *weights: traced.append(weights) or 'graph')
+    model, data = trained(NeuralNetwork(len(preprocess_data(sample_records(10))[0]['features']), 4), epochs=1)
+
+    network = compile_model(model, list(data[0]['features']))
+    restored = pickle.loads(pickle.dumps(network))
+    assert traced == [] and network.graph is None and restored.graph is None
+    # Served by numpy until then
+    assert len(network.predict_batch(np.zeros((2, len(data[0]['features'])), dtype=np.float32))) == 2
+
+    compiled.start_torch()
+    assert len(traced) == 2 and network.graph == restored.graph == 'graph'
+    compile_model(model, list(data[0]['features']))
+    assert len(traced) == 3
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from ml import evaluation
+from ml.evaluation import compute_metrics
+from ml.preprocessing import FEATURE_NAMES, GENDER_OFFSET
+
+TRUE = ['Anna', 'Anna', 'Ben', 'Ben']
+PREDICTED = ['Anna', 'Ben', 'Ben', 'Ben']
+
+def features_by_gender(genders):
+    features = np.zeros((len(genders), len(FEATURE_NAMES)))
+    features[np.arange(len(genders)), GENDER_OFFSET + np.array(genders)] = 1
+    return features
+
+def test_metrics_match_hand_computed_values():
+    metrics = compute_metrics(TRUE, PREDICTED, features_by_gender([0, 0, 1, 1]))
+
+    assert metrics['labels'] == ['Anna', 'Ben']
+    assert metrics['confusion_matrix'] == [[1, 1], [0, 2]] and metrics['confusion_matrix_format'] == 'dense'
+    assert metrics['accuracy'] == 0.75
+    # Anna: precision 1, recall 1/2; Ben: precision 2/3, recall 1
+    assert metrics['precision'] == pytest.approx(5 / 6)
+    assert metrics['recall'] == pytest.approx(0.75)
+    assert metrics['f1_score'] == pytest.approx((2 / 3 + 0.8) / 2)
+    assert metrics['micro_average'] == {'precision': 0.75, 'recall': 0.75, 'f1_score': 0.75}
+    # Half right for the first gender, all right for the second; no age bin
+    # column is set, so every row falls in the same age group
+    assert metrics['bias_metrics']['gender_bias'] == 0.5
+    assert metrics['bias_metrics']['age_bias'] == 0.0
+
+def test_large_label_sets_use_sparse_triplets(monkeypatch):
+    monkeypatch.setattr(evaluation, 'DENSE_CONFUSION_LIMIT', 1)
+    metrics = compute_metrics(TRUE, PREDICTED, features_by_gender([0, 0, 1, 1]))
+
+    assert metrics['confusion_matrix_format'] == 'coo'
+    assert metrics['confusion_matrix'] == [[0, 0, 1], [0, 1, 1], [1, 1, 2]]
@@ -0,0 +1,32 @@
+import pickle
+import numpy as np
+from conftest import ALL_FEATURES
+from fixture_models import sample_records
+from ml.features import FeatureSchema, build_features
+from ml.preprocessing import AGE_BIN_OFFSET, ETHNICITY_OFFSET, FEATURE_NAMES
+
+DEMOGRAPHIC = {'age': 34, 'gender': 'female', 'location': 'West', 'education_level': 'bachelors', 'ethnicity': 'Asian'}
+
+def test_all_flags_give_the_full_layout():
+    schema = FeatureSchema(ALL_FEATURES, 18, 80)
+
+    assert schema.feature_names == FEATURE_NAMES
+    assert FeatureSchema({}, 18, 80).feature_names == FEATURE_NAMES
+
+def test_flags_prune_and_recode_columns():
+    schema = FeatureSchema({'oneHotEncoding': False, 'geographicClustering': False, 'cultural_markers': True}, 18, 80)
+
+    assert schema.feature_names == ['genderCode', 'educationCode', 'ageGroupCode', 'ethnicityCode', FEATURE_NAMES[-1]]
+    features = schema.encode_demographic(DEMOGRAPHIC)
+    assert list(features) == schema.feature_names
+    assert features[FEATURE_NAMES[-1]] == np.float32((34 - 18) / (80 - 18))
+    # One demographic and a batch of it encode alike
+    assert schema.encode_demographics([DEMOGRAPHIC]).tolist() == [list(features.values())]
+
+def test_built_records_use_the_schema_columns_and_pickle_by_flags():
+    records, schema = build_features(sample_records(40), {'age_binning': False}, 'test-records')
+
+    assert schema.feature_names == FEATURE_NAMES[:AGE_BIN_OFFSET] + FEATURE_NAMES[ETHNICITY_OFFSET:]
+    assert all(list(record['features']) == schema.feature_names for record in records)
+    restored = pickle.loads(pickle.dumps(schema))
+    assert restored.feature_names == schema.feature_names and restored.age_range == schema.age_range
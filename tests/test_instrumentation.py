@@ -0,0 +1,48 @@
+import pytest
+from ml import instrumentation
+from ml.instrumentation import LatencyHistogram, MetricsRegistry
+from ml.registry import ModelRegistry, ModelVersion
+
+@pytest.fixture
+def metrics(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(instrumentation, 'registry', registry)
+    monkeypatch.setattr(instrumentation, 'METRICS_ENABLED', True)
+    return registry
+
+def test_quantiles_stay_within_the_observed_range():
+    histogram = LatencyHistogram()
+    for milliseconds in range(1, 101):
+        histogram.observe(milliseconds / 1000)
+
+    assert histogram.count == 100 and histogram.sum == pytest.approx(5.05)
+    assert 0.025 <= histogram.quantile(0.5) <= 0.05
+    assert 0.05 <= histogram.quantile(0.95) <= 0.1
+    assert histogram.quantile(0.99) <= histogram.max == 0.1
+    assert LatencyHistogram().quantile(0.5) == 0.0
+
+def test_render_uses_the_prometheus_text_format(metrics):
+    with instrumentation.timed('encode'):
+        pass
+    instrumentation.increment('requests_total', route='/api/predict')
+    instrumentation.set_gauge('cache_entries', 3, cache='prediction')
+
+    rendered = instrumentation.render_metrics()
+    assert '# TYPE stage_duration_seconds summary' in rendered
+    assert 'stage_duration_seconds{stage="encode",quantile="0.5"}' in rendered
+    assert 'stage_duration_seconds_count{stage="encode"} 1' in rendered
+    assert 'requests_total{route="/api/predict"} 1' in rendered
+    assert 'cache_entries{cache="prediction"} 3' in rendered
+
+def test_evicted_model_versions_lose_their_series(metrics):
+    registry = ModelRegistry(['forest'], max_versions=2)
+    for version in ('1', '2', '3'):
+        entry = ModelVersion('forest', version, None, None, None, 'Forest')
+        entry.record(0.001)
+        registry.register(entry)
+
+    assert [status['version'] for status in registry.describe()[0]['versions']] == ['2', '3']
+    rendered = instrumentation.render_metrics()
+    assert 'version="1"' not in rendered
+    assert 'model_predictions_total{model="forest",version="2"} 1' in rendered
+    assert 'model_prediction_seconds_count{model="forest",version="3"} 1' in rendered
@@ -0,0 +1,56 @@
+import threading
+import time
+from ml import jobs
+from ml.jobs import TrainingJobQueue
+
+def fit(options, progress):
+    progress(stage='training', epochs_total=1)
+    if options.get('fail'):
+        raise ValueError('bad options')
+    return {'metrics': {'accuracy': options['accuracy']}}
+
+def test_jobs_report_their_outcome():
+    installed = []
+    done = threading.Semaphore(0)
+    def install(trained):
+        installed.append(trained)
+    queue = TrainingJobQueue(fit, install)
+    queue._finish = _signal_after(queue._finish, done)
+
+    succeeded = queue.submit({'accuracy': 0.9})
+    assert queue.status(succeeded)['status'] in ('queued', 'running', 'succeeded')
+    assert done.acquire(timeout=30)
+    failed = queue.submit({'fail': True})
+    assert done.acquire(timeout=30)
+
+    status = queue.status(succeeded)
+    assert status['status'] == 'succeeded' and status['metrics'] == {'accuracy': 0.9}
+    assert status['stage'] == 'training' and status['error'] is None
+    status = queue.status(failed)
+    assert status['status'] == 'failed' and status['error'] == 'ValueError: bad options'
+    assert installed == [{'metrics': {'accuracy': 0.9}}]
+    assert queue.status('unknown') is None
+
+def test_finished_jobs_are_evicted_by_count_and_age(monkeypatch):
+    done = threading.Semaphore(0)
+    queue = TrainingJobQueue(fit, lambda trained: None, max_finished_jobs=2, finished_ttl_seconds=60)
+    queue._finish = _signal_after(queue._finish, done)
+
+    job_ids = []
+    for accuracy in (0.1, 0.2, 0.3):
+        job_ids.append(queue.submit({'accuracy': accuracy}))
+        assert done.acquire(timeout=30)
+
+    assert queue.status(job_ids[0]) is None
+    assert queue.status(job_ids[1])['status'] == queue.status(job_ids[2])['status'] == 'succeeded'
+
+    # Clock moved only once the pool is idle, so its own waits are unaffected
+    later = time.monotonic() + 61
+    monkeypatch.setattr(jobs.time, 'monotonic', lambda: later)
+    assert queue.status(job_ids[2]) is None and queue.evictions == 3
+
+def _signal_after(finish, done):
+    def wrapped(job_id, future):
+        finish(job_id, future)
+        done.release()
+    return wrapped
@@ -0,0 +1,54 @@
+import mmap
+import os
+import random
+import numpy as np
+from fixture_models import RandomForestClassifier, sample_records
+from ml.compiled import CompiledForest, FlatTrees
+from ml.persistence import load_model, save_model
+from ml.preprocessing import FEATURE_NAMES, encode_features, preprocess_data
+from ml.vocabulary import LabelVocabulary
+
+def trained_forest():
+    random.seed(3)
+    data = preprocess_data(sample_records(80))
+    model = RandomForestClassifier(5, 4)
+    model.train(data)
+    vocabulary = LabelVocabulary()
+    nodes = FlatTrees.build([tree._root for tree in model._trees], FEATURE_NAMES, vocabulary)
+    return model, CompiledForest(vocabulary, nodes, len(model._trees)), sorted(set(record['label'] for record in data))
+
+def mapped_from_file(array: np.ndarray) -> bool:
+    base = array
+    while base is not None:
+        if isinstance(base, mmap.mmap):
+            return True
+        base = base.obj if isinstance(base, memoryview) else getattr(base, 'base', None)
+    return False
+
+def test_compiled_arrays_are_mapped_read_only_from_the_buffer_file(tmp_path):
+    model, compiled, labels = trained_forest()
+    version = save_model(model, 'randomForest', FEATURE_NAMES, 18, 80, labels, compiled=compiled, root=str(tmp_path))
+
+    assert os.path.getsize(tmp_path / 'randomForest' / version / 'buffers.bin') > 0
+    loaded_model, loaded_compiled, manifest = load_model('randomForest', root=str(tmp_path))
+    assert manifest['version'] == version and manifest['compiled'] and manifest['buffers']
+
+    nodes = loaded_compiled.nodes
+    for array in (nodes.roots, nodes.feature, nodes.threshold, nodes.left, nodes.right, nodes.leaf_class):
+        assert not array.flags.writeable
+        assert mapped_from_file(array)
+
+    features = encode_features(sample_records(30, seed=9))['features']
+    assert loaded_compiled.predict_batch(features) == compiled.predict_batch(features)
+    assert loaded_model.predict(dict(zip(FEATURE_NAMES, features[0].tolist()))) == model.predict(dict(zip(FEATURE_NAMES, features[0].tolist())))
+
+def test_unpromoted_versions_are_not_latest(tmp_path):
+    model, compiled, labels = trained_forest()
+    first = save_model(model, 'randomForest', FEATURE_NAMES, 18, 80, labels, root=str(tmp_path))
+    second = save_model(model, 'randomForest', FEATURE_NAMES, 18, 80, labels, mark_latest=False, root=str(tmp_path))
+
+    assert first != second
+    _, loaded_compiled, manifest = load_model('randomForest', root=str(tmp_path))
+    assert manifest['version'] == first and loaded_compiled is None and not manifest['compiled']
+    assert load_model('randomForest', second, root=str(tmp_path))[2]['version'] == second
+    assert load_model('gradientBoosting', root=str(tmp_path)) is None
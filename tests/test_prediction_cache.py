@@ -0,0 +1,38 @@
+from ml import prediction_cache
+from ml.prediction_cache import PredictionCache
+
+PREDICTIONS = [{'name': 'Emma', 'confidence': 0.5, 'rank': 1}]
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(max_entries=2)
+    cache.put('a', PREDICTIONS)
+    cache.put('b', PREDICTIONS)
+    assert cache.get('a') == PREDICTIONS  # 'b' is now the least recently used
+    cache.put('c', PREDICTIONS)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == PREDICTIONS and cache.get('c') == PREDICTIONS
+    stats = cache.stats()
+    assert (stats['entries'], stats['hits'], stats['misses'], stats['evictions']) == (2, 3, 1, 1)
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(prediction_cache.time, 'monotonic', lambda: now[0])
+    cache = PredictionCache(max_entries=10, ttl_seconds=5)
+    cache.put('a', PREDICTIONS)
+
+    now[0] += 4
+    assert cache.get('a') == PREDICTIONS
+    now[0] += 2
+    assert cache.get('a') is None
+    assert cache.stats()['entries'] == 0 and cache.stats()['evictions'] == 1
+
+def test_dropping_a_version_keeps_other_versions():
+    cache = PredictionCache(max_entries=10)
+    for key in [('randomForest', 'v1', (0.1,)), ('randomForest', 'v1', (0.2,)), ('randomForest', 'v2', (0.1,)), ('neuralNetwork', 'v1', (0.1,))]:
+        cache.put(key, PREDICTIONS)
+
+    assert cache.drop_version('randomForest', 'v1') == 2
+    assert cache.get(('randomForest', 'v1', (0.1,))) is None
+    assert cache.get(('randomForest', 'v2', (0.1,))) == PREDICTIONS
+    assert cache.get(('neuralNetwork', 'v1', (0.1,))) == PREDICTIONS
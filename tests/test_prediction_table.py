@@ -0,0 +1,43 @@
+import random
+from ml.preprocessing import get_age_bin
+from ml.prediction_table import PredictionTable, TABLE_SHAPE
+
+def cell_predictions(demographic):
+    """
+    Predictions that depend only on the demographic's categorical cell
+    """
+    age_bin = 'under-18' if demographic['age'] < 18 else get_age_bin(demographic['age'])
+    key = '/'.join([demographic['gender'], demographic['location'], demographic['education_level'], age_bin, demographic['ethnicity']])
+    return [{'name': key, 'confidence': 0.75, 'rank': 1}, {'name': demographic['gender'], 'confidence': 0.25, 'rank': 2}]
+
+def test_lookup_matches_the_model_for_every_cell_it_covers():
+    calls = []
+    def predict_demographics(demographics):
+        calls.append(len(demographics))
+        return [cell_predictions(demographic) for demographic in demographics]
+
+    table = PredictionTable.build(predict_demographics, 'Test Model')
+    rng = random.Random(0)
+    for _ in range(200):
+        demographic = {
+            'age': rng.randint(5, 95),
+            'gender': rng.choice(['male', 'female', 'nonbinary', 'other']),
+            'location': rng.choice(['Northeast', 'Midwest', 'South', 'West']),
+            'education_level': rng.choice(['high-school', 'some-college', 'bachelors', 'masters', 'doctorate', 'other']),
+            'ethnicity': rng.choice(['White', 'Black', 'Hispanic', 'Asian', 'Middle Eastern', 'Other']),
+        }
+        expected = cell_predictions(demographic)
+        found = table.lookup(demographic)
+        assert [(p['name'], p['rank']) for p in found] == [(p['name'], p['rank']) for p in expected]
+        assert [p['confidence'] for p in found] == [p['confidence'] for p in expected]
+
+    # The whole space is predicted in one call
+    assert calls == [TABLE_SHAPE[0] * TABLE_SHAPE[1] * TABLE_SHAPE[2] * TABLE_SHAPE[3] * TABLE_SHAPE[4]]
+
+def test_unknown_categories_miss():
+    table = PredictionTable.build(lambda demographics: [cell_predictions(d) for d in demographics], 'Test Model')
+    demographic = {'age': 30, 'gender': 'female', 'location': 'Atlantis', 'education_level': 'masters', 'ethnicity': 'Asian'}
+
+    assert table.lookup(demographic) is None
+    assert table.lookup(dict(demographic, location='West')) is not None
+    assert table.stats()['hits'] == 1 and table.stats()['misses'] == 1
@@ -0,0 +1,48 @@
+import random
+import pandas as pd
+import pytest
+from fixture_models import RandomForestClassifier, sample_records
+from ml import predictor
+from ml.compiled import compile_model
+from ml.features import build_features
+from ml.persistence import load_model, save_model
+from ml.predictor import NamePredictor
+
+DEMOGRAPHICS = [
+    {'age': 34, 'gender': 'female', 'location': 'West', 'education_level': 'bachelors', 'ethnicity': 'Asian'},
+    {'age': 70, 'gender': 'male', 'location': 'South', 'education_level': 'masters', 'ethnicity': 'White'},
+]
+
+@pytest.fixture
+def saved_forest(tmp_path, monkeypatch):
+    random.seed(2)
+    records, schema = build_features(sample_records(120), {'cultural_markers': False})
+    model = RandomForestClassifier(6, 4)
+    model.train(records)
+    labels = sorted({record['label'] for record in records})
+    save_model(model, 'randomForest', schema.feature_names, schema.age_min, schema.age_max, labels,
+               schema.feature_engineering, compile_model(model, schema.feature_names), root=str(tmp_path))
+    monkeypatch.setattr(predictor, 'load_model', lambda model_type, version=None: load_model(model_type, version, root=str(tmp_path)))
+    return model, schema
+
+def test_predictions_use_the_saved_schema(saved_forest):
+    model, schema = saved_forest
+    names = NamePredictor('randomForest')
+
+    assert names.feature_names == schema.feature_names and names.describe()['compiled']
+    batch = names.predict(DEMOGRAPHICS)
+    for demographic, predictions in zip(DEMOGRAPHICS, batch):
+        expected = model.predict(schema.encode_demographic(demographic))
+        assert sorted(p['confidence'] for p in predictions) == pytest.approx(sorted(p['confidence'] for p in expected))
+        assert names.predict(demographic) == predictions
+    assert names.predict(pd.DataFrame(DEMOGRAPHICS)) == batch
+
+def test_uncompiled_predictions_come_from_the_model(saved_forest):
+    model, schema = saved_forest
+    names = NamePredictor('randomForest', compiled=False)
+
+    assert names.predict(DEMOGRAPHICS[0], top_k=2) == model.predict(schema.encode_demographic(DEMOGRAPHICS[0]))[:2]
+    with pytest.raises(ValueError, match='missing fields'):
+        names.predict([{'age': 30}])
+    with pytest.raises(ValueError, match='No saved gradientBoosting model'):
+        NamePredictor('gradientBoosting')
@@ -0,0 +1,25 @@
+import numpy as np
+from fixture_models import sample_records
+from ml.preprocessing import (
+    FEATURE_NAMES, preprocess_data, features_to_matrix, encode_demographics, extract_features_from_demographic,
+)
+
+def test_columnar_encoding_matches_feature_dicts():
+    records = sample_records(50)
+    records.append({'demographic': {'age': 40, 'gender': 'male'}, 'name': 'Dropped'})
+
+    dicts = preprocess_data(records)
+    encoded = preprocess_data(records, columnar=True)
+
+    assert encoded['features'].dtype == np.float32
+    assert encoded['features'].shape == (50, len(FEATURE_NAMES))
+    np.testing.assert_allclose(encoded['features'], features_to_matrix(dicts), rtol=1e-6)
+    assert [encoded['label_names'][label] for label in encoded['labels']] == [record['label'] for record in dicts]
+
+def test_encode_demographics_matches_single_extraction():
+    demographics = [
+        {'age': 17, 'gender': 'female', 'location': 'West', 'education_level': 'other', 'ethnicity': 'Asian'},
+        {'age': 64, 'gender': 'male', 'location': 'South', 'education_level': 'masters', 'ethnicity': 'Pacific Islander'},
+    ]
+    expected = [list(extract_features_from_demographic(demographic).values()) for demographic in demographics]
+    np.testing.assert_allclose(encode_demographics(demographics), np.array(expected, dtype=np.float32), rtol=1e-6)
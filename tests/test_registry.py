@@ -0,0 +1,68 @@
+import pytest
+from ml import registry as registry_module
+from ml.registry import ModelRegistry, ModelVersion
+
+def version(name, number):
+    return ModelVersion(name, number, None, None, None, name.title())
+
+def test_first_live_name_in_serving_order_serves():
+    registry = ModelRegistry(['forest', 'network'])
+    with pytest.raises(ValueError):
+        registry.route()
+
+    registry.register(version('network', '1'))
+    assert registry.route().name == 'network'
+    registry.register(version('forest', '1'))
+    assert registry.route().name == 'forest' and registry.primary().version == '1'
+
+def test_canaries_take_their_share_and_promote(monkeypatch):
+    registry = ModelRegistry(['forest'])
+    registry.register(version('forest', '1'))
+    registry.register(version('forest', '2'), canary_percent=25)
+
+    draws = iter([0.1, 0.5, 0.24, 0.9])
+    monkeypatch.setattr(registry_module.random, 'random', lambda: next(draws))
+    assert [registry.route().version for _ in range(4)] == ['2', '1', '2', '1']
+    described = registry.describe()[0]
+    assert (described['live_version'], described['canary_version'], described['canary_percent']) == ('1', '2', 25)
+
+    generation = registry.generation
+    registry.promote('forest', '2')
+    assert registry.live('forest').version == '2' and registry.describe()[0]['canary_version'] is None
+    assert registry.generation == generation + 1
+    # Rolling back is promoting the older version
+    registry.promote('forest', '1')
+    assert registry.live('forest').version == '1'
+
+def test_canary_settings_are_validated():
+    registry = ModelRegistry(['forest'])
+    registry.register(version('forest', '1'))
+    registry.register(version('forest', '2'))
+
+    with pytest.raises(ValueError):
+        registry.set_canary('forest', '2', 10)  # already live
+    with pytest.raises(ValueError):
+        registry.set_canary('forest', '1', 150)
+    with pytest.raises(ValueError):
+        registry.promote('forest', '9')
+    registry.set_canary('forest', '1', 10)
+    registry.set_canary('forest', '1', 0)
+    assert registry.describe()[0]['canary_version'] is None
+
+def test_eviction_keeps_live_and_canary_versions():
+    registry = ModelRegistry(['forest'], max_versions=2)
+    registry.register(version('forest', '1'))
+    registry.register(version('forest', '2'), canary_percent=10)
+    registry.register(version('forest', '3'), canary_percent=10)
+
+    # 1 is live and 3 the canary; 2 was replaced as canary and is evicted
+    assert [status['version'] for status in registry.describe()[0]['versions']] == ['1', '3']
+    assert [status['role'] for status in registry.describe()[0]['versions']] == ['live', 'canary']
+
+def test_snapshots_are_not_changed_by_later_writes():
+    registry = ModelRegistry(['forest'])
+    registry.register(version('forest', '1'))
+    snapshot = registry._state
+    registry.register(version('forest', '2'))
+
+    assert snapshot.live == {'forest': '1'} and list(snapshot.versions['forest']) == ['1']
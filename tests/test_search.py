@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from conftest import ALL_FEATURES
+from ml.search import (
+    SharedDataset, grid_configurations, random_configurations, resolve_hyperparameters, rung_fractions,
+    should_prune, validate_space,
+)
+
+def test_hyperparameters_resolve_against_the_defaults():
+    assert resolve_hyperparameters('randomForest', {'numTrees': '12.6', 'unused': 1}) == {'numTrees': 13, 'maxDepth': 7}
+    for bad in ({'maxDepth': 'deep'}, {'maxDepth': 0}):
+        with pytest.raises(ValueError):
+            resolve_hyperparameters('randomForest', bad)
+    with pytest.raises(ValueError):
+        resolve_hyperparameters('svm', None)
+
+def test_search_spaces_and_configurations():
+    space = {'numTrees': [10, 20], 'maxDepth': [5, 7, 9]}
+    validate_space('randomForest', space)
+    with pytest.raises(ValueError):
+        validate_space('randomForest', {'learningRate': [0.1]})
+
+    assert len(grid_configurations(space)) == 6
+    ranged = {'learningRate': {'min': 0.01, 'max': 1.0, 'log': True}, 'numTrees': [10, 20]}
+    configurations = random_configurations(ranged, 50, seed=1)
+    assert configurations == random_configurations(ranged, 50, seed=1)
+    assert all(0.01 <= c['learningRate'] <= 1.0 and c['numTrees'] in (10, 20) for c in configurations)
+
+def test_rungs_and_median_pruning():
+    assert rung_fractions(3, 3) == pytest.approx([1 / 9, 1 / 3, 1.0])
+    assert not should_prune(0.1, [0.5, 0.6], min_trials=3)
+    assert should_prune(0.4, [0.5, 0.6, 0.3], min_trials=3)
+    assert not should_prune(0.5, [0.5, 0.6, 0.3], min_trials=3)
+
+def test_shared_dataset_round_trips_through_its_spec():
+    features = np.arange(12, dtype=np.float32).reshape(4, 3)
+    labels = np.array([3, 1, 2, 0], dtype=np.int32)
+    dataset = SharedDataset.create(features, labels)
+    try:
+        attached = SharedDataset.attach(dataset.spec)
+        assert np.array_equal(attached.features, features) and np.array_equal(attached.labels, labels)
+        attached.features = attached.labels = None
+        attached.block.close()
+    finally:
+        dataset.release()
+
+def test_search_reports_every_trial(api):
+    options = {'model_type': 'randomForest', 'train_test_split': 0.8, 'feature_engineering': ALL_FEATURES, 'hyperparameters': {}}
+    result = api.search_hyperparameters(options, 'grid', {'numTrees': [2, 4], 'maxDepth': [3]}, rungs=2, eta=2, seed=0)
+
+    assert [trial['hyperparameters'] for trial in result['trials']] == [{'numTrees': 2, 'maxDepth': 3}, {'numTrees': 4, 'maxDepth': 3}]
+    assert result['best_hyperparameters'] in [trial['hyperparameters'] for trial in result['trials']]
+    assert result['best_accuracy'] == max(trial['accuracy'] for trial in result['trials'])
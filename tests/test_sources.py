@@ -0,0 +1,52 @@
+import sqlite3
+import pytest
+from ml.sources import CSVSource, source_from_config
+
+def sqlite_source(tmp_path):
+    path = tmp_path / 'names.db'
+    connection = sqlite3.connect(path)
+    connection.executescript("""
+        CREATE TABLE demographics (id INTEGER PRIMARY KEY, age INTEGER, gender TEXT, location TEXT, education_level TEXT, ethnicity TEXT);
+        CREATE TABLE names (id INTEGER PRIMARY KEY, name TEXT, demographic_id INTEGER, created_at TEXT);
+    """)
+    for i in range(1, 6):
+        connection.execute('INSERT INTO demographics VALUES (?, ?, ?, ?, ?, ?)', (i, 20 + i, 'female', 'West', 'masters', 'Asian'))
+        # Two names share the same created_at, so the watermark needs the id
+        connection.execute('INSERT INTO names VALUES (?, ?, ?, ?)', (i, f'Name{i}', i, f'2024-01-0{min(i, 4)}'))
+    connection.commit()
+    connection.close()
+    return source_from_config(f'sqlite:///{path}')
+
+def test_sql_source_pages_in_key_order(tmp_path):
+    source = sqlite_source(tmp_path)
+
+    pages = list(source.pages('demographics', ['age'], page_size=2))
+    assert [[row['id'] for row in page] for page in pages] == [[1, 2], [3, 4], [5]]
+    training = [row for page in source.training_pages(page_size=2) for row in page]
+    assert [row['name'] for row in training] == [f'Name{i}' for i in range(1, 6)]
+    assert training[0] == {'name': 'Name1', 'age': 21, 'gender': 'female', 'location': 'West', 'education_level': 'masters', 'ethnicity': 'Asian'}
+
+def test_sql_source_resumes_after_a_watermark(tmp_path):
+    source = sqlite_source(tmp_path)
+
+    rows = [row for page in source.training_pages_since({'created_at': '2024-01-04', 'id': 4}, page_size=1) for row in page]
+    assert [row['name'] for row in rows] == ['Name5']
+    rows = [row for page in source.training_pages_since({'created_at': '2024-01-02', 'id': 2}, page_size=1) for row in page]
+    assert [row['name'] for row in rows] == ['Name3', 'Name4', 'Name5']
+
+def test_sql_source_rejects_unsafe_identifiers(tmp_path):
+    with pytest.raises(ValueError):
+        list(sqlite_source(tmp_path).pages('names; DROP TABLE names', ['name']))
+
+def test_csv_source_reads_chunks_with_missing_cells_as_none(tmp_path):
+    path = tmp_path / 'rows.csv'
+    path.write_text('name,age,gender,location,education_level,ethnicity,extra\n'
+                    'Emma,30,female,West,masters,Asian,x\n'
+                    'Liam,,male,South,,White,y\n'
+                    'Noah,50,male,West,bachelors,Black,z\n')
+    source = source_from_config(str(path))
+
+    assert isinstance(source, CSVSource)
+    pages = list(source.training_pages(page_size=2))
+    assert [len(page) for page in pages] == [2, 1]
+    assert pages[0][1] == {'name': 'Liam', 'age': None, 'gender': 'male', 'location': 'South', 'education_level': None, 'ethnicity': 'White'}
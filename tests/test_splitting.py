@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from ml.splitting import kfold_indices, split_indices
+
+def test_small_strata_keep_a_test_row_and_singletons_train(caplog):
+    # Strata of 1, 2, 3 and 10 rows
+    strata = np.array([0] + [1] * 2 + [2] * 3 + [3] * 10)
+    train, test = split_indices(len(strata), 0.8, seed=0, strata=strata)
+
+    assert sorted(train.tolist() + test.tolist()) == list(range(len(strata)))
+    assert np.bincount(strata[train], minlength=4).tolist() == [1, 1, 2, 8]
+    assert np.bincount(strata[test], minlength=4).tolist() == [0, 1, 1, 2]
+    assert '1 of 4 strata have a single row' in caplog.text
+
+def test_same_seed_gives_the_same_split():
+    strata = np.arange(100) % 7
+    first = split_indices(100, 0.7, seed=3, strata=strata)
+    second = split_indices(100, 0.7, seed=3, strata=strata)
+
+    assert all(np.array_equal(a, b) for a, b in zip(first, second))
+    assert len(split_indices(100, 0.7, seed=3)[0]) == 70
+
+def test_kfold_puts_every_row_in_one_test_fold():
+    strata = np.arange(50) % 5
+    folds = kfold_indices(50, 5, seed=1, strata=strata)
+
+    tests = np.concatenate([test for _, test in folds])
+    assert sorted(tests.tolist()) == list(range(50))
+    for train, test in folds:
+        assert not set(train.tolist()) & set(test.tolist())
+        # Each stratum of 10 rows is dealt evenly across the folds
+        assert np.bincount(strata[test], minlength=5).tolist() == [2] * 5
+    with pytest.raises(ValueError):
+        kfold_indices(3, 5)
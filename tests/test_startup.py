@@ -0,0 +1,25 @@
+import importlib
+import sys
+from ml.startup import ImportTimer
+
+def test_import_timer_reports_nested_imports(tmp_path, monkeypatch):
+    (tmp_path / 'startup_outer.py').write_text('import time\nimport startup_inner\ntime.sleep(0.01)\n')
+    (tmp_path / 'startup_inner.py').write_text('import time\ntime.sleep(0.02)\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    timer = ImportTimer().install()
+    try:
+        importlib.import_module('startup_outer')
+    finally:
+        timer.uninstall()
+        sys.modules.pop('startup_outer', None)
+        sys.modules.pop('startup_inner', None)
+    timer.mark_ready()
+
+    report = timer.report(top=2)
+    assert timer not in sys.meta_path
+    assert [entry['module'] for entry in report['imports']] == ['startup_outer', 'startup_inner']
+    outer, inner = report['imports']
+    assert outer['cumulative_seconds'] >= inner['cumulative_seconds'] >= 0.02
+    # The outer module's self time leaves out the inner import
+    assert 0.01 <= outer['self_seconds'] < outer['cumulative_seconds'] - 0.015
+    assert report['startup_seconds'] >= outer['cumulative_seconds']
@@ -0,0 +1,51 @@
+import threading
+import time
+from ml.stats import CachedDatasetStats, compute_dataset_stats
+
+DEMOGRAPHICS = [
+    {'age': 30, 'gender': 'female', 'location': 'West', 'education_level': 'masters', 'ethnicity': 'Asian'},
+    {'age': 70, 'gender': 'male', 'location': 'South', 'education_level': None, 'ethnicity': 'White'},
+    {'age': 45, 'gender': 'female', 'location': 'West', 'education_level': 'bachelors', 'ethnicity': ''},
+]
+
+class ListSource:
+    """
+    Serves in-memory tables page by page and counts full scans
+    """
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.scans = 0
+        self._lock = threading.Lock()
+
+    def pages(self, table, columns, page_size):
+        if table == 'demographics':
+            with self._lock:
+                self.scans += 1
+            time.sleep(self.delay)
+            rows = DEMOGRAPHICS
+        else:
+            rows = [{'name': name} for name in ['Emma', 'Liam', 'Emma', 'Noah']]
+        for start in range(0, len(rows), page_size):
+            yield rows[start:start + page_size]
+
+def test_stats_are_aggregated_across_pages():
+    stats = compute_dataset_stats(ListSource(), page_size=2)
+
+    assert stats['total_records'] == 3 and stats['unique_names'] == 3
+    assert stats['missing_values'] == {'age': 0, 'gender': 0, 'location': 0, 'education_level': 1, 'ethnicity': 1}
+    assert stats['gender_distribution'] == {'female': 2, 'male': 1}
+    assert stats['ethnicity_distribution'] == {'Asian': 1, 'White': 1}
+
+def test_concurrent_cold_requests_share_one_scan():
+    source = ListSource(delay=0.2)
+    cached = CachedDatasetStats(source)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cached.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert source.scans == 1
+    assert len(results) == 8 and all(result == results[0] for result in results)
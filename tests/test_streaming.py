@@ -0,0 +1,41 @@
+import numpy as np
+from fixture_models import sample_records
+from ml.preprocessing import clean_data, encode_features
+import pytest
+from ml.streaming import STREAMING_AGE_RANGE, StreamingClassifier, resolve_streaming_hyperparameters
+from ml.vocabulary import LabelVocabulary
+
+def encoded(records, vocabulary):
+    return encode_features(clean_data(records), age_range=STREAMING_AGE_RANGE, vocabulary=vocabulary)
+
+def test_new_classes_keep_existing_weights_and_get_sane_probabilities():
+    records = sample_records(600, seed=3)
+    new_name = records[0]['name']
+    vocabulary = LabelVocabulary()
+    model = StreamingClassifier(vocabulary)
+    old = encoded([record for record in records if record['name'] != new_name], vocabulary)
+    for start in range(0, len(old['labels']), 100):
+        model.partial_fit(old['features'][start:start + 100], old['labels'][start:start + 100])
+    coef = model.estimator.coef_.copy()
+    old_probabilities = model.estimator.predict_proba(old['features'])
+    assert old_probabilities.max() < 0.99
+
+    new = encoded([record for record in records if record['name'] == new_name][:20], vocabulary)
+    new_class = vocabulary.intern(new_name)
+    model._grow()
+    assert np.array_equal(model.estimator.coef_[:new_class], coef)
+    assert np.array_equal(model.estimator.predict_proba(old['features'])[:, :new_class].argmax(axis=1), old_probabilities.argmax(axis=1))
+    # Before any update the new class is the least likely one for every row
+    probabilities = model.estimator.predict_proba(np.concatenate([old['features'], new['features']]))
+    assert (probabilities[:, new_class] <= probabilities[:, :new_class].min(axis=1) + 1e-6).all()
+
+    model.partial_fit(new['features'], new['labels'])
+    probabilities = model.estimator.predict_proba(new['features'])
+    assert 0 < probabilities[:, new_class].max() < 0.9
+    assert model.predict_batch(new['features'][:1])[0][0]['name'] in vocabulary
+
+def test_hyperparameters_resolve_against_the_streaming_defaults():
+    assert resolve_streaming_hyperparameters({'alpha': '0.01', 'numTrees': 5}) == {'alpha': 0.01, 'learningRate': 0.1}
+    for bad in ({'alpha': 'small'}, {'learningRate': 0}):
+        with pytest.raises(ValueError):
+            resolve_streaming_hyperparameters(bad)
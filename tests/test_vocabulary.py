@@ -0,0 +1,27 @@
+import numpy as np
+from ml.vocabulary import LabelVocabulary
+
+def test_encode_interns_new_names_in_order():
+    vocabulary = LabelVocabulary(['Emma'])
+
+    assert vocabulary.encode(['Liam', 'Emma', 'Liam', 'Noah']).tolist() == [1, 0, 1, 2]
+    assert vocabulary.names == ['Emma', 'Liam', 'Noah']
+    assert vocabulary.encode(['Noah', 'Ava'], grow=False).tolist() == [2, -1]
+    assert 'Ava' not in vocabulary and len(vocabulary) == 3
+    assert vocabulary.decode([2, 0]) == ['Noah', 'Emma']
+
+def test_top_k_matches_a_full_sort():
+    vocabulary = LabelVocabulary(f'Name{i}' for i in range(50))
+    scores = np.random.default_rng(0).random((20, 50))
+
+    for row, predictions in zip(scores, vocabulary.top_k(scores, k=3)):
+        expected = np.argsort(-row)[:3]
+        assert [p['name'] for p in predictions] == vocabulary.decode(expected.tolist())
+        assert [p['confidence'] for p in predictions] == row[expected].tolist()
+        assert [p['rank'] for p in predictions] == [1, 2, 3]
+
+def test_top_k_with_fewer_labels_than_k():
+    vocabulary = LabelVocabulary(['Emma', 'Liam'])
+
+    predictions = vocabulary.top_k(np.array([0.25, 0.75]), k=3)
+    assert [[p['name'] for p in row] for row in predictions] == [['Liam', 'Emma']]
@@ -0,0 +1,36 @@
+from ml.writeback import BufferedWriter
+
+def test_rows_are_inserted_in_batches_per_table():
+    inserts = []
+    writer = BufferedWriter(lambda table, rows: inserts.append((table, len(rows))), max_rows=3, flush_interval=60)
+
+    writer.enqueue('demographics', [{'id': 1}, {'id': 2}])
+    writer.enqueue('names', [{'name': 'Emma'}, {'name': 'Liam'}, {'name': 'Noah'}])
+    assert writer.flush(timeout=5)
+
+    # Demographics arrived first, so they are written before the names that reference them
+    assert inserts == [('demographics', 2), ('names', 3)]
+    assert writer.stats()['written_rows'] == 5 and writer.stats()['buffered_rows'] == 0
+
+def test_failed_inserts_are_retried_then_dropped():
+    attempts = []
+    def insert_rows(table, rows):
+        attempts.append(table)
+        if table == 'names' or len(attempts) == 1:
+            raise ConnectionError('database unavailable')
+    writer = BufferedWriter(insert_rows, flush_interval=60, max_retries=2, retry_backoff=0.001)
+
+    writer.enqueue('demographics', [{'id': 1}])
+    writer.enqueue('names', [{'name': 'Emma'}])
+    assert writer.flush(timeout=5)
+
+    stats = writer.stats()
+    assert attempts == ['demographics', 'demographics', 'names', 'names', 'names']
+    assert (stats['written_rows'], stats['dropped_rows'], stats['retries']) == (1, 1, 3)
+
+def test_a_full_buffer_drops_new_rows():
+    writer = BufferedWriter(lambda table, rows: None, max_rows=100, flush_interval=60, max_buffered_rows=2)
+
+    assert writer.enqueue('names', [{'name': 'Emma'}, {'name': 'Liam'}])
+    assert not writer.enqueue('names', [{'name': 'Noah'}])
+    assert writer.stats()['dropped_rows'] == 1
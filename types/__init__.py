@@ -3,7 +3,11 @@ from typing import Dict, List, Union, Literal, TypedDict, Optional
 # Define string literals for constrained string types
 GenderType = Literal['male', 'female', 'nonbinary', 'other']
 EducationLevelType = Literal['high-school', 'some-college', 'bachelors', 'masters', 'doctorate', 'other']
-ModelType = Literal['randomForest', 'gradientBoosting', 'neuralNetwork', 'lstm', 'transformer']
+ModelType = Literal['randomForest', 'gradientBoosting', 'neuralNetwork', 'lstm', 'transformer', 'incremental']
+JobStatusType = Literal['queued', 'running', 'succeeded', 'failed']
+SearchStrategy = Literal['grid', 'random', 'halving']
+TrialStatus = Literal['completed', 'pruned']
+ModelRole = Literal['live', 'canary', 'standby']
 
 class Demographic(TypedDict):
     age: int
@@ -20,6 +24,7 @@ class NamePrediction(TypedDict):
 class PredictionMetadata(TypedDict):
     processing_time: float
     model_used: str
+    model_version: str
     confidence: float
     data_quality: float
 
@@ -27,6 +32,11 @@ class PredictionResult(TypedDict):
     names: List[NamePrediction]
     metadata: PredictionMetadata
 
+class BatchPredictionItem(TypedDict):
+    index: int
+    result: Optional[PredictionResult]
+    error: Optional[str]
+
 class DatasetStats(TypedDict):
     total_records: int
     unique_names: int
@@ -44,14 +54,98 @@ class BiasMetrics(TypedDict):
     education_bias: float
     ethnicity_bias: float
 
+class AveragedScores(TypedDict):
+    precision: float
+    recall: float
+    f1_score: float
+
 class ModelMetrics(TypedDict):
     accuracy: float
     precision: float
     recall: float
     f1_score: float
     confusion_matrix: List[List[int]]
+    confusion_matrix_format: Literal['dense', 'coo']
+    labels: List[str]
+    macro_average: AveragedScores
+    micro_average: AveragedScores
     bias_metrics: BiasMetrics
 
+class ModelComparison(TypedDict):
+    model_type: ModelType
+    accuracy: float
+    training_time: float
+    prediction_latency: float
+
+class CrossValidationResult(TypedDict):
+    model_type: ModelType
+    folds: int
+    stratify: List[str]
+    seed: Optional[int]
+    fold_accuracies: List[float]
+    mean_accuracy: float
+    std_accuracy: float
+    training_time: float
+
+class ModelVersionStatus(TypedDict):
+    version: str
+    role: ModelRole
+    registered_at: float
+    accuracy: Optional[float]  # holdout accuracy from training; None when unknown
+    predictions: int
+    errors: int
+    latency_mean: float  # milliseconds per prediction
+    latency_p50: float
+    latency_p95: float
+    latency_p99: float
+
+class RegisteredModel(TypedDict):
+    name: str
+    live_version: Optional[str]
+    canary_version: Optional[str]
+    canary_percent: float
+    versions: List[ModelVersionStatus]
+
+class HyperparameterTrial(TypedDict):
+    trial: int
+    hyperparameters: Dict[str, Union[int, float]]
+    status: TrialStatus
+    rung_accuracies: List[float]  # validation accuracy at each rung the trial reached
+    accuracy: float  # at the last rung reached
+    training_fraction: float  # share of the training rows used at that rung
+    wall_time: float  # milliseconds spent training and evaluating, over all rungs
+
+class HyperparameterSearchResult(TypedDict):
+    model_type: ModelType
+    strategy: SearchStrategy
+    rungs: int
+    best_hyperparameters: Dict[str, Union[int, float]]
+    best_accuracy: float
+    trials: List[HyperparameterTrial]
+    pruned_trials: int
+    training_time: float
+
+class IncrementalUpdateResult(TypedDict):
+    model_type: ModelType
+    rows: int
+    new_labels: int
+    watermark: Optional[Dict[str, str]]
+    age_min: Optional[float]
+    age_max: Optional[float]
+    age_mean: Optional[float]
+    metrics: Optional[ModelMetrics]
+    training_time: float
+
+class TrainingJobStatus(TypedDict):
+    job_id: str
+    status: JobStatusType
+    stage: Optional[str]
+    epochs_total: Optional[int]
+    epochs_completed: Optional[int]
+    elapsed_time: float
+    metrics: Optional[ModelMetrics]
+    error: Optional[str]
+
 class FeatureEngineering(TypedDict):
     one_hot_encoding: bool
     age_binning: bool